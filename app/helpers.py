@@ -4,17 +4,14 @@ import cv2
 import os
 from app_models.detector_config import DetectorConfig
 from app_constants import ROOT_DIR
-import trio
+from services.async_runtime import AsyncRuntime
 import asyncio
 import numpy as np
 
 
 def sync_func(func, *args):
     if asyncio.iscoroutinefunction(func):
-        if (len(args) > 0):
-            return trio.run(func, *args)
-        else:
-            return trio.run(func)
+        return AsyncRuntime.instance().run_local(func, *args)
     else:
         if (len(args) > 0):
             return func(*args)
@@ -54,20 +51,6 @@ def concat_images(images, label_w, label_h):
     return final_img
 
 
-def get_all_camera_index(num=10):
-    # checks the first 10 indexes.
-    index = 0
-    arr = []
-    while num > 0:
-        cap = cv2.VideoCapture(index)
-        if cap.read()[0]:
-            arr.append(index)
-            cap.release()
-        index += 1
-        num -= 1
-    return arr
-
-
 def hide_all_children(widget):
     for ch in widget.children():
         if hasattr(ch, 'hide'):
@@ -1,9 +1,14 @@
 from PySide2.QtCore import Signal, QObject, QTimer
-from FQCS import detector
-from FQCS.manager import FQCSManager
+from services.sample_feature_cache import SampleFeatureCache
+from services.model_service import ModelService
+from services.startup_profiler import StartupProfiler, KIND_IMPORT
+import typing
 import cv2
 import abc
 
+if typing.TYPE_CHECKING:
+    from FQCS.manager import FQCSManager
+
 
 class DetectorConfigAbs():
     manager_changed: Signal
@@ -32,7 +37,7 @@ class DetectorConfigAbs():
     def set_current_path(self, val):
         pass
 
-    def get_manager(self) -> FQCSManager:
+    def get_manager(self) -> "FQCSManager":
         pass
 
     def set_manager(self, val):
@@ -65,7 +70,7 @@ class DetectorConfig(QObject, DetectorConfigAbs):
 
     __instance: DetectorConfigAbs = None
     __current_path: str = None
-    __manager: FQCSManager = None
+    __manager: "FQCSManager" = None
     __current_cfg_name: str = None
     __video_cameras = []
     __camera_timer: QTimer
@@ -105,6 +110,12 @@ class DetectorConfig(QObject, DetectorConfigAbs):
         self.__current_path = val
 
     def get_manager(self):
+        if self.__manager is None:
+            # FQCS pulls in the deep learning stack, import on first use
+            with StartupProfiler.instance().measure(KIND_IMPORT,
+                                                    "FQCS.manager"):
+                from FQCS.manager import FQCSManager
+            self.__manager = FQCSManager()
         return self.__manager
 
     def set_manager(self, val):
@@ -119,7 +130,8 @@ class DetectorConfig(QObject, DetectorConfigAbs):
         self.__current_cfg_name = val
 
     def get_current_cfg(self):
-        idx, cfg = self.__manager.get_config_by_name(self.__current_cfg_name)
+        idx, cfg = self.get_manager().get_config_by_name(
+            self.__current_cfg_name)
         return idx, cfg
 
     def __add_camera(self, cfg):
@@ -128,16 +140,18 @@ class DetectorConfig(QObject, DetectorConfigAbs):
 
     def add_config(self, new_cfg):
         self.__add_camera(new_cfg)
-        self.__manager.add_config(new_cfg)
+        self.get_manager().add_config(new_cfg)
 
     def remove_config(self, cfg):
-        idx, cfg = self.__manager.get_config_by_name(cfg["name"])
+        idx, cfg = self.get_manager().get_config_by_name(cfg["name"])
         self.__video_cameras[idx].release()
         self.__video_cameras.remove(self.__video_cameras[idx])
-        self.__manager.remove_config(cfg)
+        self.get_manager().remove_config(cfg)
 
     def reset(self):
-        self.__manager = FQCSManager()
+        SampleFeatureCache.instance().invalidate()
+        ModelService.instance().reset()
+        self.__manager = None
         self.__current_cfg_name = None
         self.__current_path = None
         self.release_cameras()
@@ -149,7 +163,8 @@ class DetectorConfig(QObject, DetectorConfigAbs):
         if camera_name is None or camera_name == "":
             err_text = "Invalid name"
         else:
-            idx, existed_cfg = self.__manager.get_config_by_name(camera_name)
+            idx, existed_cfg = self.get_manager().get_config_by_name(
+                camera_name)
             if existed_cfg is not None:
                 err_text = "Name existed"
         return err_text
@@ -0,0 +1,61 @@
+import argparse
+import multiprocessing
+import json
+import sys
+from services.async_runtime import AsyncRuntime
+from services.batch_runner import BatchRunner
+from app_models.app_config import AppConfig
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Run the inspection pipeline over recorded inputs")
+    parser.add_argument("--config",
+                        required=True,
+                        help="Saved detector config folder")
+    parser.add_argument("--input",
+                        required=True,
+                        nargs="+",
+                        help="Videos or image folders of the main camera")
+    parser.add_argument("--side",
+                        action="append",
+                        default=[],
+                        metavar="NAME=PATH",
+                        help="Video or image folder of a side camera config")
+    parser.add_argument("--output",
+                        required=True,
+                        help="Folder for results and saved images")
+    parser.add_argument("--report", help="Write the throughput report here")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    AppConfig.instance().load_config()
+    app_cfg = AppConfig.instance().config
+    side_paths = {}
+    for item in args.side:
+        name, path = item.split("=", 1)
+        side_paths[name] = path
+    runner = BatchRunner(args.config, args.output, app_cfg.get("pipeline"),
+                         app_cfg.get("image_writer"))
+    runner.load_model(app_cfg.get("model_warmup_runs", 2))
+    reports = []
+    for path in args.input:
+        report = runner.run(path, side_paths)
+        print(f"{path}: {report['frames']} frames, "
+              f"{report['products']} products, "
+              f"{report['frames_per_second']:.2f} frames/s, "
+              f"{report['products_per_second']:.2f} products/s")
+        reports.append(report)
+    if args.report is not None:
+        with open(args.report, "w") as fo:
+            json.dump(reports, fo, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    with AsyncRuntime.instance() as rt:
+        status = main(sys.argv[1:])
+    sys.exit(status)
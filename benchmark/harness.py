@@ -0,0 +1,43 @@
+import json
+import time
+import os
+
+
+def time_case(func, repeat=20, warmup=3):
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "repeat": repeat,
+        "min": times[0],
+        "median": times[len(times) // 2],
+        "p95": times[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))]
+    }
+
+
+def load_baseline(path):
+    if not os.path.isfile(path): return None
+    with open(path) as fi:
+        return json.load(fi)
+
+
+def save_baseline(path, results):
+    with open(path, "w") as fo:
+        json.dump(results, fo, indent=2, sort_keys=True)
+
+
+def find_regressions(results, baseline, tolerance=1.25):
+    # medians slower than the baseline by more than the tolerance factor,
+    # cases missing from the baseline are new and never fail
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None: continue
+        if result["median"] > base["median"] * tolerance:
+            regressions.append((name, result["median"], base["median"]))
+    return regressions
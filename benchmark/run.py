@@ -0,0 +1,156 @@
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from FQCS.manager import FQCSManager
+from services.async_runtime import AsyncRuntime
+from benchmark import harness
+from app_constants import ROOT_DIR
+import numpy as np
+import argparse
+import copy
+import cv2
+import sys
+
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, "benchmark", "baseline.json")
+DATA_TEST_PATH = os.path.join(ROOT_DIR, "test", "data_test")
+DETECT_METHODS = ["thresh", "edge", "range"]
+BACKGROUND = 10
+
+
+def build_conveyor_frame(cfg, sample_left, sample_right):
+    # both products side by side on a dark belt, the left one is mirrored
+    # the same way the camera sees it
+    width, height = cfg["frame_width"], cfg["frame_height"]
+    frame = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+    item_h = int(height * 0.8)
+    y = (height - item_h) // 2
+    for img, center in [(cv2.flip(sample_left, 1), 0.28),
+                        (sample_right, 0.72)]:
+        item_w = min(int(img.shape[1] * item_h / img.shape[0]),
+                     width // 2 - 20)
+        item = cv2.resize(img, (item_w, item_h))
+        x = int(width * center - item_w / 2)
+        frame[y:y + item_h, x:x + item_w] = item
+    return frame
+
+
+def load_frames(cfg, sample_left, sample_right):
+    frames = [build_conveyor_frame(cfg, sample_left, sample_right)]
+    if os.path.isdir(DATA_TEST_PATH):
+        for name in sorted(os.listdir(DATA_TEST_PATH)):
+            img = cv2.imread(os.path.join(DATA_TEST_PATH, name))
+            if img is None: continue
+            frames.append(
+                cv2.resize(img, (cfg["frame_width"], cfg["frame_height"])))
+    return frames
+
+
+def build_cases(manager: FQCSManager):
+    _, main_cfg = manager.get_main_config()
+    sample_left, sample_right = manager.get_sample_left(
+    ), manager.get_sample_right()
+    frames = load_frames(main_cfg, sample_left, sample_right)
+    runtime = AsyncRuntime.instance()
+    cases = {}
+
+    for method in DETECT_METHODS:
+        cfg = copy.deepcopy(main_cfg)
+        cfg["detect_method"] = method
+        cases[f"extract_boxes[{method}]"] = lambda cfg=cfg: [
+            manager.extract_boxes(cfg, frame) for frame in frames
+        ]
+
+    boxes_list = [manager.extract_boxes(main_cfg, f)[0] for f in frames]
+    cases["detect_groups_and_checked_pair"] = lambda: [
+        manager.detect_groups_and_checked_pair(main_cfg, boxes, frame.copy())
+        for boxes, frame in zip(boxes_list, frames)
+    ]
+
+    left, right = find_pair(manager, main_cfg, boxes_list[0], frames[0])
+    pre_left, pre_right = manager.preprocess_images(main_cfg, left, right)
+    pre_sample_left, pre_sample_right = manager.preprocess_images(
+        main_cfg, sample_left, sample_right)
+    segments_list = main_cfg["sim_cfg"]["segments_list"]
+    for segments in [[s] for s in segments_list] + [segments_list]:
+        cfg = copy.deepcopy(main_cfg)
+        cfg["sim_cfg"]["segments_list"] = segments
+        name = ",".join(str(s) for s in segments)
+        cases[f"detect_asym[{name}]"] = lambda cfg=cfg: runtime.run(
+            manager.detect_asym, cfg, pre_left, pre_right, pre_sample_left,
+            pre_sample_right, None)
+
+    cases["compare_colors"] = lambda: runtime.run(
+        manager.compare_colors, main_cfg, pre_left, pre_right,
+        pre_sample_left, pre_sample_right, True, None)
+
+    from widgets.image_widget import ImageWidget
+    widget = ImageWidget()
+    widget.resize(main_cfg["frame_width"], main_cfg["frame_height"])
+    cases["ImageWidget.imshow"] = lambda: [
+        widget.imshow(frame) for frame in frames
+    ]
+    return cases
+
+
+def find_pair(manager: FQCSManager, cfg, boxes, frame):
+    pair = manager.detect_groups_and_checked_pair(cfg, boxes,
+                                                  frame.copy())[3]
+    if pair is not None:
+        left, right = pair
+        return cv2.flip(left[0], 1), right[0]
+    # the crops of the synthetic frame, as the camera would see them
+    height, width = frame.shape[:2]
+    return cv2.flip(frame[:, :width // 2], 1), frame[:, width // 2:]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Time the detection and inspection stages")
+    parser.add_argument("--config",
+                        default=ROOT_DIR,
+                        help="Saved detector config folder with samples")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update",
+                        action="store_true",
+                        help="Save the results as the new baseline")
+    parser.add_argument("--tolerance",
+                        type=float,
+                        default=1.25,
+                        help="Allowed slowdown factor of the median")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--filter", help="Only run cases containing this")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    from PySide2.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    manager = FQCSManager(config_folder=args.config)
+    cases = build_cases(manager)
+    results = {}
+    for name, func in cases.items():
+        if args.filter is not None and args.filter not in name: continue
+        results[name] = harness.time_case(func, args.repeat, args.warmup)
+        result = results[name]
+        print(f"{name:40} median {result['median'] * 1000:9.3f} ms  "
+              f"p95 {result['p95'] * 1000:9.3f} ms")
+
+    if args.update:
+        harness.save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    baseline = harness.load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, run with --update")
+        return 0
+    regressions = harness.find_regressions(results, baseline, args.tolerance)
+    for name, current, base in regressions:
+        print(f"REGRESSION {name}: {current * 1000:.3f} ms "
+              f"(baseline {base * 1000:.3f} ms)")
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,7 +1,13 @@
-from PySide2.QtWidgets import QApplication
-from widgets.main_window import MainWindow
-from widgets.login_screen import LoginScreen
+from services.startup_profiler import StartupProfiler, KIND_IMPORT, KIND_SCREEN, KIND_STEP
+with StartupProfiler.instance().measure(KIND_IMPORT, "PySide2"):
+    from PySide2.QtWidgets import QApplication
+    from PySide2.QtCore import QTimer
+with StartupProfiler.instance().measure(KIND_IMPORT, "widgets.main_window"):
+    from widgets.main_window import MainWindow
+with StartupProfiler.instance().measure(KIND_IMPORT, "widgets.login_screen"):
+    from widgets.login_screen import LoginScreen
 import asyncio
+import multiprocessing
 import sys
 import os
 from services.identity_service import IdentityService
@@ -10,7 +16,9 @@ from app_models.auth_info import AuthInfo
 import json
 from app_constants import KEY_AUTH_INFO
 from services.thread_manager import ThreadManager
+from services.async_runtime import AsyncRuntime
 from app_models.app_config import AppConfig
+from services.camera_discovery import CameraDiscovery
 from qasync import QEventLoop
 
 
@@ -21,13 +29,23 @@ class MainApplication():
         self.app = None
         self.main_window = None
         self.login_screen = None
+        self.__startup_reported = False
         return
 
     def run(self, loop):
-        AppConfig.instance().load_config()
+        profiler = StartupProfiler.instance()
+        with profiler.measure(KIND_STEP, "load_config"):
+            AppConfig.instance().load_config()
+        discovery_cfg = AppConfig.instance().config.get("camera_discovery", {})
+        CameraDiscovery.instance().configure(
+            discovery_cfg.get("max_index", 10), discovery_cfg.get("ttl", 30),
+            discovery_cfg.get("timeout", 3), discovery_cfg.get("sources"))
+        # probe in background, the list is ready before anyone needs it
+        CameraDiscovery.instance().refresh()
         self.auth_info = AuthInfo.instance()
         self.__identity_service = IdentityService(self.auth_info)
-        self.__identity_service.init_auth_info()
+        with profiler.measure(KIND_STEP, "init_auth_info"):
+            self.__identity_service.init_auth_info()
         self.auth_info.token_info_changed.connect(self.token_info_changed)
         self.build()
         self.__identity_service.check_token()
@@ -43,19 +61,29 @@ class MainApplication():
                 self.main_window.close()
         elif (self.main_window is None
               or not self.main_window.isActiveWindow()):
-            self.main_window = MainWindow(self.__identity_service)
-            self.main_window.showFullScreen()
+            with StartupProfiler.instance().measure(KIND_SCREEN,
+                                                    "MainWindow"):
+                self.main_window = MainWindow(self.__identity_service)
+                self.main_window.showFullScreen()
+            if not self.__startup_reported:
+                # runs once the first frame of the window has been painted
+                QTimer.singleShot(0, self.report_startup)
             if self.login_screen is not None:
                 self.login_screen.close()
         return
 
+    def report_startup(self):
+        self.__startup_reported = True
+        print(StartupProfiler.instance().format_report())
+
     def token_info_changed(self, token):
         self.build()
         return
 
 
 if __name__ == "__main__":
-    with ThreadManager.instance() as tm:
+    multiprocessing.freeze_support()
+    with ThreadManager.instance() as tm, AsyncRuntime.instance() as rt:
         app = QApplication([])
         loop = QEventLoop(app)
         asyncio.set_event_loop(loop)
@@ -0,0 +1,165 @@
+import abc
+import asyncio
+import concurrent.futures
+import threading
+import trio
+
+
+class AsyncRuntimeAbs(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def start(self):
+        pass
+
+    @abc.abstractmethod
+    def stop(self):
+        pass
+
+    @abc.abstractmethod
+    def is_running(self):
+        pass
+
+    @abc.abstractmethod
+    def run(self, afn, *args):
+        pass
+
+    @abc.abstractmethod
+    def submit(self, afn, *args) -> concurrent.futures.Future:
+        pass
+
+    @abc.abstractmethod
+    async def run_async(self, afn, *args):
+        pass
+
+    @abc.abstractmethod
+    def run_local(self, afn, *args):
+        pass
+
+    @abc.abstractmethod
+    async def run_in_thread(self, afn, *args):
+        pass
+
+
+class AsyncRuntime(AsyncRuntimeAbs):
+    __instance: AsyncRuntimeAbs = None
+
+    @staticmethod
+    def instance():
+        if (AsyncRuntime.__instance is None):
+            AsyncRuntime.__instance = AsyncRuntime()
+        return AsyncRuntime.__instance
+
+    def __init__(self, name="async-runtime"):
+        self.__name = name
+        self.__thread = None
+        self.__token = None
+        self.__nursery = None
+        self.__stop_event = None
+        self.__started = threading.Event()
+        self.__local = threading.local()
+        self.__local_runtimes = []
+        self.__local_lock = threading.Lock()
+        return
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return
+
+    def start(self):
+        if self.is_running(): return
+        self.__started.clear()
+        self.__thread = threading.Thread(target=trio.run,
+                                         args=(self.__serve, ),
+                                         name=self.__name,
+                                         daemon=True)
+        self.__thread.start()
+        self.__started.wait()
+
+    def stop(self):
+        with self.__local_lock:
+            local_runtimes = self.__local_runtimes
+            self.__local_runtimes = []
+        for _, runtime in local_runtimes:
+            runtime.stop()
+        if not self.is_running(): return
+        trio.from_thread.run_sync(self.__stop_event.set,
+                                  trio_token=self.__token)
+        self.__thread.join()
+        self.__thread = None
+
+    def is_running(self):
+        return self.__token is not None
+
+    def run(self, afn, *args):
+        if not self.is_running():
+            raise RuntimeError("Async runtime is not running")
+        return trio.from_thread.run(afn, *args, trio_token=self.__token)
+
+    def submit(self, afn, *args) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        if not self.is_running():
+            future.set_exception(RuntimeError("Async runtime is not running"))
+            return future
+        trio.from_thread.run_sync(self.__nursery.start_soon,
+                                  self.__resolve,
+                                  future,
+                                  afn,
+                                  *args,
+                                  trio_token=self.__token)
+        return future
+
+    async def run_async(self, afn, *args):
+        return await asyncio.wrap_future(self.submit(afn, *args))
+
+    def run_local(self, afn, *args):
+        # CPU-bound coroutines never await, on the shared loop they would run
+        # one at a time. every caller thread feeds its own long-lived loop
+        # instead, so callers stay parallel without a loop per call
+        return self.__get_local_runtime().run(afn, *args)
+
+    async def run_in_thread(self, afn, *args):
+        # run_local for asyncio callers, keeps the GUI thread free
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.run_local, afn, *args)
+
+    def __get_local_runtime(self):
+        runtime = getattr(self.__local, "runtime", None)
+        if runtime is not None and runtime.is_running(): return runtime
+        owner = threading.current_thread()
+        runtime = AsyncRuntime(f"{self.__name}-{owner.name}")
+        runtime.start()
+        self.__local.runtime = runtime
+        with self.__local_lock:
+            # loops of caller threads that have exited are not needed anymore
+            stale = [(t, r) for t, r in self.__local_runtimes
+                     if not t.is_alive()]
+            self.__local_runtimes = [(t, r) for t, r in self.__local_runtimes
+                                     if t.is_alive()]
+            self.__local_runtimes.append((owner, runtime))
+        for _, stale_runtime in stale:
+            stale_runtime.stop()
+        return runtime
+
+    async def __serve(self):
+        async with trio.open_nursery() as nursery:
+            self.__nursery = nursery
+            self.__stop_event = trio.Event()
+            self.__token = trio.lowlevel.current_trio_token()
+            self.__started.set()
+            await self.__stop_event.wait()
+            self.__token = None
+            nursery.cancel_scope.cancel()
+        self.__nursery = None
+
+    async def __resolve(self, future, afn, *args):
+        try:
+            result = await afn(*args)
+            future.set_result(result)
+        except trio.Cancelled:
+            future.cancel()
+            raise
+        except Exception as ex:
+            future.set_exception(ex)
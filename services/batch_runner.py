@@ -0,0 +1,189 @@
+from FQCS.manager import FQCSManager
+from services.capture_service import CaptureService
+from services.inspection_pipeline import InspectionPipeline
+from services.model_service import ModelService
+from services.stage_metrics import StageMetrics
+from services.bounded_queue import POLICY_BLOCK
+from app_constants import ISO_DATE_FORMAT
+import threading
+import json
+import time
+import cv2
+import os
+
+IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff"]
+# every frame of a recording is inspected, nothing is dropped
+BATCH_QUEUES = {
+    "frame": {
+        "size": 4,
+        "policy": POLICY_BLOCK
+    },
+    "box": {
+        "size": 4,
+        "policy": POLICY_BLOCK
+    },
+    "pair": {
+        "size": 4,
+        "policy": POLICY_BLOCK
+    },
+    "persist": {
+        "size": 16,
+        "policy": POLICY_BLOCK
+    }
+}
+
+
+class FrameSource():
+    def __init__(self, path):
+        self.__path = path
+        self.__video = None
+        self.__files = None
+        if os.path.isdir(path):
+            files = sorted(os.listdir(path))
+            self.__files = [
+                os.path.join(path, f) for f in files
+                if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS
+            ]
+        else:
+            self.__video = cv2.VideoCapture(path)
+            if not self.__video.isOpened():
+                raise Exception(f"Cannot open video {path}")
+
+    def read(self):
+        if self.__video is not None:
+            grabbed, frame = self.__video.read()
+            return frame if grabbed else None
+        while len(self.__files) > 0:
+            frame = cv2.imread(self.__files.pop(0))
+            if frame is not None: return frame
+        return None
+
+    def release(self):
+        if self.__video is not None:
+            self.__video.release()
+
+    def get_path(self):
+        return self.__path
+
+
+class BatchRunner():
+    DRAIN_TIMEOUT = 60
+
+    def __init__(self, config_folder, output_path, pipeline_cfg=None,
+                 writer_cfg=None, buffer_size=64):
+        pipeline_cfg = dict(pipeline_cfg or {})
+        pipeline_cfg["queues"] = BATCH_QUEUES
+        self.__config_folder = config_folder
+        self.__output_path = output_path
+        self.__pipeline_cfg = pipeline_cfg
+        self.__writer_cfg = writer_cfg
+        self.__manager = FQCSManager(config_folder=config_folder)
+        self.__capture_service = CaptureService(buffer_size)
+        self.__results_lock = threading.Lock()
+        self.__results_file = None
+        self.__products = 0
+        self.__errors = 0
+
+    def load_model(self, warmup_runs=2):
+        manager = self.__manager
+        for cfg in manager.get_configs():
+            if cfg["is_main"] == True and cfg["is_defect_enable"]:
+                load_time, warmup_time = ModelService.instance().load(
+                    manager, cfg, warmup_runs).result()
+                print(f"Model loaded in {load_time:.2f}s, "
+                      f"warmed up in {warmup_time:.2f}s")
+
+    def run(self, main_path, side_paths=None):
+        side_paths = side_paths or {}
+        manager = self.__manager
+        main_idx, main_cfg = manager.get_main_config()
+        if main_cfg is None: raise Exception("No main configuration available")
+        configs = manager.get_configs()
+        sources = {main_idx: FrameSource(main_path)}
+        for idx, cfg in enumerate(configs):
+            if cfg["name"] in side_paths and idx != main_idx:
+                sources[idx] = FrameSource(side_paths[cfg["name"]])
+
+        os.makedirs(self.__output_path, exist_ok=True)
+        self.__products = 0
+        self.__errors = 0
+        StageMetrics.instance().reset()
+        self.__capture_service.start_manual(len(configs))
+        pipeline = InspectionPipeline(manager,
+                                      self.__capture_service,
+                                      self.__output_path,
+                                      pipeline_cfg=self.__pipeline_cfg,
+                                      writer_cfg=self.__writer_cfg,
+                                      config_folder=self.__config_folder,
+                                      on_result=self.__handle_result,
+                                      on_error=self.__handle_error)
+        results_path = os.path.join(self.__output_path, "results.jsonl")
+        frames = 0
+        start = time.perf_counter()
+        with open(results_path, "w") as self.__results_file:
+            pipeline.start()
+            try:
+                frames = self.__feed(pipeline, sources, main_idx)
+                if not pipeline.drain(self.DRAIN_TIMEOUT):
+                    print("Timed out waiting for the pipeline to drain")
+            finally:
+                pipeline.stop()
+                self.__capture_service.stop()
+                for source in sources.values():
+                    source.release()
+        elapsed = time.perf_counter() - start
+        return self.__build_report(main_path, frames, elapsed,
+                                   pipeline.get_queue_stats(),
+                                   pipeline.get_motion_stats())
+
+    def __feed(self, pipeline, sources, main_idx):
+        frames = 0
+        while True:
+            main_frame = sources[main_idx].read()
+            if main_frame is None: break
+            timestamp = time.monotonic()
+            for idx, source in sources.items():
+                if idx == main_idx: continue
+                frame = source.read()
+                if frame is not None:
+                    self.__capture_service.push(idx, timestamp, frame)
+            self.__capture_service.push(main_idx, timestamp, main_frame)
+            pipeline.submit_frame(timestamp, main_frame)
+            frames += 1
+        return frames
+
+    def __handle_result(self, result):
+        record = {
+            "time": result["time"].strftime(ISO_DATE_FORMAT),
+            "size_diff": list(result["size_diff"]),
+            "asym_diff": list(result["asym_diff"]),
+            "color_diff": list(result["color_diff"])
+            if result["color_diff"] is not None else None,
+            "defects": result["defects"],
+            "defect_types": sorted(result["defect_types"])
+        }
+        with self.__results_lock:
+            self.__products += 1
+            self.__results_file.write(json.dumps(record, default=bool) + "\n")
+
+    def __handle_error(self, ex):
+        with self.__results_lock:
+            self.__errors += 1
+        print(ex)
+
+    def __build_report(self, main_path, frames, elapsed, queue_stats,
+                       motion_stats):
+        elapsed = max(elapsed, 1e-9)
+        return {
+            "input": main_path,
+            "frames": frames,
+            "products": self.__products,
+            "errors": self.__errors,
+            "elapsed": elapsed,
+            "frames_per_second": frames / elapsed,
+            "products_per_second": self.__products / elapsed,
+            "dropped": {k: v[2]
+                        for k, v in queue_stats.items()},
+            "motion_gate": motion_stats,
+            "stages": StageMetrics.instance().get_summary()
+        }
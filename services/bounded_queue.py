@@ -0,0 +1,82 @@
+import collections
+import threading
+import queue
+
+POLICY_BLOCK = "block"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_NEWEST = "drop_newest"
+POLICIES = [POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST]
+
+
+class BoundedQueue():
+    def __init__(self, maxsize=1, policy=POLICY_BLOCK):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid queue policy: {policy}")
+        self.__maxsize = maxsize
+        self.__policy = policy
+        self.__items = collections.deque()
+        self.__cond = threading.Condition()
+        self.__dropped = 0
+        self.__unfinished = 0
+        self.__closed = False
+
+    def put(self, item, timeout=None):
+        with self.__cond:
+            while len(self.__items) >= self.__maxsize:
+                if self.__closed: return False
+                if self.__policy == POLICY_DROP_NEWEST:
+                    self.__dropped += 1
+                    return False
+                if self.__policy == POLICY_DROP_OLDEST:
+                    self.__items.popleft()
+                    self.__dropped += 1
+                    self.__unfinished -= 1
+                    break
+                if not self.__cond.wait(timeout): return False
+            if self.__closed: return False
+            self.__items.append(item)
+            self.__unfinished += 1
+            self.__cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        with self.__cond:
+            while len(self.__items) == 0:
+                if self.__closed or not self.__cond.wait(timeout):
+                    raise queue.Empty()
+            item = self.__items.popleft()
+            self.__cond.notify_all()
+            return item
+
+    def task_done(self):
+        with self.__cond:
+            if self.__unfinished <= 0:
+                raise ValueError("task_done() called too many times")
+            self.__unfinished -= 1
+            self.__cond.notify_all()
+
+    def join(self, timeout=None):
+        with self.__cond:
+            return self.__cond.wait_for(lambda: self.__unfinished == 0,
+                                        timeout)
+
+    def close(self):
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify_all()
+
+    def qsize(self):
+        with self.__cond:
+            return len(self.__items)
+
+    def get_dropped(self):
+        with self.__cond:
+            return self.__dropped
+
+    def get_policy(self):
+        return self.__policy
+
+    def get_maxsize(self):
+        return self.__maxsize
@@ -0,0 +1,74 @@
+import threading
+import time
+from services.frame_ring_buffer import FrameRingBuffer
+from services.camera_health import CameraHealth
+
+
+class CameraCaptureThread(threading.Thread):
+    IDLE_WAIT = 0.01
+
+    def __init__(self,
+                 camera,
+                 buffer: FrameRingBuffer,
+                 name=None,
+                 uri=None,
+                 health: CameraHealth = None,
+                 on_open=None,
+                 owns_camera=False,
+                 is_reconnect=False):
+        threading.Thread.__init__(self, name=name, daemon=True)
+        self.__camera = camera
+        self.__buffer = buffer
+        self.__uri = uri
+        self.__health = health or CameraHealth()
+        self.__on_open = on_open
+        self.__owns_camera = owns_camera
+        self.__is_reconnect = is_reconnect
+        self.__stop_event = threading.Event()
+
+    def run(self):
+        try:
+            self.__capture()
+        finally:
+            # an owned capture is only released here, by the one thread
+            # that may still be blocked inside read()
+            if self.__owns_camera: self.__camera.release()
+
+    def __capture(self):
+        has_opened = self.__is_reconnect
+        if self.__camera.isOpened(): self.__health.opened(has_opened)
+        while not self.__stop_event.is_set():
+            if not self.__camera.isOpened():
+                if self.__uri is None:
+                    self.__stop_event.wait(self.IDLE_WAIT)
+                    continue
+                # (re)open off the GUI thread, backing off while it fails
+                self.__health.connecting()
+                if self.__camera.open(self.__uri):
+                    if self.__on_open is not None:
+                        self.__on_open(self.__camera)
+                    self.__health.opened(has_opened)
+                    has_opened = True
+                else:
+                    self.__stop_event.wait(self.__health.open_failed())
+                continue
+            grabbed, frame = self.__camera.read()
+            if self.__stop_event.is_set(): break
+            timestamp = time.monotonic()
+            if not grabbed or frame is None:
+                if self.__uri is not None and self.__health.is_stalled(
+                        timestamp):
+                    # reads keep failing, start over
+                    self.__camera.release()
+                    self.__health.lost()
+                    continue
+                self.__stop_event.wait(self.IDLE_WAIT)
+                continue
+            self.__buffer.push(timestamp, frame)
+            self.__health.frame_received(timestamp)
+
+    def stop(self):
+        self.__stop_event.set()
+
+    def get_health(self) -> CameraHealth:
+        return self.__health
@@ -0,0 +1,167 @@
+from services.capture_service import get_owned_sources
+import threading
+import time
+import abc
+import cv2
+
+# drivers clamp an oversized request to the largest mode they support
+MAX_RESOLUTION_PROBE = 10000
+# a probe that has not answered before the timeout
+PENDING = object()
+
+
+def probe_camera(source):
+    cap = cv2.VideoCapture(source)
+    try:
+        if not cap.isOpened(): return None
+        grabbed, frame = cap.read()
+        if not grabbed or frame is None: return None
+        height, width = frame.shape[:2]
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, MAX_RESOLUTION_PROBE)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, MAX_RESOLUTION_PROBE)
+        max_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or width
+        max_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height
+        name = f"Camera {source}" if isinstance(source, int) else str(source)
+        return {
+            "source": source,
+            "name": name,
+            "width": width,
+            "height": height,
+            "max_width": max_width,
+            "max_height": max_height
+        }
+    finally:
+        cap.release()
+
+
+class CameraDiscoveryAbs(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def configure(self, max_index=10, ttl=30, timeout=3, sources=None):
+        pass
+
+    @abc.abstractmethod
+    def get_cameras(self):
+        pass
+
+    @abc.abstractmethod
+    def refresh(self):
+        pass
+
+    @abc.abstractmethod
+    def wait(self, timeout=None):
+        pass
+
+    @abc.abstractmethod
+    def add_listener(self, callback):
+        pass
+
+    @abc.abstractmethod
+    def remove_listener(self, callback):
+        pass
+
+
+class CameraDiscovery(CameraDiscoveryAbs):
+    __instance: CameraDiscoveryAbs = None
+
+    @staticmethod
+    def instance() -> CameraDiscoveryAbs:
+        if (CameraDiscovery.__instance is None):
+            CameraDiscovery.__instance = CameraDiscovery()
+        return CameraDiscovery.__instance
+
+    def __init__(self, probe_func=probe_camera, owned_func=get_owned_sources):
+        self.__probe_func = probe_func
+        self.__owned_func = owned_func
+        self.__max_index = 10
+        self.__ttl = 30
+        self.__timeout = 3
+        self.__sources = []
+        self.__cameras = []
+        self.__updated = None
+        self.__refreshing = None
+        self.__listeners = []
+        self.__lock = threading.Lock()
+
+    def configure(self, max_index=10, ttl=30, timeout=3, sources=None):
+        with self.__lock:
+            self.__max_index = max_index
+            self.__ttl = ttl
+            self.__timeout = timeout
+            self.__sources = list(sources or [])
+            self.__updated = None
+
+    def get_cameras(self):
+        # never blocks, a stale or empty cache starts a background refresh
+        with self.__lock:
+            cameras = list(self.__cameras)
+            stale = self.__updated is None or (time.monotonic() -
+                                               self.__updated > self.__ttl)
+        if stale: self.refresh()
+        return cameras
+
+    def refresh(self):
+        with self.__lock:
+            if self.__refreshing is not None and self.__refreshing.is_alive():
+                return
+            self.__refreshing = threading.Thread(target=self.__run,
+                                                 name="camera-discovery",
+                                                 daemon=True)
+            self.__refreshing.start()
+
+    def wait(self, timeout=None):
+        with self.__lock:
+            thread = self.__refreshing
+        if thread is not None: thread.join(timeout)
+        return thread is None or not thread.is_alive()
+
+    def add_listener(self, callback):
+        with self.__lock:
+            self.__listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self.__lock:
+            if callback in self.__listeners:
+                self.__listeners.remove(callback)
+
+    def __run(self):
+        with self.__lock:
+            sources = list(range(self.__max_index)) + self.__sources
+            timeout = self.__timeout
+            previous = {info["source"]: info for info in self.__cameras}
+        # a camera already open for preview or capture is not opened again,
+        # many drivers refuse the second handle
+        owned = self.__owned_func()
+        # one daemon thread per source, a device stuck in its driver only
+        # costs its own timeout and never delays the others or app exit
+        results = [PENDING] * len(sources)
+        threads = []
+        for idx, source in enumerate(sources):
+            if source in owned: continue
+            thread = threading.Thread(target=self.__probe,
+                                      args=(source, results, idx),
+                                      daemon=True)
+            thread.start()
+            threads.append(thread)
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        cameras = []
+        for source, info in zip(sources, list(results)):
+            # skipped or unanswered sources keep what the cache knew
+            if info is PENDING: info = previous.get(source)
+            if info is not None: cameras.append(info)
+        with self.__lock:
+            self.__cameras = cameras
+            self.__updated = time.monotonic()
+            listeners = list(self.__listeners)
+        for callback in listeners:
+            try:
+                callback(cameras)
+            except Exception as ex:
+                print(ex)
+
+    def __probe(self, source, results, idx):
+        try:
+            results[idx] = self.__probe_func(source)
+        except Exception as ex:
+            print(ex)
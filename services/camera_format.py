@@ -0,0 +1,59 @@
+import cv2
+
+
+def get_fourcc_code(fourcc):
+    return cv2.VideoWriter_fourcc(*fourcc)
+
+
+def get_fourcc_name(code):
+    code = int(code)
+    if code <= 0: return None
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def get_requested_format(cfg, defaults=None):
+    # per camera overrides on top of app wide defaults, the resolution is the
+    # one the detector works on so the driver can deliver it directly
+    defaults = defaults or {}
+    return {
+        "width": cfg["frame_width"],
+        "height": cfg["frame_height"],
+        "fourcc": cfg.get("capture_fourcc", defaults.get("fourcc")),
+        "fps": cfg.get("capture_fps", defaults.get("fps")),
+        "buffer_size": cfg.get("capture_buffer_size",
+                               defaults.get("buffer_size"))
+    }
+
+
+def negotiate_format(camera, requested):
+    # FOURCC goes first, some drivers only expose large modes for MJPG
+    if requested.get("fourcc"):
+        camera.set(cv2.CAP_PROP_FOURCC, get_fourcc_code(requested["fourcc"]))
+    if requested.get("width") and requested.get("height"):
+        camera.set(cv2.CAP_PROP_FRAME_WIDTH, requested["width"])
+        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, requested["height"])
+    if requested.get("fps"):
+        camera.set(cv2.CAP_PROP_FPS, requested["fps"])
+    if requested.get("buffer_size"):
+        camera.set(cv2.CAP_PROP_BUFFERSIZE, requested["buffer_size"])
+    granted = {
+        "width": int(camera.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(camera.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fourcc": get_fourcc_name(camera.get(cv2.CAP_PROP_FOURCC)),
+        "fps": camera.get(cv2.CAP_PROP_FPS),
+        "buffer_size": int(camera.get(cv2.CAP_PROP_BUFFERSIZE))
+    }
+    if (granted["width"], granted["height"]) != (requested.get("width"),
+                                                 requested.get("height")):
+        print(f"Camera granted {granted['width']}x{granted['height']} "
+              f"instead of {requested.get('width')}x"
+              f"{requested.get('height')}, frames will be resized")
+    return granted
+
+
+def fit_frame(image, width, height):
+    # software resize only when the driver did not deliver the size
+    if image is None: return image
+    h, w = image.shape[:2]
+    if w == width and h == height: return image
+    return cv2.resize(image, (width, height))
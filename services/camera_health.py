@@ -0,0 +1,71 @@
+import threading
+import time
+
+STATE_IDLE = "idle"
+STATE_CONNECTING = "connecting"
+STATE_HEALTHY = "healthy"
+STATE_STALLED = "stalled"
+STATE_DISCONNECTED = "disconnected"
+
+
+class CameraHealth():
+    def __init__(self, stall_timeout=2.0, base_backoff=0.5, max_backoff=30):
+        self.__stall_timeout = stall_timeout
+        self.__base_backoff = base_backoff
+        self.__max_backoff = max_backoff
+        self.__state = STATE_IDLE
+        self.__last_frame = None
+        self.__reconnects = 0
+        self.__failed_opens = 0
+        self.__lock = threading.Lock()
+
+    def frame_received(self, timestamp):
+        with self.__lock:
+            self.__last_frame = timestamp
+            self.__state = STATE_HEALTHY
+            self.__failed_opens = 0
+
+    def connecting(self):
+        with self.__lock:
+            self.__state = STATE_CONNECTING
+
+    def open_failed(self):
+        # returns how long to wait before the next attempt
+        with self.__lock:
+            self.__state = STATE_DISCONNECTED
+            self.__failed_opens += 1
+            exp = min(self.__failed_opens - 1, 16)
+            return min(self.__base_backoff * 2**exp, self.__max_backoff)
+
+    def opened(self, is_reconnect):
+        with self.__lock:
+            if is_reconnect: self.__reconnects += 1
+            # the stall timer starts from the moment the stream is back
+            self.__last_frame = time.monotonic()
+            self.__state = STATE_HEALTHY
+
+    def lost(self):
+        with self.__lock:
+            self.__state = STATE_DISCONNECTED
+
+    def is_stalled(self, now=None):
+        # frame-timestamp watchdog
+        now = time.monotonic() if now is None else now
+        with self.__lock:
+            return (self.__state == STATE_HEALTHY
+                    and self.__last_frame is not None
+                    and now - self.__last_frame > self.__stall_timeout)
+
+    def get_state(self):
+        if self.is_stalled(): return STATE_STALLED
+        with self.__lock:
+            return self.__state
+
+    def get_stats(self):
+        state = self.get_state()
+        with self.__lock:
+            return {
+                "state": state,
+                "reconnects": self.__reconnects,
+                "last_frame": self.__last_frame
+            }
@@ -0,0 +1,173 @@
+from services.frame_ring_buffer import FrameRingBuffer
+from services.camera_capture_thread import CameraCaptureThread
+from services.camera_health import CameraHealth
+from services.camera_format import negotiate_format
+import collections
+import threading
+import time
+import cv2
+
+# sources opened by any capture service, probing them again would open a
+# second handle on a live device
+_owned_sources = collections.Counter()
+_owned_lock = threading.Lock()
+
+
+def get_owned_sources():
+    with _owned_lock:
+        return set(_owned_sources.keys())
+
+
+class CaptureService():
+    JOIN_TIMEOUT = 2
+    SUPERVISE_INTERVAL = 0.5
+
+    def __init__(self,
+                 buffer_size=8,
+                 stall_timeout=2.0,
+                 base_backoff=0.5,
+                 max_backoff=30,
+                 camera_factory=cv2.VideoCapture):
+        self.__buffer_size = buffer_size
+        self.__stall_timeout = stall_timeout
+        self.__base_backoff = base_backoff
+        self.__max_backoff = max_backoff
+        self.__camera_factory = camera_factory
+        self.__lock = threading.Lock()
+        self.__buffers = []
+        self.__threads = []
+        self.__healths = []
+        self.__uris = []
+        self.__requested = []
+        self.__formats = []
+        self.__supervisor = None
+        self.__supervisor_stop = threading.Event()
+
+    def open(self, uris, formats=None):
+        # the service owns one capture per uri, opens it in the background,
+        # negotiates formats on every (re)open and replaces a capture that
+        # stops delivering frames
+        self.stop()
+        formats = formats or [None] * len(uris)
+        with _owned_lock:
+            _owned_sources.update(uris)
+        with self.__lock:
+            self.__uris = list(uris)
+            self.__requested = list(formats)
+            self.__formats = [None] * len(uris)
+            for idx in range(len(uris)):
+                self.__buffers.append(FrameRingBuffer(self.__buffer_size))
+                self.__healths.append(
+                    CameraHealth(self.__stall_timeout, self.__base_backoff,
+                                 self.__max_backoff))
+                self.__threads.append(self.__start_thread(idx, False))
+        self.__supervisor_stop.clear()
+        self.__supervisor = threading.Thread(target=self.__supervise,
+                                             name="capture-supervisor",
+                                             daemon=True)
+        self.__supervisor.start()
+
+    def start_manual(self, count):
+        # buffers without capture threads, filled through push()
+        self.stop()
+        self.__buffers = [
+            FrameRingBuffer(self.__buffer_size) for _ in range(count)
+        ]
+
+    def push(self, idx, timestamp, frame):
+        self.__buffers[idx].push(timestamp, frame)
+
+    def stop(self):
+        if self.__supervisor is not None:
+            self.__supervisor_stop.set()
+            self.__supervisor.join()
+            self.__supervisor = None
+        with self.__lock:
+            threads = self.__threads
+            self.__threads = []
+            self.__buffers = []
+            self.__healths = []
+            self.__formats = []
+            uris = self.__uris
+            self.__uris = []
+        with _owned_lock:
+            _owned_sources.subtract(uris)
+            for uri in set(uris):
+                if _owned_sources[uri] <= 0: del _owned_sources[uri]
+        for thread in threads:
+            thread.stop()
+        # a thread stuck in its driver is left behind, it releases its
+        # capture once read() returns
+        for thread in threads:
+            thread.join(self.JOIN_TIMEOUT)
+
+    def is_running(self):
+        return len(self.__threads) > 0
+
+    def get_buffer(self, idx) -> FrameRingBuffer:
+        return self.__buffers[idx]
+
+    def get_health(self, idx):
+        if idx is None or idx >= len(self.__healths): return None
+        return self.__healths[idx].get_stats()
+
+    def get_format(self, idx):
+        # what the driver granted, None before the camera opened
+        if idx is None or idx >= len(self.__formats): return None
+        return self.__formats[idx]
+
+    def latest(self, idx):
+        if idx is None or idx >= len(self.__buffers): return None, None
+        return self.__buffers[idx].latest()
+
+    def wait_newer(self, idx, timestamp, timeout):
+        # blocks until the camera has a frame newer than timestamp
+        if idx is None or idx >= len(self.__buffers):
+            time.sleep(timeout)
+            return None, None
+        return self.__buffers[idx].wait_newer(timestamp, timeout)
+
+    def window(self, idx, start, end):
+        if idx is None or idx >= len(self.__buffers): return []
+        return self.__buffers[idx].window(start, end)
+
+    def nearest(self, idx, timestamp):
+        if idx is None or idx >= len(self.__buffers): return None, None
+        return self.__buffers[idx].nearest(timestamp)
+
+    def __start_thread(self, idx, is_reconnect):
+        thread = CameraCaptureThread(self.__camera_factory(),
+                                     self.__buffers[idx],
+                                     name=f"capture-{idx}",
+                                     uri=self.__uris[idx],
+                                     health=self.__healths[idx],
+                                     on_open=self.__get_on_open(idx),
+                                     owns_camera=True,
+                                     is_reconnect=is_reconnect)
+        thread.start()
+        return thread
+
+    def __get_on_open(self, idx):
+        requested = self.__requested[idx]
+        if requested is None: return None
+        formats = self.__formats
+
+        def on_open(camera):
+            formats[idx] = negotiate_format(camera, requested)
+
+        return on_open
+
+    def __supervise(self):
+        # watchdog on the last frame timestamp, independent of the capture
+        # threads so a driver blocking inside read() is noticed as well
+        while not self.__supervisor_stop.wait(self.SUPERVISE_INTERVAL):
+            now = time.monotonic()
+            with self.__lock:
+                for idx, thread in enumerate(self.__threads):
+                    health = self.__healths[idx]
+                    if not health.is_stalled(now): continue
+                    # read() cannot be interrupted, the stalled thread is
+                    # abandoned with its capture and a new one takes over
+                    thread.stop()
+                    health.lost()
+                    self.__threads[idx] = self.__start_thread(idx, True)
@@ -0,0 +1,37 @@
+import numpy as np
+
+
+class DefectBatcher():
+    def __init__(self, max_batch=8):
+        self.__max_batch = max(1, max_batch)
+        self.__groups = []
+
+    def add(self, key, images):
+        if len(images) > 0:
+            self.__groups.append((key, images))
+
+    def __len__(self):
+        return sum(len(images) for _, images in self.__groups)
+
+    async def detect(self, manager, cfg):
+        flat = [img for _, images in self.__groups for img in images]
+        if len(flat) == 0: return {}
+        outputs = [[], [], [], []]
+        for start in range(0, len(flat), self.__max_batch):
+            batch = flat[start:start + self.__max_batch]
+            batch_results = await manager.detect_errors(cfg, batch, None)
+            # detect_errors converts the batch entries in place
+            flat[start:start + len(batch)] = batch
+            for idx, output in enumerate(batch_results):
+                outputs[idx].append(np.asarray(output))
+        outputs = [np.concatenate(output, axis=0) for output in outputs]
+
+        results = {}
+        offset = 0
+        for key, images in self.__groups:
+            count = len(images)
+            images[:] = flat[offset:offset + count]
+            results[key] = tuple(output[offset:offset + count]
+                                 for output in outputs)
+            offset += count
+        return results
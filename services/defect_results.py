@@ -0,0 +1,43 @@
+import numpy as np
+import cv2
+
+DEFECT_COLOR = (0, 0, 255)
+
+
+def prepare_display_images(images, img_size):
+    # uint8 copies at the model input size, detect_errors turns the batch it
+    # is given into float images in place
+    return [cv2.resize(img, tuple(img_size)) for img in images]
+
+
+def get_detections(boxes, scores, classes, img_size, min_score):
+    # every detection above min_score across the whole batch as flat arrays,
+    # image_idx tells which image each one belongs to
+    scores = np.asarray(scores)
+    mask = scores > min_score
+    image_idx = np.nonzero(mask)[0]
+    width, height = img_size
+    boxes = np.asarray(boxes)[mask] * np.array([width, height, width, height])
+    classes = np.asarray(classes)[mask].astype(int)
+    return image_idx, boxes, scores[mask], classes
+
+
+def count_defects(classes, classes_labels, defects=None):
+    defects = {} if defects is None else defects
+    counts = np.bincount(classes, minlength=len(classes_labels))
+    for cl in np.flatnonzero(counts).tolist():
+        label = classes_labels[cl]
+        defects[label] = defects.get(label, 0) + int(counts[cl])
+    return defects
+
+
+def draw_detections(images, detections, classes_labels):
+    image_idx, boxes, scores, classes = detections
+    for i, (xmin, ymin, xmax, ymax), score, cl in zip(
+            image_idx.tolist(),
+            boxes.astype(int).tolist(), scores.tolist(), classes.tolist()):
+        cv2.rectangle(images[i], (xmin, ymin), (xmax, ymax), DEFECT_COLOR, 2)
+        cv2.putText(images[i], f"{classes_labels[cl]}: {score:0.2f}",
+                    (xmin, ymin - 5), cv2.QT_FONT_NORMAL, 0.5, DEFECT_COLOR,
+                    1)
+    return images
@@ -0,0 +1,156 @@
+from services.stage_metrics import StageMetrics
+import sqlite3
+import threading
+import json
+import time
+import uuid
+import os
+
+# results of send_func, plain True/False keep working
+SEND_OK = True
+SEND_RETRY = False
+SEND_REJECTED = "rejected"
+
+
+class EventOutbox():
+    BATCH_SIZE = 20
+    JOIN_TIMEOUT = 5
+
+    def __init__(self,
+                 db_path,
+                 send_func,
+                 base_backoff=1,
+                 max_backoff=300,
+                 idle_wait=5):
+        folder = os.path.dirname(db_path)
+        if folder != "": os.makedirs(folder, exist_ok=True)
+        self.__send_func = send_func
+        self.__base_backoff = base_backoff
+        self.__max_backoff = max_backoff
+        self.__idle_wait = idle_wait
+        self.__lock = threading.Lock()
+        self.__wake_event = threading.Event()
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        self.__conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.__lock, self.__conn:
+            self.__conn.execute("PRAGMA journal_mode=WAL")
+            self.__conn.execute("""CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                created REAL NOT NULL)""")
+            self.__conn.execute("""CREATE INDEX IF NOT EXISTS
+                ix_outbox_next_attempt ON outbox (next_attempt)""")
+            # events the server refused, kept for inspection, never resent
+            self.__conn.execute("""CREATE TABLE IF NOT EXISTS dead_letter (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                failed REAL NOT NULL)""")
+
+    def start(self):
+        if self.__thread is not None: return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run,
+                                         name="event-outbox",
+                                         daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        if self.__thread is None: return
+        self.__stop_event.set()
+        self.__wake_event.set()
+        self.__thread.join(self.JOIN_TIMEOUT)
+        self.__thread = None
+
+    def close(self):
+        self.stop()
+        with self.__lock:
+            self.__conn.close()
+
+    def enqueue(self, payload, event_key=None):
+        event_key = event_key or str(uuid.uuid4())
+        now = time.time()
+        with self.__lock, self.__conn:
+            self.__conn.execute(
+                """INSERT OR IGNORE INTO outbox
+                (event_key, payload, next_attempt, created)
+                VALUES (?, ?, ?, ?)""",
+                (event_key, json.dumps(payload), now, now))
+        self.__wake_event.set()
+        return event_key
+
+    def get_pending_count(self):
+        with self.__lock:
+            row = self.__conn.execute("SELECT COUNT(*) FROM outbox").fetchone()
+        return row[0]
+
+    def get_dead_letter_count(self):
+        with self.__lock:
+            row = self.__conn.execute(
+                "SELECT COUNT(*) FROM dead_letter").fetchone()
+        return row[0]
+
+    def flush(self):
+        sent = 0
+        for row_id, event_key, payload, attempts in self.__get_due():
+            if self.__stop_event.is_set(): break
+            try:
+                with StageMetrics.instance().measure("submit_event"):
+                    result = self.__send_func(json.loads(payload), event_key)
+            except Exception as ex:
+                print(ex)
+                result = SEND_RETRY
+            if result == SEND_REJECTED:
+                self.__dead_letter(row_id, attempts + 1)
+            elif result is SEND_OK:
+                self.__delete(row_id)
+                sent += 1
+            else:
+                self.__reschedule(row_id, attempts + 1)
+        return sent
+
+    def __run(self):
+        while not self.__stop_event.is_set():
+            self.flush()
+            self.__wake_event.wait(self.__get_wait_time())
+            self.__wake_event.clear()
+
+    def __get_due(self):
+        with self.__lock:
+            return self.__conn.execute(
+                """SELECT id, event_key, payload, attempts FROM outbox
+                WHERE next_attempt <= ? ORDER BY id LIMIT ?""",
+                (time.time(), self.BATCH_SIZE)).fetchall()
+
+    def __get_wait_time(self):
+        with self.__lock:
+            row = self.__conn.execute(
+                "SELECT MIN(next_attempt) FROM outbox").fetchone()
+        if row[0] is None: return self.__idle_wait
+        return min(max(row[0] - time.time(), 0), self.__idle_wait)
+
+    def __delete(self, row_id):
+        with self.__lock, self.__conn:
+            self.__conn.execute("DELETE FROM outbox WHERE id = ?", (row_id, ))
+
+    def __dead_letter(self, row_id, attempts):
+        with self.__lock, self.__conn:
+            self.__conn.execute(
+                """INSERT OR IGNORE INTO dead_letter
+                (event_key, payload, attempts, failed)
+                SELECT event_key, payload, ?, ? FROM outbox WHERE id = ?""",
+                (attempts, time.time(), row_id))
+            self.__conn.execute("DELETE FROM outbox WHERE id = ?", (row_id, ))
+
+    def __reschedule(self, row_id, attempts):
+        backoff = min(self.__base_backoff * (2**min(attempts - 1, 16)),
+                      self.__max_backoff)
+        with self.__lock, self.__conn:
+            self.__conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?",
+                (attempts, time.time() + backoff, row_id))
@@ -0,0 +1,56 @@
+import collections
+import threading
+
+
+class FrameRingBuffer():
+    def __init__(self, capacity=8):
+        self.__frames = collections.deque(maxlen=capacity)
+        self.__cond = threading.Condition()
+
+    def push(self, timestamp, frame):
+        with self.__cond:
+            self.__frames.append((timestamp, frame))
+            self.__cond.notify_all()
+
+    def latest(self):
+        with self.__cond:
+            if len(self.__frames) == 0: return None, None
+            return self.__frames[-1]
+
+    def wait_newer(self, timestamp, timeout=None):
+        # the newest frame once it is newer than timestamp, (None, None) when
+        # nothing new arrives in time
+        with self.__cond:
+            if not self.__cond.wait_for(
+                    lambda: len(self.__frames) > 0 and
+                (timestamp is None or self.__frames[-1][0] > timestamp),
+                    timeout):
+                return None, None
+            return self.__frames[-1]
+
+    def nearest(self, timestamp):
+        with self.__cond:
+            best = (None, None)
+            best_diff = None
+            for item in self.__frames:
+                diff = abs(item[0] - timestamp)
+                if best_diff is None or diff < best_diff:
+                    best, best_diff = item, diff
+            return best
+
+    def window(self, start, end):
+        # frames with start <= timestamp <= end, oldest first
+        with self.__cond:
+            return [item for item in self.__frames if start <= item[0] <= end]
+
+    def snapshot(self):
+        with self.__cond:
+            return list(self.__frames)
+
+    def clear(self):
+        with self.__cond:
+            self.__frames.clear()
+
+    def __len__(self):
+        with self.__cond:
+            return len(self.__frames)
@@ -0,0 +1,181 @@
+from services.bounded_queue import BoundedQueue, POLICY_BLOCK
+import sqlite3
+import threading
+import queue
+import json
+import time
+import os
+
+
+class HistoryStore():
+    POLL_TIMEOUT = 0.1
+    JOIN_TIMEOUT = 10
+
+    def __init__(self,
+                 db_path,
+                 batch_size=500,
+                 flush_interval=1.0,
+                 queue_size=10000):
+        folder = os.path.dirname(db_path)
+        if folder != "": os.makedirs(folder, exist_ok=True)
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__queue_size = queue_size
+        self.__queue = BoundedQueue(queue_size, POLICY_BLOCK)
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__stopping = False
+        self.__written = 0
+        self.__conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.__lock, self.__conn:
+            self.__conn.execute("PRAGMA journal_mode=WAL")
+            self.__conn.execute("PRAGMA synchronous=NORMAL")
+            self.__conn.execute("""CREATE TABLE IF NOT EXISTS products (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                time REAL NOT NULL,
+                camera TEXT,
+                track_id INTEGER,
+                defect_types TEXT NOT NULL,
+                size_diff_h REAL,
+                size_diff_w REAL,
+                asym_left REAL,
+                asym_right REAL,
+                color_left REAL,
+                color_right REAL,
+                left_image TEXT,
+                right_image TEXT,
+                side_images TEXT)""")
+            self.__conn.execute("""CREATE INDEX IF NOT EXISTS
+                ix_products_time ON products (time)""")
+            # one row per defect type of a product, the index covers
+            # "type X between t1 and t2" without touching products
+            self.__conn.execute("""CREATE TABLE IF NOT EXISTS
+                product_defects (
+                product_id INTEGER NOT NULL,
+                defect_type TEXT NOT NULL,
+                time REAL NOT NULL)""")
+            self.__conn.execute("""CREATE INDEX IF NOT EXISTS
+                ix_product_defects_type_time
+                ON product_defects (defect_type, time, product_id)""")
+
+    def start(self):
+        if self.__thread is not None: return
+        self.__stopping = False
+        self.__queue = BoundedQueue(self.__queue_size, POLICY_BLOCK)
+        self.__thread = threading.Thread(target=self.__run,
+                                         name="history-store",
+                                         daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        # pending records are written before the thread exits
+        if self.__thread is None: return
+        self.__stopping = True
+        self.__queue.close()
+        self.__thread.join(self.JOIN_TIMEOUT)
+        self.__thread = None
+
+    def close(self):
+        self.stop()
+        with self.__lock:
+            self.__conn.close()
+
+    def record(self, entry):
+        return self.__queue.put(entry)
+
+    def get_stats(self):
+        return {"queue_depth": self.__queue.qsize(), "written": self.__written}
+
+    def query(self, start, end, defect_type=None, limit=1000):
+        # products in [start, end), newest first
+        with self.__lock:
+            if defect_type is None:
+                cursor = self.__conn.execute(
+                    """SELECT * FROM products WHERE time >= ? AND time < ?
+                    ORDER BY time DESC LIMIT ?""", (start, end, limit))
+            else:
+                cursor = self.__conn.execute(
+                    """SELECT p.* FROM product_defects d
+                    JOIN products p ON p.id = d.product_id
+                    WHERE d.defect_type = ? AND d.time >= ? AND d.time < ?
+                    ORDER BY d.time DESC LIMIT ?""",
+                    (defect_type, start, end, limit))
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+        results = []
+        for row in rows:
+            item = dict(zip(columns, row))
+            item["defect_types"] = json.loads(item["defect_types"])
+            item["side_images"] = json.loads(item["side_images"] or "[]")
+            results.append(item)
+        return results
+
+    def count(self, start, end, defect_type=None):
+        with self.__lock:
+            if defect_type is None:
+                row = self.__conn.execute(
+                    """SELECT COUNT(*) FROM products
+                    WHERE time >= ? AND time < ?""", (start, end)).fetchone()
+            else:
+                row = self.__conn.execute(
+                    """SELECT COUNT(*) FROM product_defects
+                    WHERE defect_type = ? AND time >= ? AND time < ?""",
+                    (defect_type, start, end)).fetchone()
+        return row[0]
+
+    def count_by_defect(self, start, end, defect_types):
+        # one index range scan per type instead of a GROUP BY over the range
+        return {
+            defect_type: self.count(start, end, defect_type)
+            for defect_type in defect_types
+        }
+
+    def __run(self):
+        while True:
+            batch = self.__take_batch()
+            if len(batch) > 0:
+                try:
+                    self.__write(batch)
+                except Exception as ex:
+                    print(ex)
+            elif self.__stopping:
+                break
+
+    def __take_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.__flush_interval
+        while len(batch) < self.__batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0: break
+            try:
+                batch.append(self.__queue.get(min(timeout,
+                                                  self.POLL_TIMEOUT)))
+            except queue.Empty:
+                if self.__stopping: break
+        return batch
+
+    def __write(self, batch):
+        with self.__lock, self.__conn:
+            for entry in batch:
+                size_diff = entry.get("size_diff") or (None, None)
+                asym = entry.get("asym_scores") or (None, None)
+                color = entry.get("color_scores") or (None, None)
+                defect_types = sorted(entry.get("defect_types", []))
+                cursor = self.__conn.execute(
+                    """INSERT INTO products (time, camera, track_id,
+                    defect_types, size_diff_h, size_diff_w, asym_left,
+                    asym_right, color_left, color_right, left_image,
+                    right_image, side_images)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (entry["time"], entry.get("camera"),
+                     entry.get("track_id"), json.dumps(defect_types),
+                     size_diff[0], size_diff[1], asym[0], asym[1], color[0],
+                     color[1],
+                     entry.get("left_image"), entry.get("right_image"),
+                     json.dumps(entry.get("side_images", []))))
+                self.__conn.executemany(
+                    """INSERT INTO product_defects
+                    (product_id, defect_type, time) VALUES (?, ?, ?)""",
+                    [(cursor.lastrowid, defect_type, entry["time"])
+                     for defect_type in defect_types])
+        self.__written += len(batch)
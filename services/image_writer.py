@@ -0,0 +1,137 @@
+from services.bounded_queue import BoundedQueue, POLICY_BLOCK
+from services.stage_metrics import StageMetrics
+from services.storage_layout import StorageLayout, LAYOUT_FLAT, write_pack
+import threading
+import queue
+import uuid
+import cv2
+
+FORMAT_PARAMS = {
+    "jpg": cv2.IMWRITE_JPEG_QUALITY,
+    "webp": cv2.IMWRITE_WEBP_QUALITY,
+    "png": cv2.IMWRITE_PNG_COMPRESSION
+}
+
+
+class ImageWriter():
+    POLL_TIMEOUT = 0.1
+    JOIN_TIMEOUT = 10
+
+    def __init__(self,
+                 storage_path,
+                 workers=2,
+                 image_format="jpg",
+                 quality=90,
+                 queue_size=64,
+                 layout=LAYOUT_FLAT,
+                 shard_chars=2,
+                 pack=False,
+                 png_compression=3):
+        if image_format not in FORMAT_PARAMS:
+            raise ValueError(f"Unsupported image format: {image_format}")
+        self.__layout = StorageLayout(storage_path, layout, shard_chars, pack)
+        self.__workers = workers
+        self.__ext = "." + image_format
+        # png takes a 0-9 compression level, not a quality
+        level = png_compression if image_format == "png" else quality
+        self.__params = [FORMAT_PARAMS[image_format], level]
+        self.__queue = BoundedQueue(queue_size, POLICY_BLOCK)
+        self.__queue_size = queue_size
+        self.__threads = []
+        self.__stopping = False
+        self.__stats_lock = threading.Lock()
+        self.__written = 0
+        self.__failed = 0
+
+    def start(self):
+        if len(self.__threads) > 0: return
+        self.__stopping = False
+        self.__queue = BoundedQueue(self.__queue_size, POLICY_BLOCK)
+        for i in range(self.__workers):
+            thread = threading.Thread(target=self.__run,
+                                      name=f"image-writer-{i}",
+                                      daemon=True)
+            self.__threads.append(thread)
+            thread.start()
+
+    def stop(self):
+        self.__stopping = True
+        self.__queue.close()
+        for thread in self.__threads:
+            thread.join(self.JOIN_TIMEOUT)
+        self.__threads = []
+
+    def submit(self, cur, images, event_id=None, on_written=None):
+        # returns the file of each image, or None when the writer does not
+        # take the event. on_written(files) is called from a worker once
+        # every image is on disk
+        event_id = event_id or uuid.uuid4().hex
+        folder = self.__layout.get_event_folder(cur, event_id)
+        self.__layout.ensure_folder(folder)
+        pack_path, _ = self.__layout.get_refs(folder, event_id, len(images),
+                                              self.__ext)
+        files = self.__layout.get_files(folder, event_id, len(images),
+                                        self.__ext)
+        if not self.__queue.put(
+            (event_id, cur, pack_path, files, images, on_written)):
+            return None
+        return files
+
+    def get_layout(self) -> StorageLayout:
+        return self.__layout
+
+    def get_queue_depth(self):
+        return self.__queue.qsize()
+
+    def get_stats(self):
+        with self.__stats_lock:
+            written, failed = self.__written, self.__failed
+        return {
+            "queue_depth": self.__queue.qsize(),
+            "written": written,
+            "failed": failed
+        }
+
+    def __run(self):
+        while True:
+            try:
+                job = self.__queue.get(self.POLL_TIMEOUT)
+            except queue.Empty:
+                if self.__stopping: break
+                continue
+            files, on_written = job[3], job[5]
+            try:
+                with StageMetrics.instance().measure("imwrite"):
+                    self.__write_event(*job[:5])
+                with self.__stats_lock:
+                    self.__written += len(files)
+            except Exception as ex:
+                with self.__stats_lock:
+                    self.__failed += len(files)
+                print(ex)
+                continue
+            if on_written is not None:
+                try:
+                    on_written(files)
+                except Exception as ex:
+                    print(ex)
+
+    def __write_event(self, event_id, cur, pack_path, files, images):
+        layout = self.__layout
+        buffers = []
+        for path, img in zip(files, images):
+            is_success, buf = cv2.imencode(self.__ext, img, self.__params)
+            if not is_success: raise Exception(f"Error encoding {path}")
+            buffers.append(buf.tobytes())
+        entry = {"event": event_id, "time": cur.timestamp()}
+        if pack_path is not None:
+            entry["pack"] = pack_path
+            entry["offsets"] = write_pack(layout.get_abs_path(pack_path),
+                                          buffers)
+        # readers of the api and the history open plain files, a packed
+        # event is unpacked next to its pack
+        for path, buf in zip(files, buffers):
+            with open(layout.get_abs_path(path), "wb") as fo:
+                fo.write(buf)
+        entry["files"] = files
+        layout.append_index(layout.get_day(cur), entry)
@@ -0,0 +1,546 @@
+from FQCS import helper, fqcs_constants
+from FQCS.manager import FQCSManager
+from services.bounded_queue import BoundedQueue, POLICY_BLOCK, POLICY_DROP_OLDEST
+from services.pipeline_stage import PipelineStage
+from services.capture_service import CaptureService
+from services.async_runtime import AsyncRuntime
+from services.inspection_process_pool import InspectionProcessPool
+from services.defect_batcher import DefectBatcher
+from services.sample_feature_cache import SampleFeatureCache
+from services.image_writer import ImageWriter
+from services.event_outbox import EventOutbox
+from services.history_store import HistoryStore
+from services.qc_event_client import get_created_time_str
+from services.stage_metrics import StageMetrics
+from services.roi_extractor import RoiExtractor, get_roi_bounds
+from services.motion_gate import MotionGate
+from services.product_tracker import ProductTracker, get_group_bounds
+from services.camera_format import fit_frame
+from services.defect_results import prepare_display_images, get_detections, \
+    count_defects, draw_detections
+import threading
+import cv2
+import trio
+import datetime
+
+DEFAULT_QUEUES = {
+    "frame": {
+        "size": 1,
+        "policy": POLICY_DROP_OLDEST
+    },
+    "box": {
+        "size": 1,
+        "policy": POLICY_DROP_OLDEST
+    },
+    "pair": {
+        "size": 4,
+        "policy": POLICY_BLOCK
+    },
+    "persist": {
+        "size": 16,
+        "policy": POLICY_BLOCK
+    }
+}
+MODE_THREAD = "thread"
+MODE_PROCESS = "process"
+
+
+class InspectionPipeline():
+    JOIN_TIMEOUT = 2
+    CAPTURE_WAIT = 0.1
+
+    def __init__(self,
+                 manager: FQCSManager,
+                 capture_service: CaptureService,
+                 storage_path,
+                 outbox: EventOutbox = None,
+                 pipeline_cfg=None,
+                 writer_cfg=None,
+                 config_folder=None,
+                 on_frame=None,
+                 on_pair=None,
+                 on_result=None,
+                 on_error=print,
+                 history: HistoryStore = None):
+        pipeline_cfg = pipeline_cfg or {}
+        writer_cfg = writer_cfg or {}
+        self.__manager = manager
+        self.__capture_service = capture_service
+        self.__image_writer = ImageWriter(storage_path,
+                                          writer_cfg.get("workers", 2),
+                                          writer_cfg.get("format", "jpg"),
+                                          writer_cfg.get("quality", 90),
+                                          writer_cfg.get("queue_size", 64),
+                                          writer_cfg.get("layout", "flat"),
+                                          writer_cfg.get("shard_chars", 2),
+                                          writer_cfg.get("pack", False),
+                                          writer_cfg.get("png_compression",
+                                                         3))
+        self.__outbox = outbox
+        self.__history = history
+        self.__on_frame = on_frame
+        self.__on_pair = on_pair
+        self.__on_result = on_result
+        self.__on_error = on_error
+        self.__inspect_workers = pipeline_cfg.get("inspect_workers", 2)
+        self.__max_inference_batch = pipeline_cfg.get("max_inference_batch",
+                                                      8)
+        self.__side_frame_tolerance = pipeline_cfg.get(
+            "side_frame_tolerance_ms", 200) / 1000
+        self.__roi_margin = pipeline_cfg.get("roi_margin", 0.02)
+        self.__roi_extractor = None
+        if pipeline_cfg.get("roi_mode", False):
+            self.__roi_extractor = RoiExtractor(manager, self.__roi_margin)
+        self.__motion_gate = None
+        self.__motion_bounds = None
+        gate_cfg = pipeline_cfg.get("motion_gate", {})
+        if gate_cfg.get("enabled", False):
+            self.__motion_gate = MotionGate(
+                gate_cfg.get("sensitivity", 0.005),
+                gate_cfg.get("threshold", 25), gate_cfg.get("width", 64),
+                gate_cfg.get("learning_rate", 0.05),
+                gate_cfg.get("force_interval", 1.0))
+        self.__tracker = None
+        tracker_cfg = pipeline_cfg.get("tracker", {})
+        if tracker_cfg.get("enabled", False):
+            self.__tracker = ProductTracker(
+                tracker_cfg.get("iou_threshold", 0.3),
+                tracker_cfg.get("max_distance", 80),
+                tracker_cfg.get("max_missed", 5),
+                tracker_cfg.get("max_idle", 30))
+        self.__process_pool = None
+        if pipeline_cfg.get("inspection_mode", MODE_THREAD) == MODE_PROCESS:
+            if config_folder is not None:
+                process_workers = pipeline_cfg.get("process_workers")
+                self.__process_pool = InspectionProcessPool(
+                    config_folder, process_workers)
+                # keep enough pair consumers to feed every process
+                self.__inspect_workers = max(self.__inspect_workers,
+                                             process_workers or 1)
+            else:
+                print("No saved config folder, inspecting pairs in threads")
+        self.__queues = {}
+        queues_cfg = pipeline_cfg.get("queues", {})
+        for key, default in DEFAULT_QUEUES.items():
+            q_cfg = queues_cfg.get(key, default)
+            self.__queues[key] = BoundedQueue(
+                q_cfg.get("size", default["size"]),
+                q_cfg.get("policy", default["policy"]))
+        self.__stages = []
+        self.__capture_thread = None
+        self.__capture_stop = threading.Event()
+        self.__capturing = threading.Event()
+        self.__main_cfg = None
+        self.__pre_sample_left = None
+        self.__pre_sample_right = None
+
+    def start(self, capture_idx=None):
+        # with capture_idx the pipeline pulls the newest frames of that
+        # camera itself, otherwise frames come in through submit_frame()
+        _, self.__main_cfg = self.__manager.get_main_config()
+        self.__pre_sample_left, self.__pre_sample_right = SampleFeatureCache.instance(
+        ).get_preprocessed_samples(self.__manager, self.__main_cfg)
+        if self.__tracker is not None:
+            self.__tracker.reset()
+        if self.__motion_gate is not None:
+            self.__motion_gate.reset()
+            self.__motion_bounds = get_roi_bounds(
+                self.__main_cfg, self.__main_cfg["frame_width"],
+                self.__roi_margin)
+        if self.__process_pool is not None:
+            self.__process_pool.start()
+        self.__image_writer.start()
+        queues = self.__queues
+        self.__add_stage("extract", self.__extract_stage, queues["frame"],
+                         queues["box"])
+        self.__add_stage("group", self.__group_stage, queues["box"],
+                         queues["pair"])
+        for i in range(self.__inspect_workers):
+            self.__add_stage(f"inspect-{i}", self.__inspect_stage,
+                             queues["pair"], queues["persist"])
+        self.__add_stage("persist", self.__persist_stage, queues["persist"])
+        for stage in self.__stages:
+            stage.start()
+        if capture_idx is not None:
+            self.__capturing.set()
+            self.__capture_stop.clear()
+            self.__capture_thread = threading.Thread(
+                target=self.__capture_loop,
+                args=(capture_idx, ),
+                name="capture",
+                daemon=True)
+            self.__capture_thread.start()
+
+    def stop(self):
+        if self.__capture_thread is not None:
+            self.__capture_stop.set()
+            self.__capture_thread.join(self.JOIN_TIMEOUT)
+            self.__capture_thread = None
+        for q in self.__queues.values():
+            q.close()
+        for stage in self.__stages:
+            stage.stop()
+        for stage in self.__stages:
+            stage.join(self.JOIN_TIMEOUT)
+        self.__stages = []
+        self.__image_writer.stop()
+        if self.__process_pool is not None:
+            self.__process_pool.stop()
+
+    def drain(self, timeout=None):
+        # queues are joined in flow order, stages hand results on before
+        # marking their input done
+        for key in DEFAULT_QUEUES.keys():
+            if not self.__queues[key].join(timeout): return False
+        return True
+
+    def submit_frame(self, timestamp, image):
+        return self.__queues["frame"].put((timestamp, image))
+
+    def set_capturing(self, capturing):
+        if capturing: self.__capturing.set()
+        else: self.__capturing.clear()
+
+    def is_capturing(self):
+        return self.__capturing.is_set()
+
+    def get_queue_stats(self):
+        stats = {}
+        for key, q in self.__queues.items():
+            stats[key] = (q.qsize(), q.get_maxsize(), q.get_dropped())
+        return stats
+
+    def get_motion_stats(self):
+        if self.__motion_gate is None: return None
+        return self.__motion_gate.get_stats()
+
+    def get_writer_stats(self):
+        return self.__image_writer.get_stats()
+
+    def get_main_config(self):
+        return self.__main_cfg
+
+    def __add_stage(self, name, func, in_queue, out_queue=None):
+        stage = PipelineStage(name, func, in_queue, out_queue,
+                              self.__on_error)
+        self.__stages.append(stage)
+
+    def __extract_boxes(self, cfg, image):
+        if self.__roi_extractor is not None:
+            return self.__roi_extractor.extract_boxes(cfg, image)
+        return self.__manager.extract_boxes(cfg, image)
+
+    def __capture_loop(self, idx):
+        # runs at the sensor rate, independent of the GUI, the frame queue
+        # keeps only the newest frame when the stages fall behind
+        last_time = None
+        while not self.__capture_stop.is_set():
+            timestamp, image = self.__capture_service.wait_newer(
+                idx, last_time, self.CAPTURE_WAIT)
+            if image is None: continue
+            last_time = timestamp
+            if self.__capturing.is_set(): self.submit_frame(timestamp, image)
+
+    # stages
+    def __extract_stage(self, item):
+        timestamp, image = item
+        main_cfg = self.__main_cfg
+        frame_width, frame_height = main_cfg["frame_width"], main_cfg[
+            "frame_height"]
+        image = fit_frame(image, frame_width, frame_height)
+        if self.__motion_gate is not None and not self.__motion_gate.check(
+                timestamp, image, self.__motion_bounds):
+            # idle belt, only the preview needs this frame and the tracker
+            # the time that went by
+            if self.__on_frame is not None:
+                self.__on_frame((image, None, [], []))
+            if self.__tracker is None: return None
+            return (timestamp, image, None, None)
+        with StageMetrics.instance().measure("extract_boxes"):
+            boxes, proc = self.__extract_boxes(main_cfg, image)
+        return (timestamp, image, boxes, proc)
+
+    def __group_stage(self, item):
+        timestamp, image, boxes, proc = item
+        if boxes is None:
+            # gated frame, nothing moved so tracks are not counted as missed
+            self.__tracker.gated(timestamp)
+            return None
+        main_cfg = self.__main_cfg
+        with StageMetrics.instance().measure("detect_groups"):
+            final_grouped, sizes, check_group_idx, pair, split_left, split_right, image_detect = self.__manager.detect_groups_and_checked_pair(
+                main_cfg, boxes, image)
+        if self.__on_frame is not None:
+            self.__on_frame((image, proc, final_grouped, sizes))
+        track_ids = [None] * len(final_grouped)
+        if self.__tracker is not None:
+            track_ids = self.__tracker.update(
+                [get_group_bounds(group) for group in final_grouped],
+                timestamp)
+        if pair is None: return None
+        self.__manager.check_group(check_group_idx, final_grouped)
+        track_id = track_ids[check_group_idx]
+        # the same product crossing the stop line again is not re-inspected
+        if track_id is not None and not self.__tracker.mark_inspected(
+                track_id):
+            return None
+        cur = datetime.datetime.now()
+        # side frames are taken now, by the time the pair is inspected the
+        # side ring buffers may have moved past the trigger
+        side_frames = self.__snapshot_side_frames(timestamp)
+        if self.__on_pair is not None:
+            left, right = pair
+            self.__on_pair((cur, cv2.flip(left[0], 1), right[0]))
+        return (cur, timestamp, track_id, check_group_idx, sizes, pair,
+                side_frames)
+
+    def __inspect_stage(self, item):
+        # every inspect worker feeds its own long-lived loop so pairs are
+        # inspected in parallel, the FQCS calls inside never yield
+        return AsyncRuntime.instance().run_local(self.__process_pair, *item)
+
+    def __persist_stage(self, item):
+        cur, defect_types, save_images, record = item
+        refs = self.__image_writer.submit(
+            cur, save_images, on_written=lambda images: self.__on_saved(
+                cur, defect_types, record, images))
+        if refs is None:
+            self.__on_error(Exception("Image writer is stopped, result of "
+                                      f"{cur} is not saved"))
+        return None
+
+    def __on_saved(self, cur, defect_types, record, images):
+        # runs on an image writer thread once the files exist
+        if self.__history is not None:
+            record["left_image"] = images[0]
+            record["right_image"] = images[1]
+            record["side_images"] = images[2:]
+            self.__history.record(record)
+
+        # send to api in background
+        if self.__outbox is not None:
+            # the inspection time, not the time a retry finally gets through
+            self.__outbox.enqueue({
+                "created_time_str": get_created_time_str(cur),
+                "defect_types": sorted(defect_types),
+                "left_image": images[0],
+                "right_image": images[1],
+                "side_images": images[2:]
+            })
+
+    async def __process_pair(self, cur: datetime.datetime, timestamp,
+                             track_id, check_group_idx, sizes, pair,
+                             side_frames):
+        manager = self.__manager
+        main_cfg = self.__main_cfg
+        metrics = StageMetrics.instance()
+        check_size = sizes[check_group_idx]
+        h_diff, w_diff = manager.compare_size(main_cfg, check_size)
+
+        left, right = pair
+        left, right = left[0], right[0]
+        left = cv2.flip(left, 1)
+        images = [left, right]
+        final_save_images = [left.copy(), right.copy()]
+        # Similarity compare
+        color_results = None
+        if self.__process_pool is not None:
+            with metrics.measure("inspect_pair_process"):
+                left_result, right_result, color_results = await trio.to_thread.run_sync(
+                    self.__process_pool.inspect_pair, main_cfg, left, right)
+        else:
+            pre_left, pre_right = manager.preprocess_images(
+                main_cfg, left, right)
+            with metrics.measure("detect_asym"):
+                left_result, right_result = await manager.detect_asym(
+                    main_cfg, pre_left, pre_right, self.__pre_sample_left,
+                    self.__pre_sample_right, None)
+        is_asym_diff_left, avg_asym_left, avg_amp_left, recalc_left, res_list_l, amp_res_list_l = left_result
+        is_asym_diff_right, avg_asym_right, avg_amp_right, recalc_right, res_list_r, amp_res_list_r = right_result
+        has_asym = is_asym_diff_left or is_asym_diff_right
+        has_color_checked, has_error_checked = False, False
+        result_dict = {}
+        skipped_sides = []
+        async with trio.open_nursery() as nursery:
+            if has_asym:
+                if main_cfg["is_color_enable"]:
+                    has_color_checked = True
+                    if color_results is not None:
+                        result_dict["color_results"] = color_results
+                    else:
+                        nursery.start_soon(self.__compare_colors, main_cfg,
+                                           pre_left, pre_right,
+                                           (result_dict, "color_results"))
+
+                if main_cfg["is_defect_enable"]:
+                    has_error_checked = True
+
+            configs = manager.get_configs()
+            for idx, cfg in enumerate(configs):
+                if cfg["is_main"] == True: continue
+                cfg_name = cfg["name"]
+                nursery.start_soon(self.__activate_side_cam, cfg, idx,
+                                   timestamp, side_frames.get(idx, []),
+                                   skipped_sides,
+                                   (result_dict, f"side_result_{cfg_name}"))
+
+        # one inference pass for the main pair and every side camera, the
+        # results are drawn on uint8 copies rather than the model input
+        err_cfg = main_cfg["err_cfg"]
+        img_size = err_cfg["img_size"]
+        batcher = DefectBatcher(self.__max_inference_batch)
+        detected_images = None
+        if has_error_checked:
+            detected_images = prepare_display_images(images, img_size)
+            batcher.add("main", images)
+        side_results = []
+        for key in result_dict.keys():
+            if key.startswith("side_result_"):
+                result = result_dict[key]
+                if result is not None:
+                    side_save_images, side_images = result
+                    side_results.append(
+                        (key, side_save_images,
+                         prepare_display_images(side_images, img_size)))
+                    batcher.add(key, side_images)
+        with metrics.measure("detect_errors"):
+            err_results = await batcher.detect(manager, main_cfg)
+
+        defect_types = set()
+        if h_diff or w_diff:
+            defect_types.add(fqcs_constants.SIZE_MISMATCH)
+        if is_asym_diff_left or is_asym_diff_right:
+            defect_types.add(fqcs_constants.SAMPLE_MISMATCH)
+
+        defects = {}
+        if has_error_checked:
+            self.__parse_defects_detection_result(detected_images,
+                                                  err_results["main"],
+                                                  err_cfg, defects)
+
+        side_images_list = []
+        for key, side_save_images, side_images in side_results:
+            final_save_images.extend(side_save_images)
+            self.__parse_defects_detection_result(side_images,
+                                                  err_results[key], err_cfg,
+                                                  defects)
+            side_images_list.append(side_images)
+
+        for key in defects.keys():
+            defect_types.add(key)
+
+        color_diff = None
+        if has_color_checked:
+            left_c_results = result_dict["color_results"][0]
+            right_c_results = result_dict["color_results"][1]
+            color_diff = (left_c_results[3], right_c_results[3])
+            if left_c_results[3] or right_c_results[3]:
+                defect_types.add(fqcs_constants.COLOR_MISMATCH)
+
+        result = {
+            "time": cur,
+            "timestamp": timestamp,
+            "track_id": track_id,
+            "size_diff": (h_diff, w_diff),
+            "asym_diff": (is_asym_diff_left, is_asym_diff_right),
+            "color_diff": color_diff,
+            "defects": defects,
+            "defect_types": defect_types,
+            "detected_images": detected_images,
+            "side_images": side_images_list,
+            "skipped_sides": sorted(skipped_sides),
+        }
+        metrics.record_latency(timestamp)
+        if self.__on_result is not None:
+            self.__on_result(result)
+        left_size, right_size = check_size
+        record = {
+            "time": cur.timestamp(),
+            "camera": main_cfg["name"],
+            "track_id": track_id,
+            "defect_types": defect_types,
+            "size_diff": (abs(left_size[0] - right_size[0]),
+                          abs(left_size[1] - right_size[1])),
+            "asym_scores": (avg_asym_left, avg_asym_right),
+            "color_scores": None
+        }
+        if has_color_checked:
+            record["color_scores"] = (left_c_results[1], right_c_results[1])
+        return (cur, defect_types, final_save_images, record)
+
+    async def __compare_colors(self, cfg, pre_left, pre_right, result_info):
+        with StageMetrics.instance().measure("compare_colors"):
+            return await self.__manager.compare_colors(
+                cfg, pre_left, pre_right, self.__pre_sample_left,
+                self.__pre_sample_right, True, result_info)
+
+    async def __activate_side_cam(self, cfg, cam_idx, trigger_time, frames,
+                                  skipped_sides, result_info):
+        manager = self.__manager
+        image = await self.__get_side_frame(cfg, cam_idx, trigger_time,
+                                            frames)
+        if image is None:
+            # reported with the result, a side that was not inspected must
+            # not look like a side without defects
+            skipped_sides.append(cfg["name"])
+            self.__on_error(
+                Exception(f"No frame of {cfg['name']} near the trigger, "
+                          "side camera skipped"))
+            return helper.return_result(None, result_info)
+        frame_width, frame_height = cfg["frame_width"], cfg["frame_height"]
+        resized_image = fit_frame(image, frame_width, frame_height)
+        boxes, proc = self.__extract_boxes(cfg, resized_image)
+        image_detect = resized_image.copy()
+        pair, image_detect, boxes = manager.detect_pair_side_cam(
+            cfg, boxes, image_detect)
+        result = None
+        if (pair is not None and len(pair) > 0):
+            images = [item[0] for item in pair]
+            save_images = [img.copy() for img in images]
+            result = (save_images, images)
+        return helper.return_result(result, result_info)
+
+    def __get_side_target(self, cfg, trigger_time):
+        return trigger_time + cfg.get("frame_offset_ms", 0) / 1000
+
+    def __snapshot_side_frames(self, trigger_time):
+        # the frames around each side camera's target, only references to
+        # frames already in the ring buffers
+        side_frames = {}
+        tolerance = self.__side_frame_tolerance
+        for idx, cfg in enumerate(self.__manager.get_configs()):
+            if cfg["is_main"] == True: continue
+            target = self.__get_side_target(cfg, trigger_time)
+            side_frames[idx] = self.__capture_service.window(
+                idx, target - tolerance, target + tolerance)
+        return side_frames
+
+    async def __get_side_frame(self, cfg, cam_idx, trigger_time, frames):
+        target = self.__get_side_target(cfg, trigger_time)
+        candidates = list(frames)
+        latest_time, _ = self.__capture_service.latest(cam_idx)
+        if latest_time is not None:
+            wait = target - latest_time
+            if 0 < wait <= self.__side_frame_tolerance:
+                # the matching frame had not been grabbed at the trigger
+                await trio.sleep(wait)
+            candidates.append(self.__capture_service.nearest(cam_idx, target))
+        best_time, best_image = None, None
+        for frame_time, image in candidates:
+            if frame_time is None: continue
+            if best_time is None or abs(frame_time - target) < abs(best_time -
+                                                                    target):
+                best_time, best_image = frame_time, image
+        if best_time is None or abs(best_time -
+                                    target) > self.__side_frame_tolerance:
+            return None
+        return best_image
+
+    def __parse_defects_detection_result(self, images, err_result, err_cfg,
+                                         defects):
+        boxes, scores, classes, valid_detections = err_result
+        detections = get_detections(boxes, scores, classes,
+                                    err_cfg["img_size"],
+                                    err_cfg["yolo_score_threshold"])
+        draw_detections(images, detections, err_cfg["classes"])
+        count_defects(detections[3], err_cfg["classes"], defects)
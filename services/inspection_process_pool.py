@@ -0,0 +1,94 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+from services.sample_feature_cache import SampleFeatureCache
+import numpy as np
+import trio
+import os
+
+_worker_manager = None
+
+
+def _init_worker(config_folder):
+    global _worker_manager
+    from FQCS.manager import FQCSManager
+    _worker_manager = FQCSManager(config_folder=config_folder)
+
+
+def _attach(shm_name, specs):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    if os.name != "nt":
+        # the parent owns the block, keep this process' tracker off it
+        resource_tracker.unregister(shm._name, "shared_memory")
+    arrays = [
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        for shape, dtype, offset in specs
+    ]
+    return shm, arrays
+
+
+def _inspect_pair(shm_name, specs, cfg):
+    manager = _worker_manager
+    shm, arrays = _attach(shm_name, specs)
+    try:
+        left, right = arrays
+        pre_left, pre_right = manager.preprocess_images(cfg, left, right)
+        del left, right, arrays
+    finally:
+        shm.close()
+    pre_sample_left, pre_sample_right = SampleFeatureCache.instance(
+    ).get_preprocessed_samples(manager, cfg)
+    left_result, right_result = trio.run(manager.detect_asym, cfg, pre_left,
+                                         pre_right, pre_sample_left,
+                                         pre_sample_right, None)
+    color_results = None
+    has_asym = left_result[0] or right_result[0]
+    if has_asym and cfg["is_color_enable"]:
+        color_results = trio.run(manager.compare_colors, cfg, pre_left,
+                                 pre_right, pre_sample_left, pre_sample_right,
+                                 True, None)
+    return left_result, right_result, color_results
+
+
+class InspectionProcessPool():
+    def __init__(self, config_folder, workers=None):
+        self.__config_folder = config_folder
+        self.__workers = workers
+        self.__executor = None
+
+    def start(self):
+        if self.__executor is not None: return
+        self.__executor = ProcessPoolExecutor(
+            max_workers=self.__workers,
+            initializer=_init_worker,
+            initargs=(self.__config_folder, ))
+
+    def stop(self):
+        if self.__executor is None: return
+        self.__executor.shutdown(wait=True, cancel_futures=True)
+        self.__executor = None
+
+    def is_running(self):
+        return self.__executor is not None
+
+    def inspect_pair(self, cfg, left, right):
+        images = [left, right]
+        size = sum(img.nbytes for img in images)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            specs = []
+            offset = 0
+            for img in images:
+                view = np.ndarray(img.shape,
+                                  dtype=img.dtype,
+                                  buffer=shm.buf,
+                                  offset=offset)
+                np.copyto(view, img)
+                specs.append((img.shape, img.dtype.str, offset))
+                offset += img.nbytes
+            del view
+            future = self.__executor.submit(_inspect_pair, shm.name, specs,
+                                            cfg)
+            return future.result()
+        finally:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,134 @@
+from services.async_runtime import AsyncRuntime
+import numpy as np
+import threading
+import asyncio
+import typing
+import abc
+import time
+
+if typing.TYPE_CHECKING:
+    from FQCS.manager import FQCSManager
+
+STATE_UNLOADED = "unloaded"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+
+class ModelServiceAbs(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def load(self, manager: "FQCSManager", cfg, warmup_runs=2):
+        pass
+
+    @abc.abstractmethod
+    async def load_async(self, manager: "FQCSManager", cfg, warmup_runs=2):
+        pass
+
+    @abc.abstractmethod
+    def get_state(self):
+        pass
+
+    @abc.abstractmethod
+    def is_ready(self):
+        pass
+
+    @abc.abstractmethod
+    def get_load_time(self):
+        pass
+
+    @abc.abstractmethod
+    def get_error(self):
+        pass
+
+    @abc.abstractmethod
+    def reset(self):
+        pass
+
+
+class ModelService(ModelServiceAbs):
+    __instance: ModelServiceAbs = None
+
+    @staticmethod
+    def instance() -> ModelServiceAbs:
+        if (ModelService.__instance is None):
+            ModelService.__instance = ModelService()
+        return ModelService.__instance
+
+    def __init__(self):
+        self.__state = STATE_UNLOADED
+        self.__load_time = None
+        self.__warmup_time = None
+        self.__error = None
+        self.__generation = 0
+        self.__lock = threading.Lock()
+
+    def load(self, manager: "FQCSManager", cfg, warmup_runs=2):
+        # loads on the async runtime thread, returns a concurrent Future
+        with self.__lock:
+            self.__generation += 1
+            generation = self.__generation
+            self.__state = STATE_LOADING
+            self.__error = None
+        future = AsyncRuntime.instance().submit(self.__load, manager, cfg,
+                                                warmup_runs, generation)
+        if future.done() and future.exception() is not None:
+            self.__finish(generation, STATE_FAILED, error=future.exception())
+        return future
+
+    async def load_async(self, manager: "FQCSManager", cfg, warmup_runs=2):
+        return await asyncio.wrap_future(self.load(manager, cfg, warmup_runs))
+
+    def get_state(self):
+        with self.__lock:
+            return self.__state
+
+    def is_ready(self):
+        return self.get_state() == STATE_READY
+
+    def get_load_time(self):
+        # (load seconds, warm-up seconds) of the last successful load
+        with self.__lock:
+            return self.__load_time, self.__warmup_time
+
+    def get_error(self):
+        with self.__lock:
+            return self.__error
+
+    def reset(self):
+        with self.__lock:
+            # a load still running for the previous manager is ignored
+            self.__generation += 1
+            self.__state = STATE_UNLOADED
+            self.__error = None
+
+    async def __load(self, manager: "FQCSManager", cfg, warmup_runs,
+                     generation):
+        try:
+            start = time.perf_counter()
+            await manager.load_model(cfg)
+            load_time = time.perf_counter() - start
+            start = time.perf_counter()
+            await self.__warm_up(manager, cfg, warmup_runs)
+            warmup_time = time.perf_counter() - start
+        except Exception as ex:
+            self.__finish(generation, STATE_FAILED, error=ex)
+            raise
+        self.__finish(generation, STATE_READY, load_time, warmup_time)
+        return load_time, warmup_time
+
+    async def __warm_up(self, manager: "FQCSManager", cfg, warmup_runs):
+        # the first inferences build the graph, pay for it before the line
+        inp_shape = cfg["err_cfg"]["inp_shape"]
+        for _ in range(warmup_runs):
+            dummy = np.zeros(inp_shape, dtype=np.uint8)
+            await manager.detect_errors(cfg, [dummy], None)
+
+    def __finish(self, generation, state, load_time=None, warmup_time=None,
+                 error=None):
+        with self.__lock:
+            if generation != self.__generation: return
+            self.__state = state
+            self.__error = error
+            if state == STATE_READY:
+                self.__load_time = load_time
+                self.__warmup_time = warmup_time
@@ -0,0 +1,64 @@
+import threading
+import numpy as np
+import cv2
+
+
+class MotionGate():
+    def __init__(self,
+                 sensitivity=0.005,
+                 threshold=25,
+                 width=64,
+                 learning_rate=0.05,
+                 force_interval=1.0):
+        self.__sensitivity = sensitivity
+        self.__threshold = threshold
+        self.__width = width
+        self.__learning_rate = learning_rate
+        self.__force_interval = force_interval
+        self.__background = None
+        self.__last_full = None
+        self.__passed = 0
+        self.__skipped = 0
+        self.__lock = threading.Lock()
+
+    def check(self, timestamp, image, bounds=None):
+        # True when the frame needs the full detection chain
+        small = self.__downscale(image, bounds)
+        with self.__lock:
+            changed = self.__update(small)
+            forced = self.__last_full is None or (
+                timestamp - self.__last_full >= self.__force_interval)
+            if changed or forced:
+                self.__last_full = timestamp
+                self.__passed += 1
+                return True
+            self.__skipped += 1
+            return False
+
+    def reset(self):
+        with self.__lock:
+            self.__background = None
+            self.__last_full = None
+
+    def get_stats(self):
+        with self.__lock:
+            return {"passed": self.__passed, "skipped": self.__skipped}
+
+    def __downscale(self, image, bounds):
+        if bounds is not None:
+            image = image[:, bounds[0]:bounds[1]]
+        height = max(1, int(image.shape[0] * self.__width / image.shape[1]))
+        small = cv2.resize(image, (self.__width, height),
+                           interpolation=cv2.INTER_AREA)
+        if len(small.shape) > 2:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.float32)
+
+    def __update(self, small):
+        if self.__background is None or self.__background.shape != small.shape:
+            self.__background = small
+            return True
+        diff = np.abs(small - self.__background)
+        changed_ratio = np.count_nonzero(diff > self.__threshold) / diff.size
+        cv2.accumulateWeighted(small, self.__background, self.__learning_rate)
+        return changed_ratio > self.__sensitivity
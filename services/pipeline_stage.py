@@ -0,0 +1,38 @@
+import threading
+import queue
+from services.bounded_queue import BoundedQueue
+
+
+class PipelineStage(threading.Thread):
+    POLL_TIMEOUT = 0.1
+
+    def __init__(self,
+                 name,
+                 func,
+                 in_queue: BoundedQueue,
+                 out_queue: BoundedQueue = None,
+                 on_error=None):
+        threading.Thread.__init__(self, name=name, daemon=True)
+        self.__func = func
+        self.__in_queue = in_queue
+        self.__out_queue = out_queue
+        self.__on_error = on_error
+        self.__stop_event = threading.Event()
+
+    def run(self):
+        while not self.__stop_event.is_set():
+            try:
+                item = self.__in_queue.get(self.POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+            try:
+                result = self.__func(item)
+                if result is not None and self.__out_queue is not None:
+                    self.__out_queue.put(result)
+            except Exception as ex:
+                if self.__on_error is not None: self.__on_error(ex)
+            finally:
+                self.__in_queue.task_done()
+
+    def stop(self):
+        self.__stop_event.set()
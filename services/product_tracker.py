@@ -0,0 +1,122 @@
+import itertools
+import threading
+
+
+def get_group_bounds(group):
+    # (x0, y0, x1, y1) around every box of a detected group
+    xs, ys = [], []
+    for b in group:
+        c, rect, dimA, dimB, box, tl, tr, br, bl, minx, maxx, cenx = b
+        for point in [tl, tr, br, bl]:
+            xs.append(float(point[0]))
+            ys.append(float(point[1]))
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def get_iou(a, b):
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    if inter_w <= 0 or inter_h <= 0: return 0.
+    inter = inter_w * inter_h
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / (area_a + area_b - inter)
+
+
+def get_centroid(bounds):
+    return ((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2)
+
+
+def get_distance(a, b):
+    ca, cb = get_centroid(a), get_centroid(b)
+    return ((ca[0] - cb[0])**2 + (ca[1] - cb[1])**2)**0.5
+
+
+class Track():
+    def __init__(self, track_id, bounds, last_seen=None):
+        self.track_id = track_id
+        self.bounds = bounds
+        self.last_seen = last_seen
+        self.hits = 1
+        self.missed = 0
+        self.inspected = False
+
+
+class ProductTracker():
+    def __init__(self,
+                 iou_threshold=0.3,
+                 max_distance=80,
+                 max_missed=5,
+                 max_idle=30):
+        self.__iou_threshold = iou_threshold
+        self.__max_distance = max_distance
+        self.__max_missed = max_missed
+        self.__max_idle = max_idle
+        self.__tracks = {}
+        self.__ids = itertools.count(1)
+        self.__lock = threading.Lock()
+
+    def update(self, bounds_list, timestamp=None):
+        # returns the track id of every bounds, in the same order
+        with self.__lock:
+            candidates = []
+            for idx, bounds in enumerate(bounds_list):
+                for track in self.__tracks.values():
+                    iou = get_iou(bounds, track.bounds)
+                    distance = get_distance(bounds, track.bounds)
+                    if (iou >= self.__iou_threshold
+                            or distance <= self.__max_distance):
+                        candidates.append((-iou, distance, idx, track))
+            candidates.sort(key=lambda c: (c[0], c[1]))
+
+            track_ids = [None] * len(bounds_list)
+            matched = set()
+            for _, _, idx, track in candidates:
+                if track_ids[idx] is not None or track.track_id in matched:
+                    continue
+                track.bounds = bounds_list[idx]
+                track.last_seen = timestamp
+                track.hits += 1
+                track.missed = 0
+                track_ids[idx] = track.track_id
+                matched.add(track.track_id)
+
+            for track_id in list(self.__tracks.keys()):
+                if track_id in matched: continue
+                track = self.__tracks[track_id]
+                track.missed += 1
+                if track.missed > self.__max_missed:
+                    del self.__tracks[track_id]
+
+            for idx, bounds in enumerate(bounds_list):
+                if track_ids[idx] is not None: continue
+                track = Track(next(self.__ids), bounds, timestamp)
+                self.__tracks[track.track_id] = track
+                track_ids[idx] = track.track_id
+            return track_ids
+
+    def gated(self, timestamp):
+        # a frame the motion gate skipped, the belt did not move so tracks
+        # are not missed, only the ones unseen for max_idle seconds expire
+        with self.__lock:
+            for track_id in list(self.__tracks.keys()):
+                last_seen = self.__tracks[track_id].last_seen
+                if (last_seen is not None
+                        and timestamp - last_seen > self.__max_idle):
+                    del self.__tracks[track_id]
+
+    def mark_inspected(self, track_id):
+        # True only the first time a track is handed to inspection
+        with self.__lock:
+            track = self.__tracks.get(track_id)
+            if track is None or track.inspected: return False
+            track.inspected = True
+            return True
+
+    def reset(self):
+        with self.__lock:
+            self.__tracks = {}
+
+    def get_track_count(self):
+        with self.__lock:
+            return len(self.__tracks)
@@ -0,0 +1,58 @@
+from services.event_outbox import SEND_OK, SEND_RETRY, SEND_REJECTED
+from app_constants import ISO_DATE_FORMAT
+import datetime
+import requests
+
+SERVER_ISO_DATE_FORMAT = "yyyy-MM-ddTHH:mm:ssZ"
+# client errors worth another attempt, any other 4xx never succeeds
+RETRYABLE_STATUSES = {401, 408, 425, 429}
+
+
+def get_created_time_str(cur: datetime.datetime):
+    # cur is local time, the server expects UTC
+    return cur.astimezone(datetime.timezone.utc).strftime(ISO_DATE_FORMAT)
+
+
+def get_send_result(status_code):
+    if 200 <= status_code < 300: return SEND_OK
+    if status_code >= 500 or status_code in RETRYABLE_STATUSES:
+        return SEND_RETRY
+    return SEND_REJECTED
+
+
+class QcEventClient():
+    TIMEOUT = 10
+
+    def __init__(self, api_url):
+        self.__url = f"{api_url}/api/qc-events"
+        # one keep-alive connection pool for every submit
+        self.__session = requests.Session()
+
+    def close(self):
+        self.__session.close()
+
+    def submit(self, payload, headers=None):
+        created_time_str = payload.get("created_time_str")
+        if created_time_str is None:
+            # events queued before the inspection time was stored
+            created_time_str = datetime.datetime.utcnow().strftime(
+                ISO_DATE_FORMAT)
+        data = {
+            "details": [{
+                "defect_type_code": defect
+            } for defect in payload["defect_types"]],
+            "left_image": payload["left_image"],
+            "right_image": payload["right_image"],
+            "side_images": payload["side_images"],
+            "date_format": SERVER_ISO_DATE_FORMAT,
+            "created_time_str": created_time_str
+        }
+        try:
+            resp = self.__session.post(self.__url,
+                                       json=data,
+                                       headers=headers,
+                                       timeout=self.TIMEOUT)
+        except requests.RequestException as ex:
+            print(ex)
+            return SEND_RETRY
+        return get_send_result(resp.status_code)
@@ -0,0 +1,42 @@
+import threading
+import time
+
+
+class RenderScheduler():
+    def __init__(self, max_fps=15):
+        self.__interval = 1 / max_fps
+        self.__latest = None
+        self.__last_render = None
+        self.__offered = 0
+        self.__rendered = 0
+        self.__lock = threading.Lock()
+
+    def offer(self, item):
+        # called from the pipeline, only the newest frame is kept
+        with self.__lock:
+            self.__latest = item
+            self.__offered += 1
+
+    def take(self):
+        with self.__lock:
+            if self.__latest is None: return None
+            now = time.monotonic()
+            if (self.__last_render is not None
+                    and now - self.__last_render < self.__interval):
+                return None
+            item, self.__latest = self.__latest, None
+            self.__last_render = now
+            self.__rendered += 1
+            return item
+
+    def clear(self):
+        with self.__lock:
+            self.__latest = None
+            self.__last_render = None
+
+    def get_interval_ms(self):
+        return int(self.__interval * 1000)
+
+    def get_stats(self):
+        with self.__lock:
+            return {"offered": self.__offered, "rendered": self.__rendered}
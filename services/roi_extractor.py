@@ -0,0 +1,66 @@
+from FQCS.manager import FQCSManager
+import numpy as np
+import copy
+
+
+def get_roi_bounds(cfg, width, margin=0.02):
+    # horizontal band of detect_range widened by margin, in pixels
+    left, right = cfg["detect_range"]
+    x0 = max(0, int((left - margin) * width))
+    x1 = min(width, int(np.ceil((right + margin) * width)))
+    return x0, x1
+
+
+def get_roi_config(cfg, width, x0, x1):
+    # percentages and the detect range are relative to the frame, rescale
+    # them so the crop filters exactly like the full frame would
+    crop_w = x1 - x0
+    ratio = width / crop_w
+    roi_cfg = copy.deepcopy(cfg)
+    roi_cfg["frame_width"] = crop_w
+    roi_cfg["min_width_per"] = cfg["min_width_per"] * ratio
+    left, right = cfg["detect_range"]
+    roi_cfg["detect_range"] = ((left * width - x0) / crop_w,
+                               (right * width - x0) / crop_w)
+    roi_cfg["stop_condition"] = cfg["stop_condition"] + width / 2 - (
+        x0 + crop_w / 2)
+    return roi_cfg
+
+
+def offset_point(point, dx):
+    return (point[0] + dx, point[1])
+
+
+def offset_boxes(boxes, dx):
+    results = []
+    for b in boxes:
+        c, rect, dimA, dimB, box, tl, tr, br, bl, minx, maxx, cenx = b
+        c = c + np.array([dx, 0], dtype=c.dtype)
+        rect = (offset_point(rect[0], dx), rect[1], rect[2])
+        box = box + np.array([dx, 0], dtype=box.dtype)
+        tl, tr, br, bl = [offset_point(p, dx) for p in [tl, tr, br, bl]]
+        results.append((c, rect, dimA, dimB, box, tl, tr, br, bl, minx + dx,
+                        maxx + dx, cenx + dx))
+    return results
+
+
+class RoiExtractor():
+    def __init__(self, manager: FQCSManager, margin=0.02):
+        self.__manager = manager
+        self.__margin = margin
+        self.__roi_cfgs = {}
+
+    def extract_boxes(self, cfg, image):
+        width = image.shape[1]
+        key = (cfg["name"], width)
+        if key not in self.__roi_cfgs:
+            x0, x1 = get_roi_bounds(cfg, width, self.__margin)
+            self.__roi_cfgs[key] = (x0, x1,
+                                    get_roi_config(cfg, width, x0, x1))
+        x0, x1, roi_cfg = self.__roi_cfgs[key]
+        # slicing only creates a view of the band
+        boxes, proc = self.__manager.extract_boxes(roi_cfg, image[:, x0:x1])
+        return offset_boxes(boxes, x0), proc
+
+    def reset(self):
+        self.__roi_cfgs = {}
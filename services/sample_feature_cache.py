@@ -0,0 +1,75 @@
+import abc
+import collections
+import hashlib
+import json
+import threading
+
+
+def get_config_fingerprint(cfg, keys=("color_cfg", )):
+    data = {key: cfg[key] for key in keys}
+    raw = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SampleFeatureCacheAbs(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def get_preprocessed_samples(self, manager, cfg):
+        pass
+
+    @abc.abstractmethod
+    def invalidate(self):
+        pass
+
+
+class SampleFeatureCache(SampleFeatureCacheAbs):
+    __instance: SampleFeatureCacheAbs = None
+
+    @staticmethod
+    def instance():
+        if (SampleFeatureCache.__instance is None):
+            SampleFeatureCache.__instance = SampleFeatureCache()
+        return SampleFeatureCache.__instance
+
+    def __init__(self, max_entries=4):
+        self.__max_entries = max_entries
+        self.__entries = collections.OrderedDict()
+        self.__samples = (None, None)
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get_preprocessed_samples(self, manager, cfg):
+        sample_left, sample_right = manager.get_sample_left(
+        ), manager.get_sample_right()
+        if sample_left is None or sample_right is None: return None, None
+        key = get_config_fingerprint(cfg)
+        with self.__lock:
+            cached_left, cached_right = self.__samples
+            if cached_left is not sample_left or cached_right is not sample_right:
+                self.__entries.clear()
+                self.__samples = (sample_left, sample_right)
+            if key in self.__entries:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+                return self.__entries[key]
+        pre_samples = manager.preprocess_images(cfg, sample_left,
+                                                sample_right)
+        with self.__lock:
+            self.__misses += 1
+            self.__entries[key] = pre_samples
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+        return pre_samples
+
+    def invalidate(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__samples = (None, None)
+
+    def get_stats(self):
+        with self.__lock:
+            return {
+                "entries": len(self.__entries),
+                "hits": self.__hits,
+                "misses": self.__misses
+            }
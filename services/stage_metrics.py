@@ -0,0 +1,109 @@
+import abc
+import collections
+import contextlib
+import threading
+import time
+
+END_TO_END = "end_to_end"
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram():
+    def __init__(self, window=512):
+        self.__values = collections.deque(maxlen=window)
+        self.__count = 0
+
+    def add(self, value):
+        self.__values.append(value)
+        self.__count += 1
+
+    def get_count(self):
+        return self.__count
+
+    def percentiles(self, percents=PERCENTILES):
+        values = sorted(self.__values)
+        result = {}
+        for p in percents:
+            if len(values) == 0:
+                result[f"p{p}"] = None
+                continue
+            idx = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+            result[f"p{p}"] = values[idx]
+        return result
+
+
+class StageMetricsAbs(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def measure(self, stage):
+        pass
+
+    @abc.abstractmethod
+    def record(self, stage, wall, cpu=None):
+        pass
+
+    @abc.abstractmethod
+    def record_latency(self, capture_time):
+        pass
+
+    @abc.abstractmethod
+    def get_summary(self):
+        pass
+
+    @abc.abstractmethod
+    def reset(self):
+        pass
+
+
+class StageMetrics(StageMetricsAbs):
+    __instance: StageMetricsAbs = None
+
+    @staticmethod
+    def instance():
+        if (StageMetrics.__instance is None):
+            StageMetrics.__instance = StageMetrics()
+        return StageMetrics.__instance
+
+    def __init__(self, window=512):
+        self.__window = window
+        self.__wall = {}
+        self.__cpu = {}
+        self.__lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(stage,
+                        time.perf_counter() - wall_start,
+                        time.thread_time() - cpu_start)
+
+    def record(self, stage, wall, cpu=None):
+        with self.__lock:
+            if stage not in self.__wall:
+                self.__wall[stage] = RollingHistogram(self.__window)
+                self.__cpu[stage] = RollingHistogram(self.__window)
+            self.__wall[stage].add(wall)
+            if cpu is not None: self.__cpu[stage].add(cpu)
+
+    def record_latency(self, capture_time):
+        # capture timestamps come from time.monotonic()
+        self.record(END_TO_END, time.monotonic() - capture_time)
+
+    def get_summary(self):
+        with self.__lock:
+            summary = {}
+            for stage, wall in self.__wall.items():
+                summary[stage] = {
+                    "count": wall.get_count(),
+                    "wall": wall.percentiles(),
+                    "cpu": self.__cpu[stage].percentiles()
+                }
+            return summary
+
+    def reset(self):
+        with self.__lock:
+            self.__wall = {}
+            self.__cpu = {}
@@ -0,0 +1,71 @@
+import contextlib
+import threading
+import time
+import abc
+
+KIND_IMPORT = "import"
+KIND_SCREEN = "screen"
+KIND_STEP = "step"
+
+
+class StartupProfilerAbs(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def measure(self, kind, name):
+        pass
+
+    @abc.abstractmethod
+    def get_report(self):
+        pass
+
+    @abc.abstractmethod
+    def format_report(self):
+        pass
+
+
+class StartupProfiler(StartupProfilerAbs):
+    __instance: StartupProfilerAbs = None
+
+    @staticmethod
+    def instance() -> StartupProfilerAbs:
+        if (StartupProfiler.__instance is None):
+            StartupProfiler.__instance = StartupProfiler()
+        return StartupProfiler.__instance
+
+    def __init__(self):
+        self.__start = time.perf_counter()
+        self.__entries = []
+        self.__lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self, kind, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.__lock:
+                self.__entries.append(
+                    (kind, name, time.perf_counter() - start,
+                     start - self.__start))
+
+    def get_report(self):
+        # entries sorted by cost, nested measures are counted in both
+        with self.__lock:
+            entries = sorted(self.__entries, key=lambda e: -e[2])
+            return {
+                "elapsed": time.perf_counter() - self.__start,
+                "entries": [{
+                    "kind": kind,
+                    "name": name,
+                    "seconds": seconds,
+                    "at": at
+                } for kind, name, seconds, at in entries]
+            }
+
+    def format_report(self):
+        report = self.get_report()
+        lines = [f"Startup report, {report['elapsed']:.3f}s since launch"]
+        for e in report["entries"]:
+            lines.append(f"  {e['kind']:7} {e['name']:45} "
+                         f"{e['seconds'] * 1000:9.1f} ms "
+                         f"(at {e['at']:.3f}s)")
+        return "\n".join(lines)
@@ -0,0 +1,127 @@
+from app_constants import FOLDER_DATE_FORMAT
+import threading
+import hashlib
+import struct
+import json
+import os
+
+LAYOUT_FLAT = "flat"
+LAYOUT_SHARDED = "sharded"
+INDEX_FILE = "index.jsonl"
+PACK_EXT = ".pack"
+PACK_MAGIC = b"FQPK"
+PACK_HEADER = struct.Struct("<4sI")
+PACK_ENTRY = struct.Struct("<QQ")
+
+
+def get_shard_prefix(event_id, chars=2):
+    return hashlib.md5(event_id.encode()).hexdigest()[:chars]
+
+
+def write_pack(path, buffers):
+    # header, (offset, length) per member, then the encoded members
+    offset = PACK_HEADER.size + PACK_ENTRY.size * len(buffers)
+    offsets = []
+    for buf in buffers:
+        offsets.append((offset, len(buf)))
+        offset += len(buf)
+    with open(path, "wb") as fo:
+        fo.write(PACK_HEADER.pack(PACK_MAGIC, len(buffers)))
+        for member in offsets:
+            fo.write(PACK_ENTRY.pack(*member))
+        for buf in buffers:
+            fo.write(buf)
+    return offsets
+
+
+def read_pack_member(path, idx):
+    with open(path, "rb") as fi:
+        magic, count = PACK_HEADER.unpack(fi.read(PACK_HEADER.size))
+        if magic != PACK_MAGIC: raise ValueError(f"Not a pack file: {path}")
+        if not 0 <= idx < count:
+            raise IndexError(f"Pack member {idx} out of range")
+        fi.seek(PACK_HEADER.size + PACK_ENTRY.size * idx)
+        offset, length = PACK_ENTRY.unpack(fi.read(PACK_ENTRY.size))
+        fi.seek(offset)
+        return fi.read(length)
+
+
+def split_ref(ref):
+    # "<pack path>#<member>" for packed images, a plain path otherwise
+    path, sep, member = ref.rpartition("#")
+    if sep == "" or not path.endswith(PACK_EXT): return ref, None
+    return path, int(member)
+
+
+class StorageLayout():
+    MAX_CACHED_FOLDERS = 10000
+
+    def __init__(self, storage_path, layout=LAYOUT_FLAT, shard_chars=2,
+                 pack=False):
+        if layout not in (LAYOUT_FLAT, LAYOUT_SHARDED):
+            raise ValueError(f"Unsupported storage layout: {layout}")
+        self.__storage_path = storage_path
+        self.__layout = layout
+        self.__shard_chars = shard_chars
+        self.__pack = pack
+        self.__folders = set()
+        self.__folders_lock = threading.Lock()
+        self.__index_lock = threading.Lock()
+
+    def is_packed(self):
+        return self.__pack
+
+    def get_day(self, cur):
+        return cur.strftime(FOLDER_DATE_FORMAT)
+
+    def get_event_folder(self, cur, event_id):
+        day = self.get_day(cur)
+        if self.__layout == LAYOUT_FLAT: return day
+        # hour and hash prefix keep every folder a few hundred entries wide
+        return os.path.join(day, cur.strftime("%H"),
+                            get_shard_prefix(event_id, self.__shard_chars))
+
+    def get_files(self, folder, event_id, count, ext):
+        # one plain file per image, what the api and the history refer to
+        return [
+            os.path.join(folder, f"{event_id}_{idx}{ext}")
+            for idx in range(count)
+        ]
+
+    def get_refs(self, folder, event_id, count, ext):
+        # where the images of an event will be found, known before writing
+        if self.__pack:
+            pack_path = os.path.join(folder, event_id + PACK_EXT)
+            return pack_path, [f"{pack_path}#{idx}" for idx in range(count)]
+        return None, self.get_files(folder, event_id, count, ext)
+
+    def get_abs_path(self, rel_path):
+        return os.path.join(self.__storage_path, rel_path)
+
+    def ensure_folder(self, folder):
+        with self.__folders_lock:
+            if folder in self.__folders: return
+            os.makedirs(self.get_abs_path(folder), exist_ok=True)
+            if len(self.__folders) >= self.MAX_CACHED_FOLDERS:
+                self.__folders.clear()
+            self.__folders.add(folder)
+
+    def append_index(self, day, entry):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self.__index_lock:
+            with open(self.get_abs_path(os.path.join(day, INDEX_FILE)),
+                      "a") as fo:
+                fo.write(line)
+
+    def read_index(self, day):
+        path = self.get_abs_path(os.path.join(day, INDEX_FILE))
+        if not os.path.exists(path): return []
+        with open(path) as fi:
+            return [json.loads(line) for line in fi if line.strip()]
+
+    def read_image_bytes(self, ref):
+        path, member = split_ref(ref)
+        if member is None:
+            with open(self.get_abs_path(path), "rb") as fi:
+                return fi.read()
+        return read_pack_member(self.get_abs_path(path), member)
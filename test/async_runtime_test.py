@@ -0,0 +1,107 @@
+import unittest
+import threading
+import asyncio
+import time
+import trio
+
+from services.async_runtime import AsyncRuntime
+
+
+async def add_later(a, b):
+    await trio.sleep(0)
+    return a + b
+
+
+async def current_thread_name():
+    return threading.current_thread().name
+
+
+async def busy(seconds):
+    # blocks like the FQCS coroutines, never yields to the loop
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+async def fail():
+    raise ValueError("failed")
+
+
+class AsyncRuntimeTest(unittest.TestCase):
+    def setUp(self):
+        self.runtime = AsyncRuntime()
+        self.runtime.start()
+        return
+
+    def tearDown(self):
+        self.runtime.stop()
+
+    def test_run(self):
+        result = self.runtime.run(add_later, 1, 2)
+        self.assertEqual(result, 3)
+
+    def test_run_reuses_loop_thread(self):
+        first = self.runtime.run(current_thread_name)
+        second = self.runtime.run(current_thread_name)
+        self.assertEqual(first, "async-runtime")
+        self.assertEqual(first, second)
+
+    def test_submit(self):
+        future = self.runtime.submit(add_later, 2, 3)
+        self.assertEqual(future.result(1), 5)
+
+    def test_submit_error(self):
+        future = self.runtime.submit(fail)
+        self.assertRaises(ValueError, future.result, 1)
+
+    def test_run_without_runtime(self):
+        self.runtime.stop()
+        self.assertRaises(RuntimeError, self.runtime.run, add_later, 1, 1)
+
+    def test_run_local_reuses_caller_loop(self):
+        first = self.runtime.run_local(current_thread_name)
+        second = self.runtime.run_local(current_thread_name)
+        self.assertEqual(
+            first, f"async-runtime-{threading.current_thread().name}")
+        self.assertEqual(first, second)
+
+    def test_run_local_per_thread(self):
+        names = []
+        thread = threading.Thread(
+            target=lambda: names.append(
+                self.runtime.run_local(current_thread_name)),
+            name="caller")
+        thread.start()
+        thread.join()
+        self.assertEqual(names, ["async-runtime-caller"])
+        self.assertNotEqual(self.runtime.run_local(current_thread_name),
+                            names[0])
+
+    def test_stop_local_loops(self):
+        self.runtime.run_local(current_thread_name)
+        self.runtime.stop()
+        loops = [
+            thread for thread in threading.enumerate()
+            if thread.name.startswith("async-runtime-")
+        ]
+        self.assertEqual(loops, [])
+
+    def test_run_local_parallel(self):
+        threads = [
+            threading.Thread(target=self.runtime.run_local, args=(busy, 0.2))
+            for _ in range(4)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(time.perf_counter() - start, 0.6)
+
+    def test_run_in_thread(self):
+        name = asyncio.run(self.runtime.run_in_thread(busy, 0))
+        self.assertNotEqual(name, threading.current_thread().name)
+        self.assertNotEqual(name, "async-runtime")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import tempfile
+import os
+
+from benchmark import harness
+
+
+class BenchmarkHarnessTest(unittest.TestCase):
+    def test_time_case(self):
+        calls = []
+        result = harness.time_case(lambda: calls.append(1), 5, 2)
+        self.assertEqual(len(calls), 7)
+        self.assertEqual(result["repeat"], 5)
+        self.assertLessEqual(result["min"], result["median"])
+        self.assertLessEqual(result["median"], result["p95"])
+
+    def test_find_regressions(self):
+        baseline = {"a": {"median": 1.0}, "b": {"median": 1.0}}
+        results = {
+            "a": {"median": 1.2},
+            "b": {"median": 1.3},
+            "c": {"median": 9.0}
+        }
+        result = harness.find_regressions(results, baseline, 1.25)
+        self.assertEqual(result, [("b", 1.3, 1.0)])
+
+    def test_baseline_roundtrip(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "baseline.json")
+            self.assertEqual(harness.load_baseline(path), None)
+            harness.save_baseline(path, {"a": {"median": 1.0}})
+            self.assertEqual(harness.load_baseline(path),
+                             {"a": {"median": 1.0}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import queue
+import threading
+
+from services.bounded_queue import BoundedQueue, POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST
+
+
+class BoundedQueueTest(unittest.TestCase):
+    def test_drop_oldest(self):
+        q = BoundedQueue(2, POLICY_DROP_OLDEST)
+        for i in range(4):
+            self.assertEqual(q.put(i), True)
+        self.assertEqual([q.get(0), q.get(0)], [2, 3])
+        self.assertEqual(q.get_dropped(), 2)
+
+    def test_drop_newest(self):
+        q = BoundedQueue(2, POLICY_DROP_NEWEST)
+        results = [q.put(i) for i in range(4)]
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual([q.get(0), q.get(0)], [0, 1])
+        self.assertEqual(q.get_dropped(), 2)
+
+    def test_block_timeout(self):
+        q = BoundedQueue(1, POLICY_BLOCK)
+        q.put(1)
+        result = q.put(2, timeout=0.01)
+        self.assertEqual(result, False)
+        self.assertEqual(q.qsize(), 1)
+
+    def test_block_until_space(self):
+        q = BoundedQueue(1, POLICY_BLOCK)
+        q.put(1)
+        timer = threading.Timer(0.05, q.get)
+        timer.start()
+        result = q.put(2, timeout=1)
+        timer.join()
+        self.assertEqual(result, True)
+        self.assertEqual(q.get(0), 2)
+
+    def test_get_empty(self):
+        q = BoundedQueue(1)
+        self.assertRaises(queue.Empty, q.get, 0.01)
+
+    def test_close_releases_blocked_put(self):
+        q = BoundedQueue(1, POLICY_BLOCK)
+        q.put(1)
+        timer = threading.Timer(0.05, q.close)
+        timer.start()
+        result = q.put(2)
+        timer.join()
+        self.assertEqual(result, False)
+
+    def test_join_waits_for_task_done(self):
+        q = BoundedQueue(2, POLICY_BLOCK)
+        q.put(1)
+        q.get(0)
+        self.assertEqual(q.join(0.01), False)
+        q.task_done()
+        self.assertEqual(q.join(0.01), True)
+
+    def test_join_ignores_dropped(self):
+        q = BoundedQueue(1, POLICY_DROP_OLDEST)
+        q.put(1)
+        q.put(2)
+        q.get(0)
+        q.task_done()
+        self.assertEqual(q.join(0.01), True)
+
+    def test_invalid_policy(self):
+        self.assertRaises(ValueError, BoundedQueue, 1, "unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
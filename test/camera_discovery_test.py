@@ -0,0 +1,93 @@
+import unittest
+import threading
+import time
+
+from services.camera_discovery import CameraDiscovery
+
+
+def fake_probe(source):
+    if source == 3:
+        time.sleep(5)
+    if source not in [0, 2, 3, "rtsp://line-1"]: return None
+    return {"source": source, "name": str(source), "width": 640, "height": 480}
+
+
+class FakeDevices():
+    # probes of a source in use fail, like a driver refusing a second open
+    def __init__(self):
+        self.owned = set()
+        self.probed = []
+        self.slow = 0
+
+    def probe(self, source):
+        self.probed.append(source)
+        time.sleep(self.slow)
+        if source in self.owned or source not in [0, 1]: return None
+        return {"source": source, "name": str(source), "width": 640, "height": 480}
+
+    def get_owned(self):
+        return set(self.owned)
+
+
+class CameraDiscoveryTest(unittest.TestCase):
+    def setUp(self):
+        self.discovery = CameraDiscovery(fake_probe)
+        self.discovery.configure(5, 30, 0.2, ["rtsp://line-1"])
+        return
+
+    def test_background_refresh(self):
+        self.assertEqual(self.discovery.get_cameras(), [])
+        self.assertEqual(self.discovery.wait(2), True)
+        sources = [c["source"] for c in self.discovery.get_cameras()]
+        self.assertEqual(sources, [0, 2, "rtsp://line-1"])
+
+    def test_slow_device_does_not_block(self):
+        start = time.monotonic()
+        self.discovery.refresh()
+        self.discovery.wait(2)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_listener(self):
+        event = threading.Event()
+        received = []
+        self.discovery.add_listener(lambda cams: (received.append(cams),
+                                                  event.set()))
+        self.discovery.refresh()
+        self.assertEqual(event.wait(2), True)
+        self.assertEqual(len(received[0]), 3)
+
+    def test_cache_ttl(self):
+        self.discovery.refresh()
+        self.discovery.wait(2)
+        self.discovery.get_cameras()
+        self.assertEqual(self.discovery.wait(0), True)
+
+
+    def test_skip_owned_sources(self):
+        devices = FakeDevices()
+        discovery = CameraDiscovery(devices.probe, devices.get_owned)
+        discovery.configure(3, 30, 0.2)
+        discovery.refresh()
+        discovery.wait(2)
+        devices.owned.add(1)
+        devices.probed.clear()
+        discovery.refresh()
+        discovery.wait(2)
+        self.assertNotIn(1, devices.probed)
+        sources = [c["source"] for c in discovery.get_cameras()]
+        self.assertEqual(sources, [0, 1])
+
+    def test_timed_out_probe_keeps_cached_entry(self):
+        devices = FakeDevices()
+        discovery = CameraDiscovery(devices.probe, devices.get_owned)
+        discovery.configure(3, 30, 0.2)
+        discovery.refresh()
+        discovery.wait(2)
+        devices.slow = 0.5
+        discovery.refresh()
+        discovery.wait(2)
+        sources = [c["source"] for c in discovery.get_cameras()]
+        self.assertEqual(sources, [0, 1])
+
+if __name__ == '__main__':
+    unittest.main()
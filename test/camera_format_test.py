@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+import cv2
+
+from services.camera_format import get_requested_format, negotiate_format, \
+    fit_frame, get_fourcc_code, get_fourcc_name
+
+
+class LimitedCamera():
+    # accepts every property but clamps the resolution to 1280x720
+    def __init__(self):
+        self.props = {}
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH: value = min(value, 1280)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT: value = min(value, 720)
+        self.props[prop] = value
+        return True
+
+    def get(self, prop):
+        return self.props.get(prop, 0)
+
+
+class CameraFormatTest(unittest.TestCase):
+    def test_fourcc(self):
+        self.assertEqual(get_fourcc_name(get_fourcc_code("MJPG")), "MJPG")
+        self.assertIsNone(get_fourcc_name(0))
+
+    def test_requested_format(self):
+        cfg = {"frame_width": 640, "frame_height": 480, "capture_fps": 60}
+        requested = get_requested_format(cfg, {"fps": 30, "fourcc": "MJPG"})
+        self.assertEqual(requested["fps"], 60)
+        self.assertEqual(requested["fourcc"], "MJPG")
+        self.assertEqual((requested["width"], requested["height"]),
+                         (640, 480))
+
+    def test_negotiate(self):
+        camera = LimitedCamera()
+        granted = negotiate_format(camera, {
+            "width": 1920,
+            "height": 1080,
+            "fourcc": "MJPG",
+            "fps": 30,
+            "buffer_size": 1
+        })
+        self.assertEqual((granted["width"], granted["height"]), (1280, 720))
+        self.assertEqual(granted["fourcc"], "MJPG")
+        self.assertEqual(granted["buffer_size"], 1)
+
+    def test_fit_frame(self):
+        image = np.zeros((480, 640, 3), np.uint8)
+        self.assertIs(fit_frame(image, 640, 480), image)
+        self.assertEqual(fit_frame(image, 320, 240).shape, (240, 320, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import threading
+import time
+
+from services.camera_health import CameraHealth, STATE_HEALTHY, \
+    STATE_STALLED, STATE_DISCONNECTED
+from services.camera_capture_thread import CameraCaptureThread
+from services.frame_ring_buffer import FrameRingBuffer
+
+
+class FlakyCamera():
+    def __init__(self, fail_opens, frames):
+        self.fail_opens = fail_opens
+        self.frames = frames
+        self.opened = False
+        self.open_calls = 0
+
+    def open(self, uri):
+        self.open_calls += 1
+        if self.open_calls <= self.fail_opens: return False
+        self.opened = True
+        return True
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if self.frames > 0:
+            self.frames -= 1
+            return True, self.frames
+        return False, None
+
+    def release(self):
+        self.opened = False
+
+
+class BlockingCamera():
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.released = False
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        # an unplugged USB camera, read() does not return
+        self.unblock.wait()
+        return False, None
+
+    def release(self):
+        self.released = True
+
+
+class CameraHealthTest(unittest.TestCase):
+    def test_backoff(self):
+        health = CameraHealth(base_backoff=0.5, max_backoff=3)
+        delays = [health.open_failed() for _ in range(5)]
+        self.assertEqual(delays, [0.5, 1, 2, 3, 3])
+        self.assertEqual(health.get_state(), STATE_DISCONNECTED)
+        health.frame_received(time.monotonic())
+        self.assertEqual(health.open_failed(), 0.5)
+
+    def test_stall_watchdog(self):
+        health = CameraHealth(stall_timeout=1)
+        health.frame_received(10)
+        self.assertFalse(health.is_stalled(10.5))
+        self.assertTrue(health.is_stalled(11.5))
+        self.assertEqual(health.get_state(), STATE_STALLED)
+
+    def test_reconnect_count(self):
+        health = CameraHealth()
+        health.opened(False)
+        health.lost()
+        health.opened(True)
+        stats = health.get_stats()
+        self.assertEqual(stats["state"], STATE_HEALTHY)
+        self.assertEqual(stats["reconnects"], 1)
+
+    def test_thread_reconnects(self):
+        camera = FlakyCamera(2, 3)
+        buffer = FrameRingBuffer(8)
+        health = CameraHealth(stall_timeout=0.05,
+                              base_backoff=0.01,
+                              max_backoff=0.02)
+        thread = CameraCaptureThread(camera, buffer, uri=0, health=health)
+        thread.start()
+        time.sleep(0.3)
+        thread.stop()
+        thread.join(1)
+        self.assertIsNotNone(buffer.latest()[1])
+        # the stream ran dry, so the watchdog dropped and reopened it
+        self.assertGreaterEqual(health.get_stats()["reconnects"], 1)
+        self.assertGreaterEqual(camera.open_calls, 4)
+
+    def test_owned_camera_released_by_thread(self):
+        camera = BlockingCamera()
+        thread = CameraCaptureThread(camera,
+                                     FrameRingBuffer(8),
+                                     uri=0,
+                                     owns_camera=True)
+        thread.start()
+        thread.stop()
+        thread.join(0.1)
+        # never released under a read() that is still running
+        self.assertTrue(thread.is_alive())
+        self.assertFalse(camera.released)
+        camera.unblock.set()
+        thread.join(1)
+        self.assertTrue(camera.released)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import threading
+import time
+
+from services.capture_service import CaptureService, get_owned_sources
+
+
+class HangingCamera():
+    # delivers a few frames, then read() blocks like an unplugged camera
+    def __init__(self, frames):
+        self.frames = frames
+        self.unblock = threading.Event()
+        self.opened = False
+        self.released = False
+
+    def open(self, uri):
+        self.opened = True
+        return True
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if self.frames > 0:
+            self.frames -= 1
+            return True, self.frames
+        self.unblock.wait()
+        return False, None
+
+    def release(self):
+        self.opened = False
+        self.released = True
+
+
+class CaptureServiceTest(unittest.TestCase):
+    def test_supervisor_replaces_blocked_capture(self):
+        cameras = []
+
+        def factory():
+            cameras.append(HangingCamera(3))
+            return cameras[-1]
+
+        service = CaptureService(4,
+                                 stall_timeout=0.1,
+                                 base_backoff=0.01,
+                                 max_backoff=0.02,
+                                 camera_factory=factory)
+        service.SUPERVISE_INTERVAL = 0.05
+        service.open([0])
+        time.sleep(0.5)
+        self.assertGreaterEqual(len(cameras), 2)
+        self.assertGreaterEqual(service.get_health(0)["reconnects"], 1)
+        # abandoned captures are still inside read(), none was released
+        self.assertFalse(any(camera.released for camera in cameras))
+        service.stop()
+        for camera in cameras:
+            camera.unblock.set()
+        time.sleep(0.1)
+        self.assertTrue(all(camera.released for camera in cameras))
+
+
+    def test_owned_sources(self):
+        camera = HangingCamera(0)
+        camera.unblock.set()
+        service = CaptureService(4, camera_factory=lambda: camera)
+        service.open([5, "rtsp://line-1"])
+        self.assertTrue({5, "rtsp://line-1"} <= get_owned_sources())
+        service.stop()
+        self.assertFalse({5, "rtsp://line-1"} & get_owned_sources())
+
+
+if __name__ == "__main__":
+    unittest.main()
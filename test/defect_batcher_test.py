@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import trio
+
+from services.defect_batcher import DefectBatcher
+
+
+class FakeManager():
+    # image i gets score i, converts its inputs in place like FQCS does
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batch_sizes = []
+
+    async def detect_errors(self, cfg, images, result_info):
+        self.batch_sizes.append(len(images))
+        if self.fail: raise ValueError("model failed")
+        values = [float(img) for img in images]
+        for i in range(len(images)):
+            images[i] = f"converted-{images[i]}"
+        count = len(values)
+        boxes = np.zeros((count, 1, 4))
+        scores = np.array(values).reshape(count, 1)
+        classes = np.zeros((count, 1))
+        valid = np.ones(count)
+        return boxes, scores, classes, valid
+
+
+class DefectBatcherTest(unittest.TestCase):
+    def test_scatter_offsets(self):
+        batcher = DefectBatcher(8)
+        main, side = [0, 1], [2, 3, 4]
+        batcher.add("main", main)
+        batcher.add("side", side)
+        batcher.add("empty", [])
+        results = trio.run(batcher.detect, FakeManager(), None)
+        self.assertEqual(set(results.keys()), {"main", "side"})
+        self.assertEqual(results["main"][1].ravel().tolist(), [0, 1])
+        self.assertEqual(results["side"][1].ravel().tolist(), [2, 3, 4])
+        self.assertEqual(side, ["converted-2", "converted-3", "converted-4"])
+
+    def test_split_at_max_batch(self):
+        manager = FakeManager()
+        batcher = DefectBatcher(2)
+        batcher.add("main", [0, 1, 2])
+        batcher.add("side", [3, 4])
+        self.assertEqual(len(batcher), 5)
+        results = trio.run(batcher.detect, manager, None)
+        self.assertEqual(manager.batch_sizes, [2, 2, 1])
+        # a request split across batches is stitched back in order
+        self.assertEqual(results["main"][1].ravel().tolist(), [0, 1, 2])
+        self.assertEqual(results["side"][1].ravel().tolist(), [3, 4])
+
+    def test_empty(self):
+        manager = FakeManager()
+        self.assertEqual(trio.run(DefectBatcher().detect, manager, None), {})
+        self.assertEqual(manager.batch_sizes, [])
+
+    def test_error_reaches_caller(self):
+        batcher = DefectBatcher(2)
+        main, side = [0, 1], [2]
+        batcher.add("main", main)
+        batcher.add("side", side)
+        with self.assertRaises(ValueError):
+            trio.run(batcher.detect, FakeManager(fail=True), None)
+        # no source is left with a partial scatter
+        self.assertEqual(main, [0, 1])
+        self.assertEqual(side, [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
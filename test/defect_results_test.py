@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+
+from services.defect_results import prepare_display_images, get_detections, \
+    count_defects, draw_detections
+
+
+class DefectResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.labels = ["stain", "excess_glue"]
+        self.boxes = np.array([[[0.1, 0.1, 0.5, 0.5], [0.2, 0.2, 0.4, 0.4]],
+                               [[0.0, 0.0, 1.0, 1.0], [0.0, 0.0, 0.0, 0.0]]])
+        self.scores = np.array([[0.9, 0.2], [0.8, 0.0]])
+        self.classes = np.array([[1., 0.], [1., 0.]])
+
+    def test_get_detections(self):
+        image_idx, boxes, scores, classes = get_detections(
+            self.boxes, self.scores, self.classes, (100, 200), 0.5)
+        self.assertEqual(image_idx.tolist(), [0, 1])
+        self.assertEqual(boxes[0].tolist(), [10, 20, 50, 100])
+        self.assertEqual(classes.tolist(), [1, 1])
+
+    def test_count_defects(self):
+        detections = get_detections(self.boxes, self.scores, self.classes,
+                                    (100, 200), 0.1)
+        defects = count_defects(detections[3], self.labels, {"stain": 2})
+        self.assertEqual(defects, {"stain": 3, "excess_glue": 2})
+        self.assertEqual(count_defects(np.array([], int), self.labels), {})
+
+    def test_display_images_stay_uint8(self):
+        images = [np.zeros((50, 30, 3), np.uint8) for _ in range(2)]
+        display = prepare_display_images(images, (100, 200))
+        detections = get_detections(self.boxes, self.scores, self.classes,
+                                    (100, 200), 0.5)
+        draw_detections(display, detections, self.labels)
+        self.assertEqual(display[0].dtype, np.uint8)
+        self.assertEqual(display[0].shape, (200, 100, 3))
+        self.assertEqual(display[0][20, 10].tolist(), [0, 0, 255])
+
+
+if __name__ == "__main__":
+    unittest.main()
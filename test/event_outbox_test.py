@@ -0,0 +1,159 @@
+import unittest
+import threading
+import tempfile
+import shutil
+import json
+import time
+import os
+import urllib.request
+import urllib.error
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from services.event_outbox import EventOutbox, SEND_REJECTED
+
+
+class StubApiServer():
+    def __init__(self, failures=0, statuses=None):
+        # statuses are answered in order before accepting, failures is a
+        # number of 503s
+        self.statuses = list(statuses or [503] * failures)
+        self.requests = []
+        self.clients = []
+        self.accepted = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                body = json.loads(self.rfile.read(length))
+                key = self.headers["Idempotency-Key"]
+                server.requests.append(key)
+                server.clients.append(self.client_address)
+                if len(server.statuses) > 0:
+                    status = server.statuses.pop(0)
+                else:
+                    server.accepted.setdefault(key, body)
+                    status = 200
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                return
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.url = f"{self.base_url}/events"
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_send_func(url):
+    def send(payload, event_key):
+        req = urllib.request.Request(url,
+                                     data=json.dumps(payload).encode(),
+                                     headers={
+                                         "Content-Type": "application/json",
+                                         "Idempotency-Key": event_key
+                                     },
+                                     method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=2) as resp:
+                return resp.status == 200
+        except urllib.error.HTTPError:
+            return False
+
+    return send
+
+
+def wait_until(predicate, timeout=5):
+    end = time.time() + timeout
+    while time.time() < end:
+        if predicate(): return True
+        time.sleep(0.01)
+    return False
+
+
+class EventOutboxTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.folder, "outbox.db")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_deliver(self):
+        with StubApiServer() as server:
+            outbox = EventOutbox(self.db_path, make_send_func(server.url))
+            outbox.start()
+            key = outbox.enqueue({"defect_types": ["STAIN"]})
+            result = wait_until(lambda: outbox.get_pending_count() == 0)
+            outbox.close()
+        self.assertEqual(result, True)
+        self.assertEqual(server.accepted[key], {"defect_types": ["STAIN"]})
+
+    def test_retry_keeps_idempotency_key(self):
+        with StubApiServer(failures=2) as server:
+            outbox = EventOutbox(self.db_path,
+                                 make_send_func(server.url),
+                                 base_backoff=0.01)
+            outbox.start()
+            key = outbox.enqueue({"defect_types": []})
+            result = wait_until(lambda: outbox.get_pending_count() == 0)
+            outbox.close()
+        self.assertEqual(result, True)
+        self.assertEqual(server.requests, [key, key, key])
+
+    def test_persist_until_started(self):
+        outbox = EventOutbox(self.db_path, lambda payload, key: False)
+        outbox.enqueue({"defect_types": []})
+        outbox.close()
+        with StubApiServer() as server:
+            outbox = EventOutbox(self.db_path, make_send_func(server.url))
+            self.assertEqual(outbox.get_pending_count(), 1)
+            sent = outbox.flush()
+            outbox.close()
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(server.accepted), 1)
+
+    def test_failed_send_is_rescheduled(self):
+        outbox = EventOutbox(self.db_path,
+                             lambda payload, key: False,
+                             base_backoff=60)
+        outbox.enqueue({"defect_types": []})
+        first = outbox.flush()
+        second = outbox.flush()
+        outbox.close()
+        self.assertEqual((first, second), (0, 0))
+
+    def test_rejected_send_is_dead_lettered(self):
+        calls = []
+
+        def send(payload, key):
+            calls.append(key)
+            return SEND_REJECTED
+
+        outbox = EventOutbox(self.db_path, send, base_backoff=0)
+        outbox.enqueue({"defect_types": []})
+        outbox.flush()
+        outbox.flush()
+        pending = outbox.get_pending_count()
+        dead = outbox.get_dead_letter_count()
+        outbox.close()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((pending, dead), (0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
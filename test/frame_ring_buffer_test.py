@@ -0,0 +1,62 @@
+import unittest
+import threading
+
+from services.frame_ring_buffer import FrameRingBuffer
+
+
+class FrameRingBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.buffer = FrameRingBuffer(3)
+        return
+
+    def test_latest_empty(self):
+        result = self.buffer.latest()
+        self.assertEqual(result, (None, None))
+
+    def test_latest_returns_newest(self):
+        self.buffer.push(1.0, "a")
+        self.buffer.push(2.0, "b")
+        result = self.buffer.latest()
+        self.assertEqual(result, (2.0, "b"))
+
+    def test_capacity_drops_oldest(self):
+        for i in range(5):
+            self.buffer.push(float(i), i)
+        result = self.buffer.snapshot()
+        self.assertEqual([f for _, f in result], [2, 3, 4])
+
+    def test_wait_newer(self):
+        self.buffer.push(1.0, "a")
+        self.assertEqual(self.buffer.wait_newer(None, 0), (1.0, "a"))
+        self.assertEqual(self.buffer.wait_newer(1.0, 0.01), (None, None))
+        timer = threading.Timer(0.05, self.buffer.push, (2.0, "b"))
+        timer.start()
+        self.assertEqual(self.buffer.wait_newer(1.0, 1), (2.0, "b"))
+        timer.join()
+
+    def test_window(self):
+        for ts in [1.0, 1.1, 1.2]:
+            self.buffer.push(ts, ts)
+        self.assertEqual([ts for ts, _ in self.buffer.window(1.05, 1.2)],
+                         [1.1, 1.2])
+        self.assertEqual(self.buffer.window(2.0, 3.0), [])
+
+    def test_nearest(self):
+        for ts in [1.0, 1.1, 1.2]:
+            self.buffer.push(ts, ts)
+        self.assertEqual(self.buffer.nearest(1.13), (1.1, 1.1))
+        self.assertEqual(self.buffer.nearest(5.0), (1.2, 1.2))
+        self.assertEqual(self.buffer.nearest(0.0), (1.0, 1.0))
+
+    def test_nearest_empty(self):
+        result = self.buffer.nearest(1.0)
+        self.assertEqual(result, (None, None))
+
+    def test_clear(self):
+        self.buffer.push(1.0, "a")
+        self.buffer.clear()
+        self.assertEqual(len(self.buffer), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
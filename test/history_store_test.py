@@ -0,0 +1,77 @@
+import unittest
+import tempfile
+import shutil
+import os
+
+from services.history_store import HistoryStore
+
+
+def make_record(t, defect_types=()):
+    return {
+        "time": t,
+        "camera": "main",
+        "track_id": int(t),
+        "defect_types": set(defect_types),
+        "size_diff": (0.5, 1.5),
+        "asym_scores": (0.1, 0.2),
+        "color_scores": None,
+        "left_image": f"{t}_l.jpg",
+        "right_image": f"{t}_r.jpg",
+        "side_images": []
+    }
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.store = HistoryStore(os.path.join(self.folder, "history.db"),
+                                  batch_size=3,
+                                  flush_interval=0.05)
+        self.store.start()
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.folder)
+
+    def test_batched_insert(self):
+        for t in range(10):
+            self.store.record(make_record(t))
+        self.store.stop()
+        self.assertEqual(self.store.get_stats()["written"], 10)
+        self.assertEqual(self.store.count(0, 10), 10)
+
+    def test_query_time_range(self):
+        for t in range(10):
+            self.store.record(make_record(t))
+        self.store.stop()
+        rows = self.store.query(3, 6)
+        self.assertEqual([row["time"] for row in rows], [5, 4, 3])
+        self.assertEqual(rows[0]["size_diff_w"], 1.5)
+        self.assertEqual(rows[0]["left_image"], "5_l.jpg")
+
+    def test_query_defect_type(self):
+        self.store.record(make_record(1, ["stain"]))
+        self.store.record(make_record(2, ["stain", "excess_glue"]))
+        self.store.record(make_record(3))
+        self.store.record(make_record(20, ["stain"]))
+        self.store.stop()
+        rows = self.store.query(0, 10, "stain")
+        self.assertEqual([row["time"] for row in rows], [2, 1])
+        self.assertEqual(rows[0]["defect_types"], ["excess_glue", "stain"])
+        self.assertEqual(
+            self.store.count_by_defect(0, 10, ["stain", "excess_glue"]), {
+                "stain": 2,
+                "excess_glue": 1
+            })
+
+    def test_restart(self):
+        self.store.record(make_record(1))
+        self.store.stop()
+        self.store.start()
+        self.store.record(make_record(2))
+        self.store.stop()
+        self.assertEqual(self.store.count(0, 10), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import threading
+import datetime
+import tempfile
+import shutil
+import os
+import numpy as np
+
+from services.image_writer import ImageWriter
+
+
+class ImageWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cur = datetime.datetime(2021, 3, 4, 15, 30)
+        self.images = [np.zeros((8, 8, 3), np.uint8) for _ in range(2)]
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_on_written_after_files_exist(self):
+        writer = ImageWriter(self.folder, workers=1)
+        writer.start()
+        written = []
+        done = threading.Event()
+
+        def on_written(refs):
+            written.append(all(
+                os.path.exists(os.path.join(self.folder, ref))
+                for ref in refs))
+            done.set()
+
+        refs = writer.submit(self.cur, self.images, on_written=on_written)
+        self.assertTrue(done.wait(5))
+        writer.stop()
+        self.assertEqual(len(refs), 2)
+        self.assertEqual(written, [True])
+
+    def test_sharded_refs_are_files(self):
+        writer = ImageWriter(self.folder, workers=1, layout="sharded")
+        writer.start()
+        done = threading.Event()
+        refs = writer.submit(self.cur, self.images,
+                             on_written=lambda r: done.set())
+        self.assertTrue(done.wait(5))
+        writer.stop()
+        # refs go to the api and the history as they are, readers open them
+        for ref in refs:
+            self.assertTrue(os.path.isfile(os.path.join(self.folder, ref)))
+
+    def test_packed_event(self):
+        writer = ImageWriter(self.folder, workers=1, layout="sharded",
+                             pack=True)
+        writer.start()
+        done = threading.Event()
+        written = []
+        files = writer.submit(self.cur, self.images,
+                              on_written=lambda f: (written.extend(f),
+                                                    done.set()))
+        self.assertTrue(done.wait(5))
+        writer.stop()
+        self.assertEqual(written, files)
+        layout = writer.get_layout()
+        entry = layout.read_index(layout.get_day(self.cur))[0]
+        self.assertEqual(len(entry["offsets"]), 2)
+        self.assertEqual(entry["files"], files)
+        # the pack member and the unpacked file hold the same image
+        with open(os.path.join(self.folder, files[1]), "rb") as fi:
+            self.assertEqual(
+                layout.read_image_bytes(entry["pack"] + "#1"), fi.read())
+
+    def test_submit_after_stop(self):
+        writer = ImageWriter(self.folder, workers=1)
+        writer.start()
+        writer.stop()
+        called = []
+        self.assertIsNone(
+            writer.submit(self.cur, self.images, on_written=called.append))
+        self.assertEqual(called, [])
+
+    def test_png_compression(self):
+        writer = ImageWriter(self.folder, image_format="png", quality=90,
+                             png_compression=9, workers=1)
+        writer.start()
+        done = threading.Event()
+        writer.submit(self.cur, self.images, on_written=lambda r: done.set())
+        self.assertTrue(done.wait(5))
+        writer.stop()
+        self.assertEqual(writer.get_stats()["failed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import trio
+
+from services.async_runtime import AsyncRuntime
+from services.model_service import ModelService, STATE_READY, STATE_FAILED, STATE_UNLOADED
+
+CFG = {"err_cfg": {"inp_shape": [8, 8, 3]}}
+
+
+class FakeManager():
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.inferences = []
+
+    async def load_model(self, cfg):
+        await trio.sleep(0)
+        if self.fail: raise ValueError("missing weights")
+
+    async def detect_errors(self, cfg, images, result_info):
+        self.inferences.append(images[0].shape)
+
+
+class ModelServiceTest(unittest.TestCase):
+    def setUp(self):
+        AsyncRuntime.instance().start()
+        self.service = ModelService()
+        return
+
+    def tearDown(self):
+        AsyncRuntime.instance().stop()
+
+    def test_load_and_warm_up(self):
+        manager = FakeManager()
+        self.service.load(manager, CFG, 3).result(5)
+        self.assertEqual(self.service.get_state(), STATE_READY)
+        self.assertEqual(manager.inferences, [(8, 8, 3)] * 3)
+        load_time, warmup_time = self.service.get_load_time()
+        self.assertGreaterEqual(load_time, 0)
+
+    def test_load_failed(self):
+        future = self.service.load(FakeManager(True), CFG)
+        self.assertRaises(ValueError, future.result, 5)
+        self.assertEqual(self.service.get_state(), STATE_FAILED)
+
+    def test_reset_ignores_stale_load(self):
+        future = self.service.load(FakeManager(), CFG)
+        self.service.reset()
+        future.result(5)
+        self.assertEqual(self.service.get_state(), STATE_UNLOADED)
+
+
+if __name__ == '__main__':
+    unittest.main()
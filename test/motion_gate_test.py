@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+
+from services.motion_gate import MotionGate
+
+
+class MotionGateTest(unittest.TestCase):
+    def setUp(self):
+        self.gate = MotionGate(sensitivity=0.01, force_interval=10)
+        self.empty = np.full((120, 160, 3), 20, dtype=np.uint8)
+        return
+
+    def test_skip_static_frames(self):
+        self.assertEqual(self.gate.check(0, self.empty), True)
+        self.assertEqual(self.gate.check(0.1, self.empty.copy()), False)
+        self.assertEqual(self.gate.get_stats(), {"passed": 1, "skipped": 1})
+
+    def test_pass_on_change(self):
+        self.gate.check(0, self.empty)
+        frame = self.empty.copy()
+        frame[40:80, 60:100] = 200
+        self.assertEqual(self.gate.check(0.1, frame), True)
+
+    def test_forced_frame(self):
+        self.gate.check(0, self.empty)
+        self.assertEqual(self.gate.check(5, self.empty), False)
+        self.assertEqual(self.gate.check(10, self.empty), True)
+
+    def test_change_outside_bounds(self):
+        self.gate.check(0, self.empty, (40, 120))
+        frame = self.empty.copy()
+        frame[:, :30] = 200
+        self.assertEqual(self.gate.check(0.1, frame, (40, 120)), False)
+
+
+if __name__ == '__main__':
+    unittest.main()
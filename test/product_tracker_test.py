@@ -0,0 +1,63 @@
+import unittest
+
+from services.product_tracker import ProductTracker, get_iou
+
+
+class ProductTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.tracker = ProductTracker(0.3, 30, 2)
+        return
+
+    def test_iou(self):
+        self.assertEqual(get_iou((0, 0, 10, 10), (20, 0, 30, 10)), 0.)
+        self.assertAlmostEqual(get_iou((0, 0, 10, 10), (5, 0, 15, 10)), 1 / 3)
+
+    def test_keep_identity_while_moving(self):
+        ids = [
+            self.tracker.update([(x, 0, x + 100, 50)])[0]
+            for x in range(0, 200, 20)
+        ]
+        self.assertEqual(len(set(ids)), 1)
+
+    def test_two_products(self):
+        first = self.tracker.update([(0, 0, 100, 50), (300, 0, 400, 50)])
+        second = self.tracker.update([(310, 0, 410, 50), (10, 0, 110, 50)])
+        self.assertEqual(second, [first[1], first[0]])
+
+    def test_inspect_once(self):
+        track_id = self.tracker.update([(0, 0, 100, 50)])[0]
+        self.assertEqual(self.tracker.mark_inspected(track_id), True)
+        track_id = self.tracker.update([(10, 0, 110, 50)])[0]
+        self.assertEqual(self.tracker.mark_inspected(track_id), False)
+
+    def test_expire_missed_tracks(self):
+        first = self.tracker.update([(0, 0, 100, 50)])[0]
+        for _ in range(3):
+            self.tracker.update([])
+        self.assertEqual(self.tracker.get_track_count(), 0)
+        second = self.tracker.update([(0, 0, 100, 50)])[0]
+        self.assertNotEqual(first, second)
+
+
+    def test_stationary_product_keeps_id_while_gated(self):
+        tracker = ProductTracker(0.3, 30, 2, max_idle=10)
+        first = tracker.update([(0, 0, 100, 50)], 0.)[0]
+        self.assertEqual(tracker.mark_inspected(first), True)
+        # more gated frames than max_missed, the product did not move
+        for i in range(1, 30):
+            tracker.gated(i * 0.1)
+        second = tracker.update([(0, 0, 100, 50)], 3.)[0]
+        self.assertEqual(second, first)
+        self.assertEqual(tracker.mark_inspected(second), False)
+
+    def test_expire_idle_tracks(self):
+        tracker = ProductTracker(0.3, 30, 2, max_idle=10)
+        tracker.update([(0, 0, 100, 50)], 0.)
+        tracker.gated(5.)
+        self.assertEqual(tracker.get_track_count(), 1)
+        tracker.gated(11.)
+        self.assertEqual(tracker.get_track_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
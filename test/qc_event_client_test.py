@@ -0,0 +1,80 @@
+import unittest
+import datetime
+import tempfile
+import shutil
+import os
+
+from services.event_outbox import EventOutbox, SEND_OK, SEND_RETRY, \
+    SEND_REJECTED
+from services.qc_event_client import QcEventClient, get_send_result, \
+    get_created_time_str
+from test.event_outbox_test import StubApiServer, wait_until
+
+PAYLOAD = {
+    "created_time_str": "2021-03-04T08:30:00Z",
+    "defect_types": ["STAIN"],
+    "left_image": "20210304/a_0.jpg",
+    "right_image": "20210304/a_1.jpg",
+    "side_images": []
+}
+
+
+class QcEventClientTest(unittest.TestCase):
+    def test_send_result(self):
+        self.assertEqual(get_send_result(201), SEND_OK)
+        self.assertEqual(get_send_result(503), SEND_RETRY)
+        self.assertEqual(get_send_result(429), SEND_RETRY)
+        self.assertEqual(get_send_result(400), SEND_REJECTED)
+        self.assertEqual(get_send_result(404), SEND_REJECTED)
+
+    def test_created_time_is_utc(self):
+        cur = datetime.datetime(2021, 3, 4, 15, 30,
+                                tzinfo=datetime.timezone(
+                                    datetime.timedelta(hours=7)))
+        self.assertEqual(get_created_time_str(cur), "2021-03-04T08:30:00Z")
+
+
+class QcEventClientServerTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.folder, "outbox.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def __deliver(self, server):
+        client = QcEventClient(server.base_url)
+        outbox = EventOutbox(
+            self.db_path,
+            lambda payload, key: client.submit(payload,
+                                               {"Idempotency-Key": key}),
+            base_backoff=0.01)
+        outbox.start()
+        key = outbox.enqueue(PAYLOAD)
+        wait_until(lambda: outbox.get_pending_count() == 0)
+        counts = (outbox.get_pending_count(), outbox.get_dead_letter_count())
+        outbox.close()
+        client.close()
+        return key, counts
+
+    def test_retry_until_accepted(self):
+        with StubApiServer(statuses=[503, 429]) as server:
+            key, counts = self.__deliver(server)
+        self.assertEqual(counts, (0, 0))
+        # the same key on every attempt, over one kept-alive connection
+        self.assertEqual(server.requests, [key, key, key])
+        self.assertEqual(len(set(server.clients)), 1)
+        body = server.accepted[key]
+        self.assertEqual(body["details"], [{"defect_type_code": "STAIN"}])
+        self.assertEqual(body["created_time_str"], "2021-03-04T08:30:00Z")
+
+    def test_rejected_is_dead_lettered(self):
+        with StubApiServer(statuses=[400]) as server:
+            key, counts = self.__deliver(server)
+        self.assertEqual(counts, (0, 1))
+        self.assertEqual(server.requests, [key])
+        self.assertEqual(server.accepted, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
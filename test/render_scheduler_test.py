@@ -0,0 +1,42 @@
+import unittest
+import time
+
+from services.render_scheduler import RenderScheduler
+
+
+class RenderSchedulerTest(unittest.TestCase):
+    def test_take_latest(self):
+        scheduler = RenderScheduler(1000)
+        scheduler.offer(1)
+        scheduler.offer(2)
+        self.assertEqual(scheduler.take(), 2)
+        self.assertEqual(scheduler.take(), None)
+
+    def test_rate_cap(self):
+        scheduler = RenderScheduler(20)
+        scheduler.offer(1)
+        self.assertEqual(scheduler.take(), 1)
+        scheduler.offer(2)
+        self.assertEqual(scheduler.take(), None)
+        time.sleep(0.06)
+        self.assertEqual(scheduler.take(), 2)
+
+    def test_stats(self):
+        scheduler = RenderScheduler(1000)
+        for i in range(5):
+            scheduler.offer(i)
+        scheduler.take()
+        self.assertEqual(scheduler.get_stats(), {
+            "offered": 5,
+            "rendered": 1
+        })
+
+    def test_clear(self):
+        scheduler = RenderScheduler(1000)
+        scheduler.offer(1)
+        scheduler.clear()
+        self.assertEqual(scheduler.take(), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+
+from services.roi_extractor import RoiExtractor, get_roi_bounds, get_roi_config, offset_boxes
+
+CFG = {
+    "name": "Main cam",
+    "detect_range": (0.25, 0.75),
+    "min_width_per": 0.1,
+    "stop_condition": 0,
+    "frame_width": 400
+}
+
+
+def make_box(x):
+    c = np.array([[[x, 10]], [[x + 20, 10]]], dtype=np.int32)
+    box = np.array([[x, 0], [x + 20, 0], [x + 20, 30], [x, 30]],
+                   dtype=np.float32)
+    return (c, ((x + 10, 15), (20, 30), 0), 30, 20, box, (x, 0), (x + 20, 0),
+            (x + 20, 30), (x, 30), x, x + 20, x + 10)
+
+
+class FakeManager():
+    def __init__(self):
+        self.calls = []
+
+    def extract_boxes(self, cfg, image):
+        self.calls.append((cfg, image))
+        return [make_box(5)], image
+
+
+class RoiExtractorTest(unittest.TestCase):
+    def test_bounds(self):
+        self.assertEqual(get_roi_bounds(CFG, 400, 0.05), (80, 320))
+        self.assertEqual(get_roi_bounds(CFG, 400, 0.5), (0, 400))
+
+    def test_config(self):
+        roi_cfg = get_roi_config(CFG, 400, 80, 320)
+        self.assertEqual(roi_cfg["frame_width"], 240)
+        self.assertAlmostEqual(roi_cfg["min_width_per"], 0.1 * 400 / 240)
+        self.assertAlmostEqual(roi_cfg["detect_range"][0], 20 / 240)
+        self.assertAlmostEqual(roi_cfg["detect_range"][1], 220 / 240)
+        self.assertEqual(roi_cfg["stop_condition"], 0)
+        self.assertEqual(CFG["min_width_per"], 0.1)
+
+    def test_offset_boxes(self):
+        result = offset_boxes([make_box(5)], 80)[0]
+        expected = make_box(85)
+        np.testing.assert_array_equal(result[0], expected[0])
+        np.testing.assert_array_equal(result[4], expected[4])
+        self.assertEqual(result[1], expected[1])
+        self.assertEqual(result[5:], expected[5:])
+
+    def test_extract_view(self):
+        manager = FakeManager()
+        image = np.zeros((100, 400, 3), dtype=np.uint8)
+        extractor = RoiExtractor(manager, 0.05)
+        boxes, proc = extractor.extract_boxes(CFG, image)
+        roi_image = manager.calls[0][1]
+        self.assertEqual(roi_image.shape, (100, 240, 3))
+        self.assertTrue(np.shares_memory(roi_image, image))
+        self.assertEqual(boxes[0][9], 85)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from services.sample_feature_cache import SampleFeatureCache, get_config_fingerprint
+
+
+class FakeManager():
+    def __init__(self):
+        self.sample_left = object()
+        self.sample_right = object()
+        self.calls = 0
+
+    def get_sample_left(self):
+        return self.sample_left
+
+    def get_sample_right(self):
+        return self.sample_right
+
+    def preprocess_images(self, cfg, left, right):
+        self.calls += 1
+        return (cfg["color_cfg"]["blur_val"], self.calls)
+
+
+class SampleFeatureCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = SampleFeatureCache(max_entries=2)
+        self.manager = FakeManager()
+        self.cfg = {"color_cfg": {"blur_val": 0.05}, "sim_cfg": {"C1": 1}}
+        return
+
+    def test_fingerprint_ignores_other_fields(self):
+        other = {"color_cfg": {"blur_val": 0.05}, "sim_cfg": {"C1": 2}}
+        self.assertEqual(get_config_fingerprint(self.cfg),
+                         get_config_fingerprint(other))
+
+    def test_hit_on_same_config(self):
+        self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.assertEqual(self.manager.calls, 1)
+
+    def test_miss_on_changed_config(self):
+        self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.cfg["color_cfg"]["blur_val"] = 0.1
+        result = self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.assertEqual(result, (0.1, 2))
+
+    def test_miss_on_new_samples(self):
+        self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.manager.sample_left = object()
+        self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.assertEqual(self.manager.calls, 2)
+
+    def test_evicts_least_recent(self):
+        for blur in [0.1, 0.2, 0.3]:
+            self.cfg["color_cfg"]["blur_val"] = blur
+            self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.assertEqual(self.cache.get_stats()["entries"], 2)
+
+    def test_invalidate(self):
+        self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.cache.invalidate()
+        self.cache.get_preprocessed_samples(self.manager, self.cfg)
+        self.assertEqual(self.manager.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import time
+
+from services.stage_metrics import StageMetrics, RollingHistogram, END_TO_END
+
+
+class StageMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.metrics = StageMetrics(window=100)
+        return
+
+    def test_percentiles(self):
+        hist = RollingHistogram(100)
+        for i in range(1, 101):
+            hist.add(i)
+        result = hist.percentiles()
+        self.assertEqual(result, {"p50": 51, "p95": 95, "p99": 99})
+
+    def test_percentiles_empty(self):
+        result = RollingHistogram().percentiles((50, ))
+        self.assertEqual(result, {"p50": None})
+
+    def test_window(self):
+        hist = RollingHistogram(2)
+        for i in [100, 1, 1]:
+            hist.add(i)
+        self.assertEqual(hist.percentiles((99, ))["p99"], 1)
+        self.assertEqual(hist.get_count(), 3)
+
+    def test_measure(self):
+        with self.metrics.measure("extract_boxes"):
+            time.sleep(0.01)
+        result = self.metrics.get_summary()["extract_boxes"]
+        self.assertEqual(result["count"], 1)
+        self.assertGreaterEqual(result["wall"]["p50"], 0.01)
+        self.assertLess(result["cpu"]["p50"], result["wall"]["p50"])
+
+    def test_record_latency(self):
+        self.metrics.record_latency(time.monotonic() - 0.5)
+        result = self.metrics.get_summary()[END_TO_END]
+        self.assertGreaterEqual(result["wall"]["p50"], 0.5)
+        self.assertEqual(result["cpu"]["p50"], None)
+
+    def test_reset(self):
+        self.metrics.record("group", 0.1)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.get_summary(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
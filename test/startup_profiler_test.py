@@ -0,0 +1,36 @@
+import unittest
+import time
+
+from services.startup_profiler import StartupProfiler, KIND_IMPORT, KIND_SCREEN
+
+
+class StartupProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.profiler = StartupProfiler()
+        return
+
+    def test_report_sorted_by_cost(self):
+        with self.profiler.measure(KIND_IMPORT, "fast"):
+            pass
+        with self.profiler.measure(KIND_SCREEN, "slow"):
+            time.sleep(0.02)
+        entries = self.profiler.get_report()["entries"]
+        self.assertEqual([e["name"] for e in entries], ["slow", "fast"])
+        self.assertGreaterEqual(entries[0]["seconds"], 0.02)
+
+    def test_measure_on_error(self):
+        try:
+            with self.profiler.measure(KIND_IMPORT, "missing"):
+                raise ImportError()
+        except ImportError:
+            pass
+        self.assertEqual(len(self.profiler.get_report()["entries"]), 1)
+
+    def test_format_report(self):
+        with self.profiler.measure(KIND_IMPORT, "FQCS.manager"):
+            pass
+        self.assertIn("FQCS.manager", self.profiler.format_report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import datetime
+import tempfile
+import shutil
+import os
+
+from services.storage_layout import StorageLayout, LAYOUT_FLAT, \
+    LAYOUT_SHARDED, write_pack, read_pack_member, split_ref, get_shard_prefix
+
+
+class StorageLayoutTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cur = datetime.datetime(2021, 3, 4, 15, 30)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_flat_folder(self):
+        layout = StorageLayout(self.folder, LAYOUT_FLAT)
+        self.assertEqual(layout.get_event_folder(self.cur, "abc"), "20210304")
+
+    def test_sharded_folder(self):
+        layout = StorageLayout(self.folder, LAYOUT_SHARDED, shard_chars=2)
+        folder = layout.get_event_folder(self.cur, "abc")
+        self.assertEqual(folder,
+                         os.path.join("20210304", "15",
+                                      get_shard_prefix("abc", 2)))
+        _, refs = layout.get_refs(folder, "abc", 2, ".jpg")
+        self.assertEqual(refs[1], os.path.join(folder, "abc_1.jpg"))
+
+    def test_invalid_layout(self):
+        with self.assertRaises(ValueError):
+            StorageLayout(self.folder, "tree")
+
+    def test_pack(self):
+        path = os.path.join(self.folder, "event.pack")
+        offsets = write_pack(path, [b"left", b"right!"])
+        self.assertEqual([length for _, length in offsets], [4, 6])
+        self.assertEqual(read_pack_member(path, 1), b"right!")
+        with self.assertRaises(IndexError):
+            read_pack_member(path, 2)
+
+    def test_packed_refs(self):
+        layout = StorageLayout(self.folder, LAYOUT_SHARDED, pack=True)
+        folder = layout.get_event_folder(self.cur, "abc")
+        layout.ensure_folder(folder)
+        pack_path, refs = layout.get_refs(folder, "abc", 2, ".jpg")
+        self.assertEqual(split_ref(refs[1]), (pack_path, 1))
+        self.assertEqual(split_ref("a#b.jpg"), ("a#b.jpg", None))
+        write_pack(layout.get_abs_path(pack_path), [b"l", b"r"])
+        self.assertEqual(layout.read_image_bytes(refs[0]), b"l")
+
+    def test_day_index(self):
+        layout = StorageLayout(self.folder, LAYOUT_SHARDED)
+        layout.ensure_folder(layout.get_event_folder(self.cur, "abc"))
+        day = layout.get_day(self.cur)
+        layout.append_index(day, {"event": "abc", "files": ["a.jpg"]})
+        layout.append_index(day, {"event": "def", "files": ["b.jpg"]})
+        self.assertEqual([e["event"] for e in layout.read_index(day)],
+                         ["abc", "def"])
+        self.assertEqual(layout.read_index("20000101"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
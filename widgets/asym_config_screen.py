@@ -9,9 +9,11 @@ import imutils
 import cv2
 import os
 import numpy as np
-import trio
 import datetime
 from app_constants import ISO_DATE_FORMAT
+from services.async_runtime import AsyncRuntime
+import asyncio
+from services.sample_feature_cache import SampleFeatureCache
 import json
 
 
@@ -24,6 +26,7 @@ class AsymConfigScreen(QWidget):
     def __init__(self, parent=None):
         QWidget.__init__(self, parent)
         self.__current_cfg = None
+        self.__calc_task = None
         self.ui = Ui_AsymConfigScreen()
         self.ui.setupUi(self)
         self.build()
@@ -56,10 +59,10 @@ class AsymConfigScreen(QWidget):
         self.ui.screen3Left.deleteLater()
         self.ui.screen3Right.deleteLater()
 
-        self.image_detect_left.ui.lblImage.setAlignment(Qt.AlignCenter)
-        self.image_detect_right.ui.lblImage.setAlignment(Qt.AlignCenter)
-        self.image_sample_left.ui.lblImage.setAlignment(Qt.AlignCenter)
-        self.image_sample_right.ui.lblImage.setAlignment(Qt.AlignCenter)
+        self.image_detect_left.setAlignment(Qt.AlignCenter)
+        self.image_detect_right.setAlignment(Qt.AlignCenter)
+        self.image_sample_left.setAlignment(Qt.AlignCenter)
+        self.image_sample_right.setAlignment(Qt.AlignCenter)
 
     # binding
     def binding(self):
@@ -148,10 +151,8 @@ class AsymConfigScreen(QWidget):
 
     def __view_image_sample(self):
         manager = DetectorConfig.instance().get_manager()
-        left = manager.get_sample_left()
-        right = manager.get_sample_right()
-        self.__sample_left, self.__sample_right = self.__preprocess_color(
-            left, right)
+        self.__sample_left, self.__sample_right = SampleFeatureCache.instance(
+        ).get_preprocessed_samples(manager, self.__current_cfg)
         label_h = self.image1.height()
         img_size = (156, label_h - 30)
         m_left = cv2.resize(self.__sample_left,
@@ -210,7 +211,11 @@ class AsymConfigScreen(QWidget):
         if detected_pair is not None:
             left, right = self.__preprocess_color(detected_pair[0],
                                                   detected_pair[1])
-            trio.run(self.__detect_asym_diff, left, right)
+            # one calculation at a time off the GUI thread, frames arriving
+            # meanwhile are only displayed
+            if self.__calc_task is None or self.__calc_task.done():
+                self.__calc_task = asyncio.ensure_future(
+                    self.__detect_asym_diff(left, right))
             left = cv2.resize(left, img_size)
             right = cv2.resize(right, img_size)
             self.image_detect_left.imshow(left)
@@ -220,9 +225,9 @@ class AsymConfigScreen(QWidget):
         sim_cfg = self.__current_cfg["sim_cfg"]
         min_sim = sim_cfg['min_similarity']
         manager = DetectorConfig.instance().get_manager()
-        left_result, right_result = await manager.detect_asym(
-            self.__current_cfg, left, right, self.__sample_left,
-            self.__sample_right, None)
+        left_result, right_result = await AsyncRuntime.instance(
+        ).run_in_thread(manager.detect_asym, self.__current_cfg, left, right,
+                        self.__sample_left, self.__sample_right, None)
         is_asym_diff_left, avg_asym_left, avg_amp_left, recalc_left, res_list_l, amp_res_list_l = left_result
         is_asym_diff_right, avg_asym_right, avg_amp_right, recalc_right, res_list_r, amp_res_list_r = right_result
 
@@ -8,7 +8,9 @@ from app import helpers
 import numpy as np
 import os
 import imutils
-import trio
+from services.async_runtime import AsyncRuntime
+import asyncio
+from services.sample_feature_cache import SampleFeatureCache
 from views.color_param_calibration_screen import Ui_ColorParamCalibScreen
 import datetime
 from app_constants import ISO_DATE_FORMAT
@@ -27,6 +29,7 @@ class ColorParamCalibrationScreen(QWidget):
     def __init__(self, parent=None):
         QWidget.__init__(self, parent)
         self.__current_cfg = None
+        self.__calc_task = None
         self.ui = Ui_ColorParamCalibScreen()
         self.ui.setupUi(self)
         self.build()
@@ -58,10 +61,10 @@ class ColorParamCalibrationScreen(QWidget):
         self.ui.screen3Left.deleteLater()
         self.ui.screen3Right.deleteLater()
 
-        self.image_detect_left.ui.lblImage.setAlignment(Qt.AlignCenter)
-        self.image_detect_right.ui.lblImage.setAlignment(Qt.AlignCenter)
-        self.image_sample_left.ui.lblImage.setAlignment(Qt.AlignCenter)
-        self.image_sample_right.ui.lblImage.setAlignment(Qt.AlignCenter)
+        self.image_detect_left.setAlignment(Qt.AlignCenter)
+        self.image_detect_right.setAlignment(Qt.AlignCenter)
+        self.image_sample_left.setAlignment(Qt.AlignCenter)
+        self.image_sample_right.setAlignment(Qt.AlignCenter)
         return
 
     def showEvent(self, event):
@@ -151,9 +154,8 @@ class ColorParamCalibrationScreen(QWidget):
 
     def __view_image_sample(self):
         manager = DetectorConfig.instance().get_manager()
-        left = manager.get_sample_left()
-        right = manager.get_sample_right()
-        m_left, m_right = self.__preprocess_color(left, right)
+        m_left, m_right = SampleFeatureCache.instance(
+        ).get_preprocessed_samples(manager, self.__current_cfg)
         label_h = self.ui.screen2.height()
         img_size = (156, label_h - 30)
         m_left = cv2.resize(m_left, img_size, interpolation=cv2.INTER_AREA)
@@ -178,7 +180,11 @@ class ColorParamCalibrationScreen(QWidget):
         if detected_pair is not None:
             left, right = self.__preprocess_color(detected_pair[0],
                                                   detected_pair[1])
-            trio.run(self.__find_amp_threshold, left, right)
+            # one calculation at a time off the GUI thread, frames arriving
+            # meanwhile are only displayed
+            if self.__calc_task is None or self.__calc_task.done():
+                self.__calc_task = asyncio.ensure_future(
+                    self.__find_amp_threshold(left, right))
             left = cv2.resize(left, img_size)
             right = cv2.resize(right, img_size)
             self.image_detect_left.imshow(left)
@@ -187,14 +193,12 @@ class ColorParamCalibrationScreen(QWidget):
 
     async def __find_amp_threshold(self, img_left, img_right):
         manager = DetectorConfig.instance().get_manager()
-        sample_left = manager.get_sample_left()
-        sample_right = manager.get_sample_right()
-        sample_left, sample_right = self.__preprocess_color(
-            sample_left, sample_right)
+        sample_left, sample_right = SampleFeatureCache.instance(
+        ).get_preprocessed_samples(manager, self.__current_cfg)
 
-        left_task, right_task = await manager.compare_colors(
-            self.__current_cfg, img_left, img_right, sample_left, sample_right,
-            not self.__amp_thresh_edited, None)
+        left_task, right_task = await AsyncRuntime.instance().run_in_thread(
+            manager.compare_colors, self.__current_cfg, img_left, img_right,
+            sample_left, sample_right, not self.__amp_thresh_edited, None)
         _, avg_diff_l, left_hist, is_diff_l = left_task
         _, avg_diff_r, right_hist, is_diff_r = right_task
         blue = max(left_hist[0], right_hist[0])
@@ -6,6 +6,7 @@ from widgets.image_widget import ImageWidget
 from app_models.detector_config import DetectorConfig
 from FQCS import detector, helper
 from app import helpers
+from services.sample_feature_cache import SampleFeatureCache
 import numpy as np
 import os
 import cv2
@@ -35,8 +36,8 @@ class ColorPreprocessConfigScreen(QWidget):
         self.imageLayout = self.ui.screen1.parentWidget().layout()
         self.imageLayout.replaceWidget(self.ui.screen1, self.image1)
         self.imageLayout.replaceWidget(self.ui.screen2, self.image2)
-        self.image1.ui.lblImage.setAlignment(Qt.AlignCenter)
-        self.image2.ui.lblImage.setAlignment(Qt.AlignCenter)
+        self.image1.setAlignment(Qt.AlignCenter)
+        self.image2.setAlignment(Qt.AlignCenter)
         self.ui.screen1.deleteLater()
         self.ui.screen2.deleteLater()
 
@@ -124,11 +125,9 @@ class ColorPreprocessConfigScreen(QWidget):
 
     def __view_image(self):
         manager = DetectorConfig.instance().get_manager()
-        left = manager.get_sample_left()
-        right = manager.get_sample_right()
-        if (left is not None and right is not None):
-            modified_left, modified_right = self.__preprocess_color(
-                left, right)
+        modified_left, modified_right = SampleFeatureCache.instance(
+        ).get_preprocessed_samples(manager, self.__current_cfg)
+        if (modified_left is not None and modified_right is not None):
             label_h = self.image1.height()
             img_size = (256, label_h - 50)
             modified_left = cv2.resize(modified_left,
@@ -143,14 +142,6 @@ class ColorPreprocessConfigScreen(QWidget):
             self.image1.imshow(None)
             self.image2.imshow(None)
 
-    def __preprocess_color(self, sample_left, sample_right):
-        manager = DetectorConfig.instance().get_manager()
-        pre_sample_left = manager.preprocess(self.__current_cfg, sample_left,
-                                             True)
-        pre_sample_right = manager.preprocess(self.__current_cfg, sample_right,
-                                              False)
-        return pre_sample_left, pre_sample_right
-
     def __load_config(self):
         #load from default
         color_cfg = self.__current_cfg["color_cfg"]
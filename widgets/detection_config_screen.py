@@ -9,6 +9,7 @@ from FQCS import detector, helper
 from app_models.detector_config import DetectorConfig
 from cv2 import cv2
 from app import helpers
+from services.camera_discovery import CameraDiscovery
 
 
 class DetectionConfigScreen(QWidget):
@@ -21,10 +22,10 @@ class DetectionConfigScreen(QWidget):
     nextscreen: Signal
     captured = Signal()
     camera_changed = Signal(object)
+    __cameras_discovered = Signal(object)
 
     def __init__(self, parent=None):
         QWidget.__init__(self, parent)
-        self.__cam_array = helpers.get_all_camera_index()
         self.__current_cfg = None
         self.ui = Ui_DetectionConfigScreen()
         self.ui.setupUi(self)
@@ -47,9 +48,7 @@ class DetectionConfigScreen(QWidget):
         self.ui.cbbHeight.setPlaceholderText("Height")
         self.ui.cbbCamera.setPlaceholderText("Choose Cam")
 
-        self.ui.cbbCamera.clear()
-        for camera in self.__cam_array:
-            self.ui.cbbCamera.addItem("Camera " + str(camera), userData=camera)
+        self.__fill_cameras(CameraDiscovery.instance().get_cameras())
 
         frame_resize_values = [
             "160", "240", "320", "400", "480", "560", "640", "720", "800",
@@ -85,6 +84,8 @@ class DetectionConfigScreen(QWidget):
         self.tblPopMenu.addAction(self.tblPopActionRemove)
 
     def showEvent(self, event):
+        # refreshes in background when the cached list is too old
+        CameraDiscovery.instance().get_cameras()
         _, self.__current_cfg = DetectorConfig.instance().get_current_cfg()
         self.__set_btn_capture_text()
         if self.__current_cfg is None:
@@ -150,6 +151,10 @@ class DetectionConfigScreen(QWidget):
         self.ui.sldLightAdjRange.valueChanged.connect(
             self.sld_light_adj_range_value_change)
         self.ui.cbbCamera.currentIndexChanged.connect(self.cbbCamera_changed)
+        # discovery runs in background, results come back on the GUI thread
+        self.__cameras_discovered.connect(self.__fill_cameras)
+        CameraDiscovery.instance().add_listener(
+            self.__cameras_discovered.emit)
         self.ui.btnColorFrom.clicked.connect(self.btn_color_from_clicked)
         self.ui.btnColorTo.clicked.connect(self.btn_color_to_clicked)
         self.ui.cbbHeight.currentIndexChanged.connect(self.cbbHeight_changed)
@@ -341,7 +346,30 @@ class DetectionConfigScreen(QWidget):
             self.__show_config_section(False)
             self.camera_changed.emit(-1)
 
+    def __fill_cameras(self, cameras):
+        camera_uri = self.ui.cbbCamera.currentData()
+        camera_text = self.ui.cbbCamera.currentText()
+        self.ui.cbbCamera.blockSignals(True)
+        self.ui.cbbCamera.clear()
+        for camera in cameras:
+            self.ui.cbbCamera.addItem(
+                f"{camera['name']} ({camera['width']}x{camera['height']})",
+                userData=camera["source"])
+        # a refresh that missed the selected camera does not unselect it
+        self.__select_camera(camera_uri, camera_text)
+        self.ui.cbbCamera.blockSignals(False)
+
+    def __select_camera(self, camera_uri, camera_text=None):
+        camera_index = self.ui.cbbCamera.findData(camera_uri)
+        if camera_index == -1 and camera_uri is not None:
+            self.ui.cbbCamera.addItem(camera_text or f"Camera {camera_uri}",
+                                      userData=camera_uri)
+            camera_index = self.ui.cbbCamera.count() - 1
+        self.ui.cbbCamera.setCurrentIndex(camera_index)
+        return camera_index
+
     def cbbCamera_changed(self):
+        if self.__current_cfg is None: return
         index = self.ui.cbbCamera.currentData()
         self.__current_cfg["camera_uri"] = index
         self.camera_changed.emit(index)
@@ -456,11 +484,9 @@ class DetectionConfigScreen(QWidget):
         self.ui.cbbWidth.setCurrentIndex(width_index)
 
         camera_uri = self.__current_cfg["camera_uri"]
-        if camera_uri is not None and camera_uri < self.ui.cbbCamera.count():
-            self.ui.cbbCamera.setCurrentIndex(camera_uri)
+        camera_index = self.__select_camera(camera_uri)
+        if camera_index != -1:
             self.camera_changed.emit(camera_uri)
-        else:
-            self.ui.cbbCamera.setCurrentIndex(-1)
         self.__reload_roles()
 
     def __add_new_row(self, table, camera_name, is_main):
@@ -14,7 +14,10 @@ import matplotlib.pyplot as plt
 import numpy as np
 from qasync import asyncSlot
 from services.worker_runnable import WorkerRunnable
-import trio
+from services.async_runtime import AsyncRuntime
+from services.defect_results import prepare_display_images, get_detections, \
+    draw_detections
+from services.model_service import ModelService
 
 
 class ErrorDetectScreen(QWidget):
@@ -120,9 +123,11 @@ class ErrorDetectScreen(QWidget):
     @asyncSlot()
     async def btn_reload_model_clicked(self):
         try:
-            await DetectorConfig.instance().get_manager().load_model(
-                self.__current_cfg)
-            helpers.show_message("Finish reloading model")
+            load_time, warmup_time = await ModelService.instance().load_async(
+                DetectorConfig.instance().get_manager(), self.__current_cfg,
+                AppConfig.instance().config.get("model_warmup_runs", 2))
+            helpers.show_message(
+                f"Finish reloading model in {load_time + warmup_time:.2f}s")
         except:
             helpers.show_message("Error reloading model")
 
@@ -208,43 +213,34 @@ class ErrorDetectScreen(QWidget):
 
     async def __detect_error(self, images):
         manager = DetectorConfig.instance().get_manager()
+        err_cfg = self.__current_cfg["err_cfg"]
+        display_images = prepare_display_images(images, err_cfg["img_size"])
         err_task = manager.detect_errors(self.__current_cfg, images, None)
         boxes, scores, classes, valid_detections = await err_task
-        err_cfg = self.__current_cfg["err_cfg"]
-        helper.draw_yolo_results(images,
-                                 boxes,
-                                 scores,
-                                 classes,
-                                 err_cfg["classes"],
-                                 err_cfg["img_size"],
-                                 min_score=err_cfg["yolo_score_threshold"])
+        detections = get_detections(boxes, scores, classes,
+                                    err_cfg["img_size"],
+                                    err_cfg["yolo_score_threshold"])
+        draw_detections(display_images, detections, err_cfg["classes"])
 
         label_w = self.image3.width()
         label_h = self.image3.height()
-        for idx, img in enumerate(images):
-            images[idx] *= 255.
-            images[idx] = np.asarray(images[idx], np.uint8)
-        final_img = helpers.concat_images(images, label_w, label_h)
+        final_img = helpers.concat_images(display_images, label_w, label_h)
         self.image3.imshow(final_img)
 
     async def __detect_error_on_picture(self, images):
         manager = DetectorConfig.instance().get_manager()
-        err_task = manager.detect_errors(self.__current_cfg, images, None)
-        boxes, scores, classes, valid_detections = await err_task
         err_cfg = self.__current_cfg["err_cfg"]
-        helper.draw_yolo_results(images,
-                                 boxes,
-                                 scores,
-                                 classes,
-                                 err_cfg["classes"],
-                                 err_cfg["img_size"],
-                                 min_score=err_cfg["yolo_score_threshold"])
+        display_images = prepare_display_images(images, err_cfg["img_size"])
+        err_task = AsyncRuntime.instance().run_in_thread(
+            manager.detect_errors, self.__current_cfg, images, None)
+        boxes, scores, classes, valid_detections = await err_task
+        detections = get_detections(boxes, scores, classes,
+                                    err_cfg["img_size"],
+                                    err_cfg["yolo_score_threshold"])
+        draw_detections(display_images, detections, err_cfg["classes"])
         label_w = self.image3.width()
         label_h = self.image3.height()
-        for idx, img in enumerate(images):
-            images[idx] *= 255.
-            images[idx] = np.asarray(images[idx], np.uint8)
-        final_img = helpers.concat_images(images, label_w, label_h)
+        final_img = helpers.concat_images(display_images, label_w, label_h)
         self.image3.imshow(final_img)
 
     def __process_pair(self, image):
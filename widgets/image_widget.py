@@ -1,22 +1,77 @@
-from PySide2.QtGui import QImage, QPixmap
-from PySide2.QtWidgets import QWidget
+from PySide2.QtGui import QImage, QPainter
+from PySide2.QtWidgets import QWidget, QStyle
+from PySide2.QtCore import Qt
 from views.image_widget import Ui_ImageWidget
 import numpy as np
 
+# Qt >= 5.14 reads OpenCV's channel order directly
+FORMAT_BGR888 = getattr(QImage, "Format_BGR888", None)
+
 
 class ImageWidget(QWidget):
     def __init__(self):
         QWidget.__init__(self)
         self.ui = Ui_ImageWidget()
         self.ui.setupUi(self)
+        # frames are painted by the widget itself, the label stays empty
+        self.ui.lblImage.hide()
+        self.__alignment = Qt.AlignLeft | Qt.AlignVCenter
+        self.__scaled_contents = False
+        self.__buffer = None
+        self.__qimage = None
+        self.__has_image = False
+
+    def setAlignment(self, alignment):
+        self.__alignment = alignment
+        self.update()
+
+    def setScaledContents(self, scaled):
+        # fit the image to the widget instead of only shrinking large ones
+        self.__scaled_contents = scaled
+        self.update()
 
     def imshow(self, image):
         if image is None:
-            self.ui.lblImage.clear()
+            self.__has_image = False
+            self.update()
             return
         length = image.shape[2] if len(image.shape) > 2 else 1
-        imformat = QImage.Format_Grayscale8 if length == 1 else QImage.Format_RGB888
-        image = QImage(image.data, image.shape[1], image.shape[0],
-                       length * image.shape[1],
-                       imformat).rgbSwapped()  # 1: width, 0:height, 2:channel
-        self.ui.lblImage.setPixmap(QPixmap.fromImage(image))
+        if length == 4: image = image[..., :3]
+        self.__ensure_buffer(image.shape[0], image.shape[1], length == 1)
+        if length == 1 or FORMAT_BGR888 is not None:
+            np.copyto(self.__buffer, image, casting="unsafe")
+        else:
+            np.copyto(self.__buffer, image[..., ::-1], casting="unsafe")
+        self.__has_image = True
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.__has_image: return
+        painter = QPainter(self)
+        target = self.__get_target_rect()
+        if target.size() != self.__qimage.size():
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.drawImage(target, self.__qimage)
+        painter.end()
+
+    def __ensure_buffer(self, height, width, is_gray):
+        shape = (height, width) if is_gray else (height, width, 3)
+        if self.__buffer is not None and self.__buffer.shape == shape:
+            return
+        self.__buffer = np.empty(shape, dtype=np.uint8)
+        if is_gray:
+            imformat = QImage.Format_Grayscale8
+        else:
+            imformat = FORMAT_BGR888 or QImage.Format_RGB888
+        # the QImage shares memory with the buffer, no copy per frame
+        self.__qimage = QImage(self.__buffer.data, width, height,
+                               self.__buffer.strides[0], imformat)
+
+    def __get_target_rect(self):
+        image_size = self.__qimage.size()
+        rect = self.rect()
+        if self.__scaled_contents or image_size.width() > rect.width(
+        ) or image_size.height() > rect.height():
+            image_size = image_size.scaled(rect.size(), Qt.KeepAspectRatio)
+        return QStyle.alignedRect(Qt.LeftToRight, self.__alignment,
+                                  image_size, rect)
@@ -1,33 +1,52 @@
 from PySide2.QtWidgets import QMainWindow
 from PySide2.QtCore import Signal, QTimer
 from views.main_window import Ui_MainWindow
-from FQCS import detector
-from FQCS.manager import FQCSManager
 from app_models.detector_config import DetectorConfig
 from app import helpers
-import cv2
-from widgets.measurement_screen import MeasurementScreen
 from widgets.home_screen import HomeScreen
-from widgets.test_detect_pair_screen import TestDetectPairScreen
-from widgets.color_preprocess_config_screen import ColorPreprocessConfigScreen
-from widgets.detection_config_screen import DetectionConfigScreen
-from widgets.color_param_calibration_screen import ColorParamCalibrationScreen
-from widgets.error_detect_screen import ErrorDetectScreen
-from widgets.side_error_detect_screen import SideErrorDetectScreen
-from widgets.progress_screen import ProgressScreen
-from widgets.asym_config_screen import AsymConfigScreen
 from services.identity_service import IdentityService
+from services.model_service import ModelService
+from services.capture_service import CaptureService
+from services.camera_format import get_requested_format, fit_frame
+from app_models.app_config import AppConfig
+from services.startup_profiler import StartupProfiler, KIND_IMPORT, KIND_SCREEN
 from qasync import QEventLoop, asyncSlot
 import asyncio
+import importlib
 from app_constants import Videos
 
+# screens built on first navigation: name -> (module, class)
+SCREENS = {
+    "detection_screen":
+    ("widgets.detection_config_screen", "DetectionConfigScreen"),
+    "measurement_screen": ("widgets.measurement_screen", "MeasurementScreen"),
+    "test_detect_pair_screen":
+    ("widgets.test_detect_pair_screen", "TestDetectPairScreen"),
+    "color_preprocess_config_screen":
+    ("widgets.color_preprocess_config_screen", "ColorPreprocessConfigScreen"),
+    "color_param_calib_screen":
+    ("widgets.color_param_calibration_screen", "ColorParamCalibrationScreen"),
+    "error_detect_screen": ("widgets.error_detect_screen", "ErrorDetectScreen"),
+    "progress_screen": ("widgets.progress_screen", "ProgressScreen"),
+    "asym_config_screen": ("widgets.asym_config_screen", "AsymConfigScreen"),
+    "side_error_detect_screen":
+    ("widgets.side_error_detect_screen", "SideErrorDetectScreen"),
+}
+
 
 class MainWindow(QMainWindow):
     def __init__(self, identity_service: IdentityService):
         QMainWindow.__init__(self)
         self.__identity_service = identity_service
         self.__view_cam = None
-        self.__video_camera = cv2.VideoCapture()
+        supervisor_cfg = AppConfig.instance().config.get(
+            "camera_supervisor", {})
+        # the preview camera is opened and read off the GUI thread
+        self.__preview_capture = CaptureService(
+            2, supervisor_cfg.get("stall_timeout", 2.0),
+            supervisor_cfg.get("base_backoff", 0.5),
+            supervisor_cfg.get("max_backoff", 30))
+        self.__last_preview_ts = None
         self.__detector_cfg = DetectorConfig.instance()
         self.__camera_timer = self.__detector_cfg.get_timer()
         self.ui = Ui_MainWindow()
@@ -36,39 +55,40 @@ class MainWindow(QMainWindow):
         self.binding()
 
     def build(self):
-        # screen 0
-        self.home_screen = HomeScreen(self.__identity_service, self)
-        # screen 1
-        self.detection_screen = DetectionConfigScreen(self)
-        # screen 2
-        self.measurement_screen = MeasurementScreen(self)
-        # screen 3
-        self.test_detect_pair_screen = TestDetectPairScreen(self)
-        # screen 4
-        self.color_preprocess_config_screen = ColorPreprocessConfigScreen(self)
-        # screen 5
-        self.color_param_calib_screen = ColorParamCalibrationScreen(self)
-        # screen 6
-        self.error_detect_screen = ErrorDetectScreen(self)
-        # screen 7
-        self.progress_screen = ProgressScreen(self)
-        # screen 8
-        self.asym_config_screen = AsymConfigScreen(self)
-        # screen 9
-        self.side_error_detect_screen = SideErrorDetectScreen(self)
-
-        # add to Stacked Widget
+        # screen 0, every other screen is built on first navigation
+        with StartupProfiler.instance().measure(KIND_SCREEN, "HomeScreen"):
+            self.home_screen = HomeScreen(self.__identity_service, self)
         self.ui.centralStackWidget.addWidget(self.home_screen)
-        self.ui.centralStackWidget.addWidget(self.detection_screen)
-        self.ui.centralStackWidget.addWidget(self.measurement_screen)
-        self.ui.centralStackWidget.addWidget(self.test_detect_pair_screen)
-        self.ui.centralStackWidget.addWidget(self.asym_config_screen)
-        self.ui.centralStackWidget.addWidget(
-            self.color_preprocess_config_screen)
-        self.ui.centralStackWidget.addWidget(self.color_param_calib_screen)
-        self.ui.centralStackWidget.addWidget(self.error_detect_screen)
-        self.ui.centralStackWidget.addWidget(self.side_error_detect_screen)
-        self.ui.centralStackWidget.addWidget(self.progress_screen)
+        self.__screens = {}
+        self.__binders = {
+            "detection_screen": self.__bind_detection_screen,
+            "measurement_screen": self.__bind_measurement_screen,
+            "test_detect_pair_screen": self.__bind_test_detect_pair_screen,
+            "color_preprocess_config_screen":
+            self.__bind_color_preprocess_config_screen,
+            "color_param_calib_screen": self.__bind_color_param_calib_screen,
+            "error_detect_screen": self.__bind_error_detect_screen,
+            "progress_screen": self.__bind_progress_screen,
+            "asym_config_screen": self.__bind_asym_config_screen,
+            "side_error_detect_screen": self.__bind_side_error_detect_screen,
+        }
+        if not AppConfig.instance().config.get("lazy_screens", True):
+            for name in SCREENS.keys():
+                self.__get_screen(name)
+
+    def __get_screen(self, name):
+        screen = self.__screens.get(name)
+        if screen is not None: return screen
+        module_name, class_name = SCREENS[name]
+        profiler = StartupProfiler.instance()
+        with profiler.measure(KIND_IMPORT, module_name):
+            module = importlib.import_module(module_name)
+        with profiler.measure(KIND_SCREEN, class_name):
+            screen = getattr(module, class_name)(self)
+        self.__screens[name] = screen
+        self.ui.centralStackWidget.addWidget(screen)
+        self.__binders[name](screen)
+        return screen
 
     def showEvent(self, event):
         return
@@ -86,89 +106,89 @@ class MainWindow(QMainWindow):
         self.home_screen.action_edit.connect(self.change_detection_screen)
         self.home_screen.action_start.connect(self.change_progress_screen)
         self.home_screen.action_exit.connect(self.action_exit_triggered)
-
-        self.detection_screen.backscreen.connect(self.change_home_screen)
-        self.detection_screen.nextscreen.connect(
-            self.change_measurement_screen)
-        self.detection_screen.captured.connect(self.toggle_capture_state)
-        self.detection_screen.camera_changed.connect(self.camera_changed)
-
-        self.measurement_screen.backscreen.connect(
-            self.change_detection_screen)
-        self.measurement_screen.nextscreen.connect(
-            self.skipable_change_detect_pair_screen)
-        self.measurement_screen.captured.connect(self.toggle_capture_state)
-
-        self.test_detect_pair_screen.backscreen.connect(
-            self.change_measurement_screen)
-        self.test_detect_pair_screen.nextscreen.connect(
-            self.change_color_preprocess_config_screen)
-        self.test_detect_pair_screen.captured.connect(
-            self.toggle_capture_state)
-
-        self.color_preprocess_config_screen.backscreen.connect(
-            self.change_detect_pair_screen)
-        self.color_preprocess_config_screen.nextscreen.connect(
-            self.change_asym_config_screen)
-
-        self.asym_config_screen.backscreen.connect(
-            self.change_color_preprocess_config_screen)
-        self.asym_config_screen.nextscreen.connect(
-            self.change_color_param_calib_screen)
-        self.asym_config_screen.captured.connect(self.toggle_capture_state)
-
-        self.color_param_calib_screen.backscreen.connect(
-            self.change_asym_config_screen)
-        self.color_param_calib_screen.nextscreen.connect(
-            self.change_error_detect_screen)
-        self.color_param_calib_screen.captured.connect(
-            self.toggle_capture_state)
-
-        self.error_detect_screen.backscreen.connect(
-            self.change_color_param_calib_screen)
-        self.error_detect_screen.nextscreen.connect(
-            self.change_progress_screen)
-        self.error_detect_screen.captured.connect(self.toggle_capture_state)
-
-        self.side_error_detect_screen.backscreen.connect(
-            self.change_measurement_screen)
-        self.side_error_detect_screen.nextscreen.connect(
-            self.change_progress_screen)
-        self.side_error_detect_screen.captured.connect(
-            self.toggle_capture_state)
-
-        self.progress_screen.return_home.connect(self.change_home_screen)
         return
 
+    def __bind_detection_screen(self, screen):
+        screen.backscreen.connect(self.change_home_screen)
+        screen.nextscreen.connect(self.change_measurement_screen)
+        screen.captured.connect(self.toggle_capture_state)
+        screen.camera_changed.connect(self.camera_changed)
+
+    def __bind_measurement_screen(self, screen):
+        screen.backscreen.connect(self.change_detection_screen)
+        screen.nextscreen.connect(self.skipable_change_detect_pair_screen)
+        screen.captured.connect(self.toggle_capture_state)
+
+    def __bind_test_detect_pair_screen(self, screen):
+        screen.backscreen.connect(self.change_measurement_screen)
+        screen.nextscreen.connect(self.change_color_preprocess_config_screen)
+        screen.captured.connect(self.toggle_capture_state)
+
+    def __bind_color_preprocess_config_screen(self, screen):
+        screen.backscreen.connect(self.change_detect_pair_screen)
+        screen.nextscreen.connect(self.change_asym_config_screen)
+
+    def __bind_asym_config_screen(self, screen):
+        screen.backscreen.connect(self.change_color_preprocess_config_screen)
+        screen.nextscreen.connect(self.change_color_param_calib_screen)
+        screen.captured.connect(self.toggle_capture_state)
+
+    def __bind_color_param_calib_screen(self, screen):
+        screen.backscreen.connect(self.change_asym_config_screen)
+        screen.nextscreen.connect(self.change_error_detect_screen)
+        screen.captured.connect(self.toggle_capture_state)
+
+    def __bind_error_detect_screen(self, screen):
+        screen.backscreen.connect(self.change_color_param_calib_screen)
+        screen.nextscreen.connect(self.change_progress_screen)
+        screen.captured.connect(self.toggle_capture_state)
+
+    def __bind_side_error_detect_screen(self, screen):
+        screen.backscreen.connect(self.change_measurement_screen)
+        screen.nextscreen.connect(self.change_progress_screen)
+        screen.captured.connect(self.toggle_capture_state)
+
+    def __bind_progress_screen(self, screen):
+        screen.return_home.connect(self.change_home_screen)
+
     def closeEvent(self, event):
+        self.__release_preview()
         self.__detector_cfg.reset()
 
     def camera_timer_timeout(self):
-        if (self.__view_cam is not None and self.__video_camera is not None
-                and self.__video_camera.isOpened()):
-            _, image = self.__video_camera.read()
-            # test only
-            # if image is None:
-            #     self.__video_camera.open(Videos.instance().next())
-            #     _, image = self.__video_camera.read()
+        if (self.__view_cam is not None
+                and self.__preview_capture.is_running()):
+            timestamp, image = self.__preview_capture.latest(0)
+            # nothing new since the last tick
+            if image is None or timestamp == self.__last_preview_ts: return
+            self.__last_preview_ts = timestamp
             _, current_cfg = self.__detector_cfg.get_current_cfg()
             frame_width, frame_height = current_cfg[
                 "frame_width"], current_cfg["frame_height"]
-            image = cv2.resize(image, (frame_width, frame_height))
+            image = fit_frame(image, frame_width, frame_height)
             self.__view_cam(image)
 
     # event handler
     def camera_changed(self, index):
-        if index is not None and index > -1:
+        if index is not None and index != -1:
             if (self.__detector_cfg.get_last_camera_uri() !=
-                    index) or (not self.__video_camera.isOpened()):
-                self.__video_camera.open(index)
+                    index) or (not self.__preview_capture.is_running()):
+                self.__release_preview()
+                _, current_cfg = self.__detector_cfg.get_current_cfg()
+                requested = get_requested_format(
+                    current_cfg,
+                    AppConfig.instance().config.get("camera_capture"))
+                self.__preview_capture.open([index], [requested])
                 # test only
-                # self.__video_camera.open(Videos.instance().next())
+                # self.__preview_capture.open([Videos.instance().next()])
                 self.__detector_cfg.set_last_camera_uri(index)
         else:
             if self.__view_cam is not None: self.__view_cam(None)
-            self.__video_camera.release()
+            self.__release_preview()
+
+    def __release_preview(self):
+        self.__preview_capture.stop()
+        self.__last_preview_ts = None
 
     def action_exit_triggered(self):
         self.close()
@@ -178,51 +198,57 @@ class MainWindow(QMainWindow):
         continue_screen = cfg["is_main"]
         if continue_screen:
             self.ui.centralStackWidget.setCurrentWidget(
-                self.test_detect_pair_screen)
+                self.__get_screen("test_detect_pair_screen"))
         else:
-            err_text = self.side_error_detect_screen.validate_show()
+            err_text = self.__get_screen(
+                "side_error_detect_screen").validate_show()
             if err_text is not None:
                 helpers.show_message(err_text)
                 return
             # skip to screen 6 if only side camera is selected
             self.ui.centralStackWidget.setCurrentWidget(
-                self.side_error_detect_screen)
+                self.__get_screen("side_error_detect_screen"))
 
     def change_home_screen(self):
         self.ui.centralStackWidget.setCurrentWidget(self.home_screen)
 
     def change_detection_screen(self):
-        self.ui.centralStackWidget.setCurrentWidget(self.detection_screen)
+        self.ui.centralStackWidget.setCurrentWidget(
+            self.__get_screen("detection_screen"))
 
     def change_measurement_screen(self):
-        self.ui.centralStackWidget.setCurrentWidget(self.measurement_screen)
+        self.ui.centralStackWidget.setCurrentWidget(
+            self.__get_screen("measurement_screen"))
 
     def change_detect_pair_screen(self):
         self.ui.centralStackWidget.setCurrentWidget(
-            self.test_detect_pair_screen)
+            self.__get_screen("test_detect_pair_screen"))
 
     def change_color_preprocess_config_screen(self):
         self.ui.centralStackWidget.setCurrentWidget(
-            self.color_preprocess_config_screen)
+            self.__get_screen("color_preprocess_config_screen"))
 
     def change_color_param_calib_screen(self):
         self.ui.centralStackWidget.setCurrentWidget(
-            self.color_param_calib_screen)
+            self.__get_screen("color_param_calib_screen"))
 
     def change_error_detect_screen(self):
-        self.ui.centralStackWidget.setCurrentWidget(self.error_detect_screen)
+        self.ui.centralStackWidget.setCurrentWidget(
+            self.__get_screen("error_detect_screen"))
 
     def change_progress_screen(self):
-        err_mess = self.progress_screen.validate_show()
+        progress_screen = self.__get_screen("progress_screen")
+        err_mess = progress_screen.validate_show()
         if err_mess is not None:
             helpers.show_message(err_mess)
             return
-        self.__video_camera.release()
+        self.__release_preview()
         self.stop_capture()
-        self.ui.centralStackWidget.setCurrentWidget(self.progress_screen)
+        self.ui.centralStackWidget.setCurrentWidget(progress_screen)
 
     def change_asym_config_screen(self):
-        self.ui.centralStackWidget.setCurrentWidget(self.asym_config_screen)
+        self.ui.centralStackWidget.setCurrentWidget(
+            self.__get_screen("asym_config_screen"))
 
     def current_stack_widget_changed(self):
         currentWidget = self.ui.centralStackWidget.currentWidget()
@@ -260,15 +286,17 @@ class MainWindow(QMainWindow):
         file_path = url.toLocalFile()
         self.stop_capture()
         self.__detector_cfg.reset()
+        from FQCS.manager import FQCSManager
         manager = FQCSManager(config_folder=file_path)
         configs = manager.get_configs()
         for cfg in configs:
             if cfg["is_main"] == True:
                 self.__detector_cfg.set_current_cfg_name(cfg["name"])
-                try:
-                    await manager.load_model(cfg)
-                except:
-                    helpers.show_message("Error loading model")
+                # loads and warms up in background, progress screen waits
+                # for the ready state
+                ModelService.instance().load(
+                    manager, cfg,
+                    AppConfig.instance().config.get("model_warmup_runs", 2))
                 break
         self.__detector_cfg.set_manager(manager)
         self.__detector_cfg.set_current_path(file_path)
@@ -1,38 +1,67 @@
-from PySide2.QtWidgets import QWidget
-from PySide2.QtCore import Signal, QThreadPool, QTimer
-import trio
+from PySide2.QtWidgets import QWidget, QTextEdit
+from PySide2.QtCore import Signal, QTimer, Qt
 from app_models.detector_config import DetectorConfig
 from app_models.app_config import AppConfig
 from app_models.auth_info import AuthInfo
 from app import helpers
 from FQCS import helper
+from FQCS import fqcs_api
 import os
-from FQCS import detector, fqcs_constants, fqcs_api
 from views.progress_screen import Ui_ProgressScreen
 from widgets.image_widget import ImageWidget
-from cv2 import cv2
-import numpy as np
-from services.worker_runnable import WorkerRunnable
-from app_constants import ISO_DATE_FORMAT, FOLDER_DATE_FORMAT, Videos
-import datetime
-import uuid
+from services.capture_service import CaptureService
+from services.camera_format import get_requested_format
+from services.inspection_pipeline import InspectionPipeline
+from services.event_outbox import EventOutbox
+from services.qc_event_client import QcEventClient
+from services.history_store import HistoryStore
+from services.stage_metrics import StageMetrics
+from services.render_scheduler import RenderScheduler
+from services.model_service import ModelService, STATE_LOADING, STATE_FAILED
+from app_constants import ISO_DATE_FORMAT
 
 
 class ProgressScreen(QWidget):
+    DRAIN_TIMEOUT = 5
     return_home = Signal()
-    __result_html_changed = Signal(str)
+    __pair_detected = Signal(object)
+    __inspection_result = Signal(object)
     __sample_left = None
     __sample_right = None
-    __pre_sample_left = None
-    __pre_sample_right = None
     __last_display_type = None
     __capturing = True
+    __last_detect_time = None
+    __pipeline = None
 
     def __init__(self, parent=None):
         QWidget.__init__(self, parent)
-        self.__camera_timer = QTimer()
+        self.__metrics_timer = QTimer()
+        self.__render_timer = QTimer()
+        self.__render_scheduler = RenderScheduler(
+            AppConfig.instance().config.get("preview_fps", 15))
+        supervisor_cfg = AppConfig.instance().config.get(
+            "camera_supervisor", {})
+        self.__capture_service = CaptureService(
+            AppConfig.instance().config.get("capture_buffer_size", 8),
+            supervisor_cfg.get("stall_timeout", 2.0),
+            supervisor_cfg.get("base_backoff", 0.5),
+            supervisor_cfg.get("max_backoff", 30))
         self.__storage_path = AppConfig.instance().config["storage_path"]
         self.__api_url = AppConfig.instance().config["api_url"]
+        self.__pipeline_cfg = AppConfig.instance().config.get("pipeline", {})
+        self.__writer_cfg = AppConfig.instance().config.get(
+            "image_writer", {})
+        self.__event_client = QcEventClient(self.__api_url)
+        outbox_cfg = AppConfig.instance().config.get("outbox", {})
+        self.__outbox = EventOutbox(
+            os.path.join(self.__storage_path, "outbox.db"), self.__send_event,
+            outbox_cfg.get("base_backoff", 1),
+            outbox_cfg.get("max_backoff", 300))
+        history_cfg = AppConfig.instance().config.get("history", {})
+        self.__history = HistoryStore(
+            os.path.join(self.__storage_path, "history.db"),
+            history_cfg.get("batch_size", 500),
+            history_cfg.get("flush_interval", 1.0))
         self.ui = Ui_ProgressScreen()
         self.ui.setupUi(self)
         self.build()
@@ -69,22 +98,52 @@ class ProgressScreen(QWidget):
                                          self.side_result_image)
         self.ui.lblSideResult.deleteLater()
 
+        for widget in [
+                self.image1, self.left_detected_image,
+                self.right_detected_image, self.left_sample_image,
+                self.right_sample_image
+        ]:
+            widget.setScaledContents(True)
+            widget.setAlignment(Qt.AlignCenter)
+
+        self.inpMetrics = QTextEdit(self.ui.sectionInfo)
+        self.inpMetrics.setReadOnly(True)
+        self.ui.sectionInfo.layout().addWidget(self.inpMetrics)
+
     def showEvent(self, event):
+        self.__outbox.start()
+        self.__history.start()
         manager = DetectorConfig.instance().get_manager()
         main_idx, self.__main_cfg = manager.get_main_config()
         self.__capturing = True
-        video_cameras = DetectorConfig.instance().get_video_cameras()
         configs = manager.get_configs()
-        self.__main_cam = video_cameras[main_idx]
-        for i, cfg in enumerate(configs):
-            video_cameras[i].open(cfg["camera_uri"])
-            # test only
-            # video_cameras[i].open(Videos.instance().next())
+        self.__last_detect_time = None
+        uris = [cfg["camera_uri"] for cfg in configs]
+        capture_cfg = AppConfig.instance().config.get("camera_capture")
+        formats = [get_requested_format(cfg, capture_cfg) for cfg in configs]
+        # test only
+        # uris = [Videos.instance().next() for cfg in configs]
+        # the service owns the captures, opens them off the GUI thread and
+        # replaces the ones that stop delivering frames
+        self.__capture_service.open(uris, formats)
+        self.__pipeline = InspectionPipeline(
+            manager,
+            self.__capture_service,
+            self.__storage_path,
+            self.__outbox,
+            self.__pipeline_cfg,
+            self.__writer_cfg,
+            config_folder=DetectorConfig.instance().get_current_path(),
+            on_frame=self.__render_scheduler.offer,
+            on_pair=self.__pair_detected.emit,
+            on_result=self.__inspection_result.emit,
+            history=self.__history)
+        # the pipeline pulls the newest main camera frame on its own thread,
+        # a busy GUI does not hold inspection back
+        self.__pipeline.start(main_idx)
 
         self.__sample_left, self.__sample_right = manager.get_sample_left(
         ), manager.get_sample_right()
-        self.__pre_sample_left, self.__pre_sample_right = manager.preprocess_images(
-            self.__main_cfg, self.__sample_left, self.__sample_right)
 
         self.image1.imshow(None)
         self.left_detected_image.imshow(None)
@@ -94,7 +153,11 @@ class ProgressScreen(QWidget):
         self.__set_btn_capture_text()
         self.__view_image_sample()
         self.__load_config()
-        self.__camera_timer.start(20)
+        self.__render_scheduler.clear()
+        self.__render_timer.start(self.__render_scheduler.get_interval_ms())
+        StageMetrics.instance().reset()
+        self.inpMetrics.setHtml("<b>LATENCY</b>")
+        self.__metrics_timer.start(1000)
         return
 
     def hideEvent(self, event):
@@ -104,21 +167,38 @@ class ProgressScreen(QWidget):
         self.__release()
 
     def __release(self):
-        self.__camera_timer.stop()
-        manager = DetectorConfig.instance().get_manager()
-        video_cameras = DetectorConfig.instance().get_video_cameras()
-        configs = manager.get_configs()
-        for i, cfg in enumerate(configs):
-            video_cameras[i].release()
+        self.__metrics_timer.stop()
+        self.__render_timer.stop()
+        if self.__pipeline is not None:
+            # no new frames, then let the pairs in flight reach the writer so
+            # the outbox and history flushes below see the last products
+            self.__pipeline.set_capturing(False)
+            if not self.__pipeline.drain(self.DRAIN_TIMEOUT):
+                print("Timed out waiting for the pipeline to drain")
+            self.__pipeline.stop()
+            self.__pipeline = None
+        # undelivered events stay in the outbox db for the next start
+        self.__outbox.stop()
+        # the writer callbacks have run, flush what they recorded
+        self.__history.stop()
+        # each capture is released by its own thread, never while read()
+        # may still be running
+        self.__capture_service.stop()
 
     def validate_show(self):
         manager = DetectorConfig.instance().get_manager()
         _, main_cfg = manager.get_main_config()
         if main_cfg is None: return "No main configuration available"
         has_model = manager.get_model() is not None
+        model_state = ModelService.instance().get_state()
         configs = manager.get_configs()
         for cfg in configs:
-            if cfg["is_defect_enable"] and not has_model:
+            if not cfg["is_defect_enable"]: continue
+            if model_state == STATE_LOADING:
+                return "Model is still loading, please wait"
+            if model_state == STATE_FAILED:
+                return "Error loading model"
+            if not has_model:
                 return "Defect detection enabled but no model founded"
         if manager.get_sample_left() is None or manager.get_sample_right(
         ) is None:
@@ -131,16 +211,15 @@ class ProgressScreen(QWidget):
         self.ui.btnCapture.clicked.connect(self.btn_capture_clicked)
         self.ui.cbbDisplayType.currentIndexChanged.connect(
             self.cbb_display_type_index_changed)
-        self.__camera_timer.timeout.connect(self.camera_timer_timeout)
-        self.__result_html_changed.connect(self.__handle_result_html_changed)
+        self.__metrics_timer.timeout.connect(self.metrics_timer_timeout)
+        self.__render_timer.timeout.connect(self.render_timer_timeout)
+        self.__pair_detected.connect(self.__handle_pair_detected)
+        self.__inspection_result.connect(self.__handle_inspection_result)
 
     def btn_capture_clicked(self):
-        if self.__camera_timer.isActive():
-            self.__capturing = False
-            self.__camera_timer.stop()
-        else:
-            self.__capturing = True
-            self.__camera_timer.start(20)
+        self.__capturing = not self.__capturing
+        if self.__pipeline is not None:
+            self.__pipeline.set_capturing(self.__capturing)
         self.__set_btn_capture_text()
 
     def cbb_display_type_index_changed(self):
@@ -150,44 +229,59 @@ class ProgressScreen(QWidget):
         self.ui.btnCapture.setText(
             "CAPTURE" if not self.__capturing else "STOP")
 
-    def camera_timer_timeout(self):
-        manager = DetectorConfig.instance().get_manager()
-        _, image = self.__main_cam.read()
-        if image is None:
-            # test only
-            # self.__main_cam.open(Videos.instance().next())
-            # _, image = self.__main_cam.read()
-            self.image1.imshow(image)
-            return
-        frame_width, frame_height = self.__main_cfg[
-            "frame_width"], self.__main_cfg["frame_height"]
-        image = cv2.resize(image, (frame_width, frame_height))
-        trio.run(self.process_image, image)
+    def metrics_timer_timeout(self):
+        summary = StageMetrics.instance().get_summary()
+        rows = []
+        for stage, stats in summary.items():
+            wall, cpu = stats["wall"], stats["cpu"]
+            cells = [stage, str(stats["count"])]
+            cells += [self.__format_ms(wall[k]) for k in ["p50", "p95", "p99"]]
+            cells.append(self.__format_ms(cpu["p95"]))
+            rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) +
+                        "</tr>")
+        header = "".join(f"<th>{h}</th>" for h in
+                         ["Stage", "N", "p50", "p95", "p99", "CPU p95"])
+        cameras = []
+        configs = DetectorConfig.instance().get_manager().get_configs()
+        for idx, cfg in enumerate(configs):
+            health = self.__capture_service.get_health(idx)
+            if health is None: continue
+            color = "green" if health["state"] == "healthy" else "red"
+            granted = self.__capture_service.get_format(idx)
+            mode = "" if granted is None else (
+                f", {granted['width']}x{granted['height']} "
+                f"{granted['fourcc'] or ''} {granted['fps']:.0f}fps")
+            cameras.append(
+                f"<b>{cfg['name']}</b>: <span style='color:{color}'>"
+                f"{health['state']}</span>, "
+                f"reconnects: {health['reconnects']}{mode}")
+        self.inpMetrics.setHtml("<b>CAMERAS</b><br/>" + "<br/>".join(cameras) +
+                                "<hr/><b>LATENCY (ms)</b><table>" +
+                                f"<tr>{header}</tr>" + "".join(rows) +
+                                "</table>")
+
+    def __format_ms(self, value):
+        return "-" if value is None else f"{value * 1000:.1f}"
 
     def __view_image_sample(self):
-        manager = DetectorConfig.instance().get_manager()
-        label_w, label_h = self.left_detected_image.width(
-        ), self.left_detected_image.height()
-        dim = (label_w, label_h)
-        m_left = cv2.resize(self.__sample_left, dim)
-        m_right = cv2.resize(self.__sample_right, dim)
-        self.left_sample_image.imshow(m_left)
-        self.right_sample_image.imshow(m_right)
-
-    async def process_image(self, image):
-        label_w = self.image1.width()
-        label_h = self.image1.height()
-        dim = (label_w, label_h)
-        manager = DetectorConfig.instance().get_manager()
-        idx, main_cfg = manager.get_main_config()
+        self.left_sample_image.imshow(self.__sample_left)
+        self.right_sample_image.imshow(self.__sample_right)
+
+    def render_timer_timeout(self):
+        # inspection keeps the newest frame only, previews are drawn at the
+        # capped rate and only while someone can see them
+        if not self.image1.isVisible(): return
+        item = self.__render_scheduler.take()
+        if item is None: return
+        self.__render_frame(item)
+
+    def __render_frame(self, item):
+        image, proc, final_grouped, sizes = item
+        main_cfg = self.__main_cfg
         if self.__last_display_type == "Original":
-            resized_image = cv2.resize(image, dim)
-            self.image1.imshow(resized_image)
-        boxes, proc = manager.extract_boxes(main_cfg, image)
-        final_grouped, sizes, check_group_idx, pair, split_left, split_right, image_detect = manager.detect_groups_and_checked_pair(
-            main_cfg, boxes, image)
-
-        if self.__last_display_type == "Detection":
+            self.image1.imshow(image)
+        elif self.__last_display_type == "Detection":
+            image = image.copy()
             unit = main_cfg["length_unit"]
             for idx, group in enumerate(final_grouped):
                 for b_idx, b in enumerate(group):
@@ -196,152 +290,47 @@ class ProgressScreen(QWidget):
                     lH, lW = cur_size
                     helper.draw_boxes_and_sizes(image, idx, box, lH, lW, unit,
                                                 tl, br)
-            resized_image = cv2.resize(image, dim)
-            self.image1.imshow(resized_image)
+            self.image1.imshow(image)
         elif self.__last_display_type == "Contours":
-            resized_image = cv2.resize(proc, dim)
-            self.image1.imshow(resized_image)
-
-        if (pair is not None):
-            manager.check_group(check_group_idx, final_grouped)
-            left, right = pair
-            left, right = left[0], right[0]
-            left = cv2.flip(left, 1)
-            label_w = self.left_detected_image.width()
-            label_h = self.left_detected_image.height()
-            dim = (label_w, label_h)
-            left_resized, right_resized = cv2.resize(left, dim), cv2.resize(
-                right, dim)
-            self.left_detected_image.imshow(left_resized)
-            self.right_detected_image.imshow(right_resized)
-            self.__last_detect_time = datetime.datetime.now()
-            runnable = WorkerRunnable(self.__process_pair,
-                                      self.__last_detect_time,
-                                      check_group_idx,
-                                      final_grouped,
-                                      sizes,
-                                      pair,
-                                      parent=self)
-            runnable.work_error.connect(lambda ex: print(ex))
-            QThreadPool.globalInstance().start(runnable)
-
-    async def __process_pair(self, cur: datetime.datetime, check_group_idx,
-                             final_grouped, sizes, pair):
-        manager = DetectorConfig.instance().get_manager()
-        manager.check_group(check_group_idx, final_grouped)
-        check_size = sizes[check_group_idx]
-        h_diff, w_diff = manager.compare_size(self.__main_cfg, check_size)
-
-        # output
-        left, right = pair
-        left, right = left[0], right[0]
-        left = cv2.flip(left, 1)
-        pre_left, pre_right = manager.preprocess_images(
-            self.__main_cfg, left, right)
-        images = [left, right]
-        final_save_images = [left.copy(), right.copy()]
-        side_images = []
-        # Similarity compare
-        sim_cfg = self.__main_cfg["sim_cfg"]
-        left_result, right_result = await manager.detect_asym(
-            self.__main_cfg, pre_left, pre_right, self.__pre_sample_left,
-            self.__pre_sample_right, None)
-        is_asym_diff_left, avg_asym_left, avg_amp_left, recalc_left, res_list_l, amp_res_list_l = left_result
-        is_asym_diff_right, avg_asym_right, avg_amp_right, recalc_right, res_list_r, amp_res_list_r = right_result
-        has_asym = is_asym_diff_left or is_asym_diff_right
-        has_color_checked, has_error_checked = False, False
-        result_dict = {}
-        async with trio.open_nursery() as nursery:
-            if has_asym:
-                if self.__main_cfg["is_color_enable"]:
-                    has_color_checked = True
-                    nursery.start_soon(manager.compare_colors, self.__main_cfg,
-                                       pre_left, pre_right, self.__pre_sample_left,
-                                       self.__pre_sample_right, True,
-                                       (result_dict, "color_results"))
-
-                if self.__main_cfg["is_defect_enable"]:
-                    has_error_checked = True
-                    nursery.start_soon(manager.detect_errors, self.__main_cfg,
-                                       images, (result_dict, "err_results"))
-
-            video_cameras = DetectorConfig.instance().get_video_cameras()
-            configs = manager.get_configs()
-            for idx, cfg in enumerate(configs):
-                if cfg["is_main"] == True: continue
-                cfg_name = cfg["name"]
-                nursery.start_soon(self.__activate_side_cam, cfg,
-                                   video_cameras[idx], manager,
-                                   (result_dict, f"side_result_{cfg_name}"))
-
-        side_results = []
-        for key in result_dict.keys():
-            if key.startswith("side_result_"):
-                result = result_dict[key]
-                if result is not None:
-                    side_results.append(result)
-
-        # result display
-        if cur == self.__last_detect_time:
-            self.side_result_image.imshow(None)
-            self.__result_html_changed.emit("<b>RESULT</b>")
-        defect_types = set()
+            # frames skipped by the motion gate have no contours
+            if proc is not None: self.image1.imshow(proc)
+
+    def __handle_pair_detected(self, item):
+        cur, left, right = item
+        self.left_detected_image.imshow(left)
+        self.right_detected_image.imshow(right)
+        self.__last_detect_time = cur
+
+    def __handle_inspection_result(self, result):
+        if result["time"] != self.__last_detect_time: return
+        self.side_result_image.imshow(None)
         size_result = "<span style='color:green'>PASSED</span>"
         left_asym_result = "<span style='color:green'>PASSED</span>"
         right_asym_result = "<span style='color:green'>PASSED</span>"
+        h_diff, w_diff = result["size_diff"]
+        is_asym_diff_left, is_asym_diff_right = result["asym_diff"]
         if h_diff or w_diff:
             size_result = "<span style='color:red'>FAILED: Different size</span>"
-            defect_types.add(fqcs_constants.SIZE_MISMATCH)
         if is_asym_diff_left:
             left_asym_result = "<span style='color:red'>FAILED: Different from sample</span>"
-            defect_types.add(fqcs_constants.SAMPLE_MISMATCH)
         if is_asym_diff_right:
             right_asym_result = "<span style='color:red'>FAILED: Different from sample</span>"
-            defect_types.add(fqcs_constants.SAMPLE_MISMATCH)
-        # output
-        defect_result = "<span style='color:green'>NOT ANY</span>"
-        defects = {}
-        err_cfg = self.__main_cfg["err_cfg"]
-        min_score = err_cfg["yolo_score_threshold"]
-        classes_labels = err_cfg["classes"]
-        if has_error_checked:
-            boxes, scores, classes, valid_detections = result_dict[
-                "err_results"]
-            helper.draw_yolo_results(images,
-                                     boxes,
-                                     scores,
-                                     classes,
-                                     classes_labels,
-                                     err_cfg["img_size"],
-                                     min_score=min_score)
-            self.__parse_defects_detection_result(images, scores, classes,
-                                                  classes_labels, min_score,
-                                                  defects)
-            if cur == self.__last_detect_time:
-                label_w = self.left_detected_image.width()
-                label_h = self.left_detected_image.height()
-                dim = (label_w, label_h)
-                left_img = cv2.resize(images[0], dim)
-                right_img = cv2.resize(images[1], dim)
-                self.left_detected_image.imshow(left_img)
-                self.right_detected_image.imshow(right_img)
+
+        images = result["detected_images"]
+        if images is not None:
+            self.left_detected_image.imshow(images[0])
+            self.right_detected_image.imshow(images[1])
 
         label_w = self.side_result_image.width()
         label_h = self.side_result_image.height()
-        for res in side_results:
-            side_save_images, side_images, side_boxes, side_scores, side_classes, side_valid_detections = res
-            final_save_images.extend(side_save_images)
-            self.__parse_defects_detection_result(side_images, side_scores,
-                                                  side_classes, classes_labels,
-                                                  min_score, defects)
-            if cur == self.__last_detect_time:
-                final_img = helpers.concat_images(side_images, label_w,
-                                                  label_h)
-                self.side_result_image.imshow(final_img)
+        for side_images in result["side_images"]:
+            final_img = helpers.concat_images(side_images, label_w, label_h)
+            self.side_result_image.imshow(final_img)
 
+        defect_result = "<span style='color:green'>NOT ANY</span>"
+        defects = result["defects"]
         defect_result_text = []
         for key in defects.keys():
-            defect_types.add(key)
             d_count = defects[key]
             defect_result_text.append(f"{key}: {d_count}")
         if len(defects) > 0:
@@ -349,111 +338,36 @@ class ProgressScreen(QWidget):
             defect_result_text = f"<span style='color:red'>{defect_result_text}</span>"
             defect_result = defect_result_text
 
-        # output
-        if has_color_checked:
+        color_diff = result["color_diff"]
+        if color_diff is not None:
             left_color_result = "<span style='color:green'>PASSED</span>"
             right_color_result = "<span style='color:green'>PASSED</span>"
-            left_c_results = result_dict["color_results"][0]
-            right_c_results = result_dict["color_results"][1]
-            if left_c_results[3]:
+            if color_diff[0]:
                 left_color_result = "<span style='color:red'>FAILED: Different color</span>"
-                defect_types.add(fqcs_constants.COLOR_MISMATCH)
-            if right_c_results[3]:
+            if color_diff[1]:
                 right_color_result = "<span style='color:red'>FAILED: Different color</span>"
-                defect_types.add(fqcs_constants.COLOR_MISMATCH)
 
-        cur_date_str = cur.strftime(ISO_DATE_FORMAT)
+        cur_date_str = result["time"].strftime(ISO_DATE_FORMAT)
         result_text = f"<b>RESULT</b><br/>" + f"<b>Time</b>: {cur_date_str}<br/><hr/>"
         result_text += f"<b>Size</b>: {size_result}<br/><hr/>"
         result_text += f"<b>Similarity of left</b>: {left_asym_result}<br/>"
         result_text += f"<b>Similarity of right</b>: {right_asym_result}<br/><hr/>"
-        if has_color_checked:
+        if color_diff is not None:
             result_text += f"<b>Color of left</b>: {left_color_result}<br/>"
             result_text += f"<b>Color of right</b>: {right_color_result}<br/><hr/>"
         result_text += f"<b>Defects</b>: {defect_result}<br/>"
+        if len(result["skipped_sides"]) > 0:
+            skipped = ", ".join(result["skipped_sides"])
+            result_text += f"<b>Not inspected</b>: <span style='color:orange'>{skipped}</span><br/>"
         # test only
-        # result_text += f"{defect_types}"
+        # result_text += f"{result['defect_types']}"
+        self.ui.inpResult.setHtml(result_text)
 
-        if cur == self.__last_detect_time:
-            self.__result_html_changed.emit(result_text)
-
-        # save images
-        folder = cur.strftime(FOLDER_DATE_FORMAT)
-        os.makedirs(os.path.join(self.__storage_path, folder), exist_ok=True)
-
-        images = []
-        for img in final_save_images:
-            img_name = str(uuid.uuid4()) + ".jpg"
-            rel_path = os.path.join(folder, img_name)
-            abs_path = os.path.join(self.__storage_path, rel_path)
-            cv2.imwrite(abs_path, img)
-            images.append(rel_path)
-
-        # send to api
+    def __send_event(self, payload, event_key):
         access_token = AuthInfo.instance().get_token_info()["access_token"]
         headers = fqcs_api.get_common_headers(auth_token=access_token)
-        is_success, resp = fqcs_api.submit_event(self.__api_url, defect_types,
-                                                 images[0], images[1],
-                                                 images[2:], headers)
-        print(is_success, resp)
-        return
-
-    async def __activate_side_cam(self, cfg, cam, manager, result_info):
-        _, image = cam.read()
-        # test only
-        # rd = np.random.randint(0, 100)
-        # print("Rand", rd)
-        # if rd > 75:
-        #     _, image = self.__main_cam.read()
-        #     frame_width, frame_height = cfg["frame_width"], cfg["frame_height"]
-        #     resized_image = cv2.resize(image, (frame_width, frame_height))
-        #     boxes, proc = manager.extract_boxes(cfg, resized_image)
-        #     image_detect = resized_image.copy()
-        #     pair, image_detect, boxes = manager.detect_pair_side_cam(
-        #         cfg, boxes, image_detect)
-        # else:
-        #     pair = [(cv2.imread("./resources/test_data/side_demo.jpg"), None)]
-
-        frame_width, frame_height = cfg["frame_width"], cfg["frame_height"]
-        resized_image = cv2.resize(image, (frame_width, frame_height))
-        boxes, proc = manager.extract_boxes(cfg, resized_image)
-        image_detect = resized_image.copy()
-        pair, image_detect, boxes = manager.detect_pair_side_cam(
-            cfg, boxes, image_detect)
-        result = None
-        if (pair is not None and len(pair) > 0):
-            images = [item[0] for item in pair]
-            save_images = [img.copy() for img in images]
-            boxes, scores, classes, valid_detections = await manager.detect_errors(
-                self.__main_cfg, images, None)
-            err_cfg = self.__main_cfg["err_cfg"]
-            helper.draw_yolo_results(images,
-                                     boxes,
-                                     scores,
-                                     classes,
-                                     err_cfg["classes"],
-                                     err_cfg["img_size"],
-                                     min_score=err_cfg["yolo_score_threshold"])
-            result = (save_images, images, boxes, scores, classes,
-                      valid_detections)
-        return helper.return_result(result, result_info)
-
-    def __parse_defects_detection_result(self, images, scores, classes,
-                                         classes_labels, min_score, defects):
-        for i in range(len(images)):
-            images[i] *= 255.
-            images[i] = np.asarray(images[i], dtype=np.uint8)
-            iscores = scores[i]
-            iclasses = classes[i].astype(int)
-            for score, cl in zip(iscores.tolist(), iclasses.tolist()):
-                if score > min_score:
-                    defect = classes_labels[cl]
-                    if defect not in defects:
-                        defects[defect] = 0
-                    defects[defect] += 1
-
-    def __handle_result_html_changed(self, html):
-        self.ui.inpResult.setHtml(html)
+        headers["Idempotency-Key"] = event_key
+        return self.__event_client.submit(payload, headers)
 
     def __load_config(self):
         manager = DetectorConfig.instance().get_manager()
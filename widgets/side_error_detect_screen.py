@@ -14,7 +14,9 @@ import matplotlib.pyplot as plt
 import numpy as np
 from qasync import asyncSlot
 from services.worker_runnable import WorkerRunnable
-import trio
+from services.async_runtime import AsyncRuntime
+from services.defect_results import prepare_display_images, get_detections, \
+    draw_detections
 
 
 class SideErrorDetectScreen(QWidget):
@@ -154,43 +156,34 @@ class SideErrorDetectScreen(QWidget):
 
     async def __detect_error(self, images):
         manager = DetectorConfig.instance().get_manager()
+        err_cfg = self.__main_cfg["err_cfg"]
+        display_images = prepare_display_images(images, err_cfg["img_size"])
         err_task = manager.detect_errors(self.__main_cfg, images, None)
         boxes, scores, classes, valid_detections = await err_task
-        err_cfg = self.__main_cfg["err_cfg"]
-        helper.draw_yolo_results(images,
-                                 boxes,
-                                 scores,
-                                 classes,
-                                 err_cfg["classes"],
-                                 err_cfg["img_size"],
-                                 min_score=err_cfg["yolo_score_threshold"])
+        detections = get_detections(boxes, scores, classes,
+                                    err_cfg["img_size"],
+                                    err_cfg["yolo_score_threshold"])
+        draw_detections(display_images, detections, err_cfg["classes"])
 
         label_w = self.image3.width()
         label_h = self.image3.height()
-        for idx, img in enumerate(images):
-            images[idx] *= 255.
-            images[idx] = np.asarray(images[idx], np.uint8)
-        final_img = helpers.concat_images(images, label_w, label_h)
+        final_img = helpers.concat_images(display_images, label_w, label_h)
         self.image3.imshow(final_img)
 
     async def __detect_error_on_picture(self, images):
         manager = DetectorConfig.instance().get_manager()
-        err_task = manager.detect_errors(self.__main_cfg, images, None)
-        boxes, scores, classes, valid_detections = await err_task
         err_cfg = self.__main_cfg["err_cfg"]
-        helper.draw_yolo_results(images,
-                                 boxes,
-                                 scores,
-                                 classes,
-                                 err_cfg["classes"],
-                                 err_cfg["img_size"],
-                                 min_score=err_cfg["yolo_score_threshold"])
+        display_images = prepare_display_images(images, err_cfg["img_size"])
+        err_task = AsyncRuntime.instance().run_in_thread(
+            manager.detect_errors, self.__main_cfg, images, None)
+        boxes, scores, classes, valid_detections = await err_task
+        detections = get_detections(boxes, scores, classes,
+                                    err_cfg["img_size"],
+                                    err_cfg["yolo_score_threshold"])
+        draw_detections(display_images, detections, err_cfg["classes"])
         label_w = self.image3.width()
         label_h = self.image3.height()
-        for idx, img in enumerate(images):
-            images[idx] *= 255.
-            images[idx] = np.asarray(images[idx], np.uint8)
-        final_img = helpers.concat_images(images, label_w, label_h)
+        final_img = helpers.concat_images(display_images, label_w, label_h)
         self.image3.imshow(final_img)
 
     def __process_pair(self, image):